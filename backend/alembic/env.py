@@ -37,6 +37,23 @@ if not database_url:
 
 config.set_main_option("sqlalchemy.url", database_url)
 
+# Columns and indexes that exist in the database but are deliberately not
+# mapped on the models (created by DDL events / hand-written migrations).
+UNMAPPED_SCHEMA_OBJECTS = {
+    ("column", "search_vector"),
+    ("index", "ix_journalentry_search_vector"),
+} | {("index", name) for name, table, column in models.TRIGRAM_INDEXES}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate from dropping the unmapped objects above."""
+    if reflected and compare_to is None and (type_, name) in UNMAPPED_SCHEMA_OBJECTS:
+        return False
+    # Daily partitions of entry_activity, managed by app/analytics.py
+    if reflected and compare_to is None and type_ == "table" and name.startswith(models.ENTRY_ACTIVITY_PARTITION_PREFIX):
+        return False
+    return True
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -54,6 +71,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -77,7 +95,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,50 @@
+"""add indexes for hot queries
+
+Revision ID: 3b7c1e9a4d52
+Revises: 692071db2a36
+Create Date: 2026-10-17 09:00:00.000000
+
+Adds the secondary indexes the public listings, editor scoping and
+user deletion filter on. Use `python -m app.explain_queries` before and
+after upgrading to compare the query plans.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7c1e9a4d52'
+down_revision: Union[str, None] = '692071db2a36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) - keep in sync with the models' index definitions
+INDEXES = [
+    ('ix_journalentry_journal_id_status', 'journalentry', ['journal_id', 'status']),
+    ('ix_journalentry_status', 'journalentry', ['status']),
+    ('ix_journal_is_published', 'journal', ['is_published']),
+    ('ix_journal_editor_in_chief_id', 'journal', ['editor_in_chief_id']),
+    ('ix_author_updates_entry_id_created_date', 'author_updates', ['entry_id', 'created_date']),
+    ('ix_author_updates_author_id', 'author_updates', ['author_id']),
+    ('ix_referee_updates_entry_id_created_date', 'referee_updates', ['entry_id', 'created_date']),
+    ('ix_referee_updates_referee_id', 'referee_updates', ['referee_id']),
+    ('ix_journal_editor_link_user_id_journal_id', 'journal_editor_link', ['user_id', 'journal_id']),
+    ('ix_journal_entry_author_link_user_id_journal_entry_id', 'journal_entry_author_link', ['user_id', 'journal_entry_id']),
+    ('ix_journal_entry_referee_link_user_id_journal_entry_id', 'journal_entry_referee_link', ['user_id', 'journal_entry_id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on Postgres.
+    # if_not_exists skips indexes that create_all() already made on fresh databases.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,53 @@
+"""add journalentry search_vector
+
+Revision ID: 8e4f0a6c2b19
+Revises: 3b7c1e9a4d52
+Create Date: 2026-10-17 10:00:00.000000
+
+Generated tsvector column over titles, abstracts and keywords with a GIN
+index, used by the full-text search in app/search.py. PostgreSQL only.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4f0a6c2b19'
+down_revision: Union[str, None] = '3b7c1e9a4d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Same expression as models.JOURNAL_ENTRY_SEARCH_VECTOR at the time of this revision
+SEARCH_VECTOR = """
+    setweight(to_tsvector(CASE WHEN language = 'en' THEN 'english'::regconfig ELSE 'turkish'::regconfig END, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(title_en, '')), 'A') ||
+    setweight(to_tsvector('turkish'::regconfig, coalesce(keywords, '')), 'B') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(keywords_en, '')), 'B') ||
+    setweight(to_tsvector('turkish'::regconfig, coalesce(abstract_tr, '')), 'C') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(abstract_en, '')), 'C')
+"""
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(
+        "ALTER TABLE journalentry ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED"
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_journalentry_search_vector "
+            "ON journalentry USING gin (search_vector)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_journalentry_search_vector")
+    op.execute("ALTER TABLE journalentry DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,42 @@
+"""add pagination indexes
+
+Revision ID: a4c7e2d9b813
+Revises: f2a8b4c6d1e7
+Create Date: 2026-10-17 15:00:00.000000
+
+Adds (created_date, id) indexes so cursor-paginated listings read each page
+straight from an index instead of sorting the whole table.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c7e2d9b813'
+down_revision: Union[str, None] = 'f2a8b4c6d1e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) - keep in sync with the models' index definitions
+INDEXES = [
+    ('ix_journal_created_date_id', 'journal', ['created_date', 'id']),
+    ('ix_journalentry_created_date_id', 'journalentry', ['created_date', 'id']),
+    ('ix_author_updates_created_date_id', 'author_updates', ['created_date', 'id']),
+    ('ix_referee_updates_created_date_id', 'referee_updates', ['created_date', 'id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on Postgres.
+    # if_not_exists skips indexes that create_all() already made on fresh databases.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
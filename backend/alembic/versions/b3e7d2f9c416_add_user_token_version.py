@@ -0,0 +1,33 @@
+"""add user token_version
+
+Revision ID: b3e7d2f9c416
+Revises: e5a9c3f7b240
+Create Date: 2026-10-17 19:00:00.000000
+
+Adds users.token_version. Access tokens carry it in their "ver" claim, and
+bumping it (logout everywhere, password change) revokes them. Existing users
+start at 0, the version the old email-subject tokens are checked against.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e7d2f9c416'
+down_revision: Union[str, None] = 'e5a9c3f7b240'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    # create_all() may already have added the column on a fresh database
+    columns = {column['name'] for column in sa.inspect(connection).get_columns('users')}
+    if 'token_version' not in columns:
+        op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
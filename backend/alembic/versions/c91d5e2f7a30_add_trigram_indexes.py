@@ -0,0 +1,51 @@
+"""add trigram indexes
+
+Revision ID: c91d5e2f7a30
+Revises: 8e4f0a6c2b19
+Create Date: 2026-10-17 11:00:00.000000
+
+Enables pg_trgm and adds GIN trigram indexes for the fuzzy search and
+autocomplete in app/search.py. PostgreSQL only.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c91d5e2f7a30'
+down_revision: Union[str, None] = '8e4f0a6c2b19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, column) - same as models.TRIGRAM_INDEXES at the time of this revision
+TRIGRAM_INDEXES = [
+    ('ix_users_name_trgm', 'users', 'name'),
+    ('ix_journal_title_trgm', 'journal', 'title'),
+    ('ix_journal_title_en_trgm', 'journal', 'title_en'),
+    ('ix_journalentry_title_trgm', 'journalentry', 'title'),
+    ('ix_journalentry_title_en_trgm', 'journalentry', 'title_en'),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for name, table, column in TRIGRAM_INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for name, table, column in reversed(TRIGRAM_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    # The extension is left installed; other objects may depend on it
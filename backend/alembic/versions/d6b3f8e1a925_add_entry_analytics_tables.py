@@ -0,0 +1,71 @@
+"""add entry analytics tables
+
+Revision ID: d6b3f8e1a925
+Revises: a4c7e2d9b813
+Create Date: 2026-10-17 17:00:00.000000
+
+Adds entry_activity (raw daily counts, partitioned by day on PostgreSQL) and
+the entry_daily_stats / journal_daily_stats rollups. Daily partitions are
+created by the application and by `python -m app.analytics`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6b3f8e1a925'
+down_revision: Union[str, None] = 'a4c7e2d9b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    # create_all() may already have made the tables on a fresh database
+    existing = set(sa.inspect(connection).get_table_names())
+
+    if 'entry_activity' not in existing:
+        op.create_table(
+            'entry_activity',
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('entry_id', sa.Integer(), nullable=False),
+            sa.Column('flush_id', sa.String(length=32), nullable=False),
+            sa.Column('reads', sa.Integer(), nullable=False),
+            sa.Column('downloads', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('day', 'entry_id', 'flush_id'),
+            postgresql_partition_by='RANGE (day)',
+        )
+        if connection.dialect.name == 'postgresql':
+            op.execute("CREATE TABLE IF NOT EXISTS entry_activity_default PARTITION OF entry_activity DEFAULT")
+
+    if 'entry_daily_stats' not in existing:
+        op.create_table(
+            'entry_daily_stats',
+            sa.Column('entry_id', sa.Integer(), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('journal_id', sa.Integer(), nullable=True),
+            sa.Column('reads', sa.Integer(), nullable=False),
+            sa.Column('downloads', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('entry_id', 'day'),
+        )
+        op.create_index('ix_entry_daily_stats_journal_id', 'entry_daily_stats', ['journal_id'])
+
+    if 'journal_daily_stats' not in existing:
+        op.create_table(
+            'journal_daily_stats',
+            sa.Column('journal_id', sa.Integer(), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('reads', sa.Integer(), nullable=False),
+            sa.Column('downloads', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('journal_id', 'day'),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('journal_daily_stats')
+    op.drop_index('ix_entry_daily_stats_journal_id', table_name='entry_daily_stats')
+    op.drop_table('entry_daily_stats')
+    # Drops the partitions along with the parent table on PostgreSQL
+    op.drop_table('entry_activity')
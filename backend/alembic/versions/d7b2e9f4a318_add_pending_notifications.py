@@ -0,0 +1,54 @@
+"""add pending notifications
+
+Revision ID: d7b2e9f4a318
+Revises: c4f1a8e6b257
+Create Date: 2026-10-17 21:00:00.000000
+
+Adds pending_notifications and users.notification_digest. Author and referee
+update events wait in pending_notifications until their recipient's
+coalescing window or daily digest is due (see app/pending_notifications.py).
+Existing users keep getting an email per entry window, not a digest.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b2e9f4a318'
+down_revision: Union[str, None] = 'c4f1a8e6b257'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    # create_all() may already have made the column and table on a fresh database
+    columns = {column['name'] for column in inspector.get_columns('users')}
+    if 'notification_digest' not in columns:
+        op.add_column('users', sa.Column('notification_digest', sa.Boolean(), nullable=False, server_default=sa.false()))
+    if 'pending_notifications' in inspector.get_table_names():
+        return
+    op.create_table(
+        'pending_notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('entry_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('digest', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('deliver_after', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_pending_notifications_deliver_after', 'pending_notifications', ['deliver_after'])
+    op.create_index('ix_pending_notifications_user_id_entry_id', 'pending_notifications', ['user_id', 'entry_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pending_notifications_user_id_entry_id', table_name='pending_notifications')
+    op.drop_index('ix_pending_notifications_deliver_after', table_name='pending_notifications')
+    op.drop_table('pending_notifications')
+    op.drop_column('users', 'notification_digest')
@@ -0,0 +1,47 @@
+"""add updated_at version stamps
+
+Revision ID: e5a9c3f7b240
+Revises: d6b3f8e1a925
+Create Date: 2026-10-17 18:00:00.000000
+
+Adds updated_at to users, journals and entries for the public endpoints'
+ETag / Last-Modified headers. Journals and entries start at their
+created_date. Users have no creation date, so existing users start at the
+time of the migration.
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import pytz
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a9c3f7b240'
+down_revision: Union[str, None] = 'd6b3f8e1a925'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ['users', 'journal', 'journalentry']
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    for table in TABLES:
+        # create_all() may already have added the column on a fresh database
+        columns = {column['name'] for column in sa.inspect(connection).get_columns(table)}
+        if 'updated_at' not in columns:
+            op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute("UPDATE journal SET updated_at = created_date WHERE updated_at IS NULL")
+    op.execute("UPDATE journalentry SET updated_at = created_date WHERE updated_at IS NULL")
+    # Naive Istanbul time, like the timestamps the app writes
+    now = datetime.now(pytz.timezone('Europe/Istanbul')).replace(tzinfo=None)
+    op.execute(sa.text("UPDATE users SET updated_at = :now WHERE updated_at IS NULL").bindparams(now=now))
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_column(table, 'updated_at')
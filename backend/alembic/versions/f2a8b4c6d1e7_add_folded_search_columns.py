@@ -0,0 +1,109 @@
+"""add folded search columns
+
+Revision ID: f2a8b4c6d1e7
+Revises: c91d5e2f7a30
+Create Date: 2026-10-17 12:00:00.000000
+
+Adds accent- and Turkish-case-folded copies of user names and journal/entry
+titles, backfills them, and moves the trigram indexes onto them.
+"""
+import re
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8b4c6d1e7'
+down_revision: Union[str, None] = 'c91d5e2f7a30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, folded column, source column)
+FOLDED_COLUMNS = [
+    ('users', 'name_folded', 'name'),
+    ('journal', 'title_folded', 'title'),
+    ('journal', 'title_en_folded', 'title_en'),
+    ('journalentry', 'title_folded', 'title'),
+    ('journalentry', 'title_en_folded', 'title_en'),
+]
+
+OLD_TRIGRAM_INDEXES = [
+    ('ix_users_name_trgm', 'users', 'name'),
+    ('ix_journal_title_trgm', 'journal', 'title'),
+    ('ix_journal_title_en_trgm', 'journal', 'title_en'),
+    ('ix_journalentry_title_trgm', 'journalentry', 'title'),
+    ('ix_journalentry_title_en_trgm', 'journalentry', 'title_en'),
+]
+
+NEW_TRIGRAM_INDEXES = [
+    ('ix_users_name_folded_trgm', 'users', 'name_folded'),
+    ('ix_journal_title_folded_trgm', 'journal', 'title_folded'),
+    ('ix_journal_title_en_folded_trgm', 'journal', 'title_en_folded'),
+    ('ix_journalentry_title_folded_trgm', 'journalentry', 'title_folded'),
+    ('ix_journalentry_title_en_folded_trgm', 'journalentry', 'title_en_folded'),
+]
+
+BATCH_SIZE = 1000
+
+
+# Copy of app.text_utils.fold_text at the time of this revision
+_TURKISH_I = str.maketrans({"İ": "i", "I": "i", "ı": "i"})
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fold_text(value):
+    if value is None:
+        return None
+    folded = unicodedata.normalize("NFKD", value.translate(_TURKISH_I))
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    return _WHITESPACE.sub(" ", folded.casefold()).strip()
+
+
+def _backfill(connection, table, folded_column, source_column):
+    rows = connection.execute(sa.text(f"SELECT id, {source_column} FROM {table}")).fetchall()
+    update = sa.text(f"UPDATE {table} SET {folded_column} = :folded WHERE id = :id")
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        connection.execute(update, [{"id": row[0], "folded": fold_text(row[1])} for row in batch])
+
+
+def _create_trigram_indexes(indexes):
+    with op.get_context().autocommit_block():
+        for name, table, column in indexes:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    existing = {
+        table: {column['name'] for column in sa.inspect(connection).get_columns(table)}
+        for table in {table for table, _, _ in FOLDED_COLUMNS}
+    }
+    for table, folded_column, source_column in FOLDED_COLUMNS:
+        # create_all() may already have added the column on a fresh database
+        if folded_column not in existing[table]:
+            op.add_column(table, sa.Column(folded_column, sa.String(), nullable=True))
+        _backfill(connection, table, folded_column, source_column)
+
+    if connection.dialect.name == 'postgresql':
+        for name, table, column in OLD_TRIGRAM_INDEXES:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+        _create_trigram_indexes(NEW_TRIGRAM_INDEXES)
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    if connection.dialect.name == 'postgresql':
+        for name, table, column in NEW_TRIGRAM_INDEXES:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+        _create_trigram_indexes(OLD_TRIGRAM_INDEXES)
+
+    for table, folded_column, source_column in reversed(FOLDED_COLUMNS):
+        op.drop_column(table, folded_column)
@@ -0,0 +1,131 @@
+"""
+Per-day view and download statistics.
+
+Every flush of the counter buffer (app/counters.py) appends raw counts to
+entry_activity. Once a night
+
+    python -m app.analytics                    # roll up yesterday
+    python -m app.analytics --day 2026-10-01   # (re)build one day
+
+sums a day into entry_daily_stats and journal_daily_stats, creates the
+upcoming daily partitions of entry_activity and drops raw days older than
+ANALYTICS_RAW_RETENTION_DAYS. Reports such as /public/entries/{id}/stats read
+only the rollups. Rolling up a day twice gives the same result.
+"""
+import argparse
+import os
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.exc import DBAPIError
+
+from . import models
+from .counters import today
+from .database import engine
+
+# Raw entry_activity rows are kept this many days after they are rolled up
+ANALYTICS_RAW_RETENTION_DAYS = int(os.getenv("ANALYTICS_RAW_RETENTION_DAYS", 90))
+# Daily partitions created in advance (PostgreSQL)
+ANALYTICS_PARTITION_DAYS_AHEAD = int(os.getenv("ANALYTICS_PARTITION_DAYS_AHEAD", 7))
+
+
+def rollup_day(connection, day: date) -> int:
+    """Replace the rollups of one day with the sums of its raw rows. Returns the entry count."""
+    activity = models.EntryActivity
+    entry_stats = models.EntryDailyStats
+    journal_stats = models.JournalDailyStats
+
+    connection.execute(delete(entry_stats).where(entry_stats.day == day))
+    per_entry = select(
+        activity.entry_id,
+        activity.day,
+        models.JournalEntry.journal_id,
+        func.sum(activity.reads),
+        func.sum(activity.downloads),
+    ).outerjoin(
+        models.JournalEntry, models.JournalEntry.id == activity.entry_id
+    ).where(
+        activity.day == day
+    ).group_by(activity.entry_id, activity.day, models.JournalEntry.journal_id)
+    result = connection.execute(insert(entry_stats).from_select(
+        ["entry_id", "day", "journal_id", "reads", "downloads"], per_entry
+    ))
+
+    connection.execute(delete(journal_stats).where(journal_stats.day == day))
+    per_journal = select(
+        entry_stats.journal_id,
+        entry_stats.day,
+        func.sum(entry_stats.reads),
+        func.sum(entry_stats.downloads),
+    ).where(
+        entry_stats.day == day,
+        entry_stats.journal_id.isnot(None),
+    ).group_by(entry_stats.journal_id, entry_stats.day)
+    connection.execute(insert(journal_stats).from_select(
+        ["journal_id", "day", "reads", "downloads"], per_journal
+    ))
+    return result.rowcount
+
+
+def _partition_name(day: date) -> str:
+    return f"{models.ENTRY_ACTIVITY_PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def ensure_partitions(connection, start: date, days: int):
+    """Create the daily partitions of entry_activity for start and the following days."""
+    if connection.dialect.name != "postgresql":
+        return
+    for offset in range(days + 1):
+        day = start + timedelta(days=offset)
+        try:
+            with connection.begin_nested():
+                connection.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {_partition_name(day)} PARTITION OF entry_activity "
+                    f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                ))
+        except DBAPIError as e:
+            # e.g. the default partition already holds rows of that day
+            print(f"Could not create partition for {day}: {e.orig}")
+
+
+def drop_old_activity(connection, before: date):
+    """Remove raw rows of the days before `before`, dropping whole partitions where possible."""
+    if connection.dialect.name == "postgresql":
+        partitions = connection.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE parent.relname = 'entry_activity'"
+        )).scalars().all()
+        for name in partitions:
+            if name < _partition_name(before) and name[len(models.ENTRY_ACTIVITY_PARTITION_PREFIX):].isdigit():
+                connection.execute(text(f"DROP TABLE {name}"))
+    connection.execute(delete(models.EntryActivity).where(models.EntryActivity.day < before))
+
+
+def prepare_partitions():
+    """Make sure today's partition exists before the first counter flush."""
+    with engine.begin() as connection:
+        ensure_partitions(connection, today(), ANALYTICS_PARTITION_DAYS_AHEAD)
+
+
+def run_nightly(day: date = None):
+    day = day or today() - timedelta(days=1)
+    with engine.begin() as connection:
+        entries = rollup_day(connection, day)
+    print(f"Rolled up {entries} entries for {day}")
+
+    with engine.begin() as connection:
+        ensure_partitions(connection, today(), ANALYTICS_PARTITION_DAYS_AHEAD)
+        drop_old_activity(connection, today() - timedelta(days=ANALYTICS_RAW_RETENTION_DAYS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll up entry views and downloads per day.")
+    parser.add_argument("--day", type=date.fromisoformat, help="Day to roll up (default: yesterday)")
+    args = parser.parse_args()
+    run_nightly(args.day)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,13 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
 from sqlmodel import Session
 from pydantic import BaseModel
 from typing import Optional
 
 from . import crud, models, schemas, security
 from .database import get_session
+from .user_cache import user_cache
 
 # This tells FastAPI where to look for the token (the '/token' endpoint we'll create)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/token", auto_error=False)
@@ -22,6 +23,25 @@ def authenticate_user(db: Session, email: str, password: str) -> models.User | N
         return None
     if not security.verify_password(password, user.hashed_password):
         return None
+    # Upgrade the hash while we have the password, e.g. after BCRYPT_ROUNDS changed
+    if security.password_needs_rehash(user.hashed_password):
+        user.hashed_password = security.get_password_hash(password)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+    return user
+
+def get_user_for_token(db: Session, token_data: security.TokenData) -> models.User | None:
+    """
+    The user a token was issued to, from the user cache when possible, or None
+    if the token was revoked by bumping the user's token_version.
+    """
+    if token_data.user_id is not None:
+        user = user_cache.get(db, str(token_data.user_id), lambda db: crud.get_user(db, token_data.user_id))
+    else:
+        user = user_cache.get(db, token_data.email, lambda db: crud.get_user_by_email(db, email=token_data.email))
+    if user is None or user.token_version != token_data.version:
+        return None
     return user
 
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_session)) -> models.User:
@@ -36,15 +56,11 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         raise credentials_exception
 
     try:
-        payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
-        email: str | None = payload.get("sub") # "sub" is standard claim for subject (now using email)
-        if email is None:
-            raise credentials_exception
-        token_data = security.TokenData(email=email)
+        token_data = security.decode_access_token(token)
     except JWTError:
         raise credentials_exception
     
-    user = crud.get_user_by_email(db, email=token_data.email)
+    user = get_user_for_token(db, token_data)
     if user is None:
         raise credentials_exception
     return user
@@ -58,15 +74,11 @@ def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme), db:
         return None
     
     try:
-        payload = jwt.decode(token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
-        email: str | None = payload.get("sub")
-        if email is None:
-            return None
-        token_data = security.TokenData(email=email)
+        token_data = security.decode_access_token(token)
     except JWTError:
         return None
     
-    user = crud.get_user_by_email(db, email=token_data.email)
+    user = get_user_for_token(db, token_data)
     return user
 
 def get_current_active_user(current_user: models.User = Depends(get_current_user)) -> models.User:
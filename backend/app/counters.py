@@ -0,0 +1,158 @@
+"""
+Write-behind buffer for the journal entry view and download counters.
+
+Counting a view used to be a read-modify-write of the entry row plus a
+commit on every request, so bursts of views on one entry queued up on its
+row lock. Increments are now added up in memory per entry and written every
+COUNTER_FLUSH_INTERVAL seconds with one batched UPDATE (and once more on
+shutdown). The same flush appends the counts per day to entry_activity for
+the analytics rollups (app/analytics.py). Each worker process keeps its own
+buffer.
+"""
+import asyncio
+import os
+import threading
+import uuid
+from collections import defaultdict
+from datetime import date, datetime
+
+import pytz
+from sqlalchemy import Integer, column, insert, text, update, values
+from sqlalchemy.orm.attributes import set_committed_value
+
+from . import models
+from .database import engine
+
+# Seconds between flushes; a crash loses at most this much of the counts
+COUNTER_FLUSH_INTERVAL = float(os.getenv("COUNTER_FLUSH_INTERVAL", 5))
+# Entries per UPDATE statement
+COUNTER_FLUSH_BATCH_SIZE = 1000
+
+COUNTED_COLUMNS = ("read_count", "download_count")
+
+
+def today() -> date:
+    """The current day in the journal's timezone."""
+    return datetime.now(pytz.timezone('Europe/Istanbul')).date()
+
+
+def _empty_buffer():
+    # entry id -> day -> counter -> pending increments
+    return defaultdict(lambda: defaultdict(lambda: dict.fromkeys(COUNTED_COLUMNS, 0)))
+
+
+class CounterBuffer:
+    """Pending counter increments, keyed by entry id, day and column."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = _empty_buffer()
+
+    def increment(self, entry_id: int, counter: str, amount: int = 1):
+        if counter not in COUNTED_COLUMNS:
+            raise ValueError(f"Unknown counter: {counter}")
+        day = today()
+        with self._lock:
+            self._pending[entry_id][day][counter] += amount
+
+    def pending(self, entry_id: int, counter: str) -> int:
+        """Increments of an entry that are not in the database yet."""
+        with self._lock:
+            days = self._pending.get(entry_id, {})
+            return sum(counts[counter] for counts in days.values())
+
+    def apply_pending(self, entry):
+        """
+        Show the buffered increments on a loaded entry without marking it
+        dirty, so responses include the view that was just counted.
+        """
+        for counter in COUNTED_COLUMNS:
+            pending = self.pending(entry.id, counter)
+            if pending:
+                set_committed_value(entry, counter, getattr(entry, counter) + pending)
+
+    def _take(self) -> dict:
+        with self._lock:
+            pending, self._pending = self._pending, _empty_buffer()
+        return pending
+
+    def _restore(self, pending: dict):
+        with self._lock:
+            for entry_id, days in pending.items():
+                for day, counts in days.items():
+                    for counter, amount in counts.items():
+                        self._pending[entry_id][day][counter] += amount
+
+    def flush(self, bind=engine) -> int:
+        """
+        Write all pending increments in one transaction and return the number
+        of entries updated. On failure the increments go back into the buffer.
+        """
+        pending = self._take()
+        if not pending:
+            return 0
+        rows = [
+            {
+                "id": entry_id,
+                "reads": sum(counts["read_count"] for counts in days.values()),
+                "downloads": sum(counts["download_count"] for counts in days.values()),
+            }
+            for entry_id, days in pending.items()
+        ]
+        flush_id = uuid.uuid4().hex
+        activity = [
+            {
+                "day": day, "entry_id": entry_id, "flush_id": flush_id,
+                "reads": counts["read_count"], "downloads": counts["download_count"],
+            }
+            for entry_id, days in pending.items()
+            for day, counts in days.items()
+        ]
+        try:
+            with bind.begin() as connection:
+                for start in range(0, len(rows), COUNTER_FLUSH_BATCH_SIZE):
+                    _write_increments(connection, rows[start:start + COUNTER_FLUSH_BATCH_SIZE])
+                connection.execute(insert(models.EntryActivity.__table__), activity)
+        except Exception as e:
+            print(f"Error flushing entry counters: {e}")
+            self._restore(pending)
+            raise
+        return len(rows)
+
+
+def _write_increments(connection, rows: list):
+    entry = models.JournalEntry
+    if connection.dialect.name == "postgresql":
+        # UPDATE journalentry SET ... FROM (VALUES (...), ...) AS v(id, reads, downloads)
+        increments = values(
+            column("id", Integer), column("reads", Integer), column("downloads", Integer),
+            name="v",
+        ).data([(row["id"], row["reads"], row["downloads"]) for row in rows])
+        connection.execute(
+            update(entry).where(entry.id == increments.c.id).values(
+                read_count=entry.read_count + increments.c.reads,
+                download_count=entry.download_count + increments.c.downloads,
+            )
+        )
+    else:
+        connection.execute(
+            text(
+                "UPDATE journalentry SET read_count = read_count + :reads, "
+                "download_count = download_count + :downloads WHERE id = :id"
+            ),
+            rows,
+        )
+
+
+entry_counters = CounterBuffer()
+
+
+async def flush_periodically(buffer: CounterBuffer = entry_counters):
+    """Background task flushing the buffer every COUNTER_FLUSH_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(COUNTER_FLUSH_INTERVAL)
+        try:
+            await asyncio.to_thread(buffer.flush)
+        except Exception:
+            # Already printed; the increments are retried on the next flush
+            pass
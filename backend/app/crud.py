@@ -1,4 +1,5 @@
 from sqlmodel import Session, select
+from sqlalchemy.orm import selectinload
 from datetime import datetime
 import secrets
 from typing import Optional
@@ -6,16 +7,28 @@ import os
 
 from . import models
 from . import schemas
+from . import notification_utils
 from .file_utils import delete_upload_file, delete_upload_directory
+from .pagination import PageParams, ENTRY_KEYSET, JOURNAL_KEYSET
+from .settings_cache import settings_cache
 
 # --- Journal Entry CRUD --- #
 
+# JournalEntryRead includes authors and referees. Every query whose entries are
+# serialized that way must load them up front: two batched SELECT ... IN queries
+# for the whole page instead of two lazy loads per entry (and the async session
+# cannot lazy load at all).
+ENTRY_RELATIONSHIPS = (
+    selectinload(models.JournalEntry.authors),
+    selectinload(models.JournalEntry.referees),
+)
+
 def get_entry(db: Session, entry_id: int) -> models.JournalEntry | None:
     """Get a single journal entry by its ID."""
     # Using Session.get() is efficient for primary key lookups
     return db.get(models.JournalEntry, entry_id)
 
-def get_entries_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> list[models.JournalEntry]:
+def get_entries_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100, page: Optional[PageParams] = None) -> list[models.JournalEntry]:
     """Get all journal entries for a specific user as an author."""
     # Join with the author link table to get entries where the user is an author
     statement = select(models.JournalEntry).join(
@@ -23,12 +36,14 @@ def get_entries_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 1
         models.JournalEntry.id == models.JournalEntryAuthorLink.journal_entry_id
     ).where(
         models.JournalEntryAuthorLink.user_id == user_id
-    ).offset(skip).limit(limit)
+    ).options(*ENTRY_RELATIONSHIPS)
+    # With page, skip/limit come from the request (or its cursor) instead
+    statement = page.apply(statement, ENTRY_KEYSET) if page else statement.offset(skip).limit(limit)
     
     results = db.exec(statement)
     return results.all()
 
-def get_entries_by_referee(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> list[models.JournalEntry]:
+def get_entries_by_referee(db: Session, user_id: int, skip: int = 0, limit: int = 100, page: Optional[PageParams] = None) -> list[models.JournalEntry]:
     """Get all journal entries for a specific user as a referee."""
     # Join with the referee link table to get entries where the user is a referee
     statement = select(models.JournalEntry).join(
@@ -36,12 +51,14 @@ def get_entries_by_referee(db: Session, user_id: int, skip: int = 0, limit: int
         models.JournalEntry.id == models.JournalEntryRefereeLink.journal_entry_id
     ).where(
         models.JournalEntryRefereeLink.user_id == user_id
-    ).offset(skip).limit(limit)
+    ).options(*ENTRY_RELATIONSHIPS)
+    # With page, skip/limit come from the request (or its cursor) instead
+    statement = page.apply(statement, ENTRY_KEYSET) if page else statement.offset(skip).limit(limit)
     
     results = db.exec(statement)
     return results.all()
 
-def get_journals_by_editor(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> list[models.Journal]:
+def get_journals_by_editor(db: Session, user_id: int, skip: int = 0, limit: int = 100, page: Optional[PageParams] = None) -> list[models.Journal]:
     """Get all journals where a specific user is an editor."""
     # Join with the editor link table to get journals where the user is an editor
     statement = select(models.Journal).join(
@@ -49,7 +66,9 @@ def get_journals_by_editor(db: Session, user_id: int, skip: int = 0, limit: int
         models.Journal.id == models.JournalEditorLink.journal_id
     ).where(
         models.JournalEditorLink.user_id == user_id
-    ).offset(skip).limit(limit)
+    )
+    # With page, skip/limit come from the request (or its cursor) instead
+    statement = page.apply(statement, JOURNAL_KEYSET) if page else statement.offset(skip).limit(limit)
     
     results = db.exec(statement)
     return results.all()
@@ -164,105 +183,15 @@ def update_entry(db: Session, entry_id: int, entry_update: schemas.JournalEntryU
             )
             db.add(referee_link)
         
-        # Send email notifications for newly assigned referees
-        if new_referee_ids:
-            try:
-                from .email_utils import send_referee_assignment_notification
-                import os
-                
-                # Get the Brevo API key
-                api_key = os.getenv("BREVO_API_KEY")
-                if api_key:
-                    # Get all authors for this entry
-                    authors_statement = select(models.JournalEntryAuthorLink).where(
-                        models.JournalEntryAuthorLink.journal_entry_id == db_entry.id
-                    )
-                    author_links = db.exec(authors_statement).all()
-                    
-                    # For each newly assigned referee, send notifications to all authors
-                    for referee_id in new_referee_ids:
-                        referee = db.get(models.User, referee_id)
-                        if referee:
-                            for author_link in author_links:
-                                author = db.get(models.User, author_link.user_id)
-                                if author and author.email:
-                                    try:
-                                        send_referee_assignment_notification(
-                                            api_key=api_key,
-                                            user_email=author.email,
-                                            user_name=author.name,
-                                            referee_name=referee.name,
-                                            entry_title=db_entry.title,
-                                            entry_id=db_entry.id
-                                        )
-                                    except Exception as email_error:
-                                        print(f"Failed to send referee assignment notification to {author.email}: {email_error}")
-                                        # Continue processing even if email fails
-                                        
-            except Exception as e:
-                print(f"Error sending referee assignment notifications: {e}")
-                # Don't fail the whole operation if email fails
-
-    # Send status update notifications if status changed
+        # Queue email notifications for newly assigned referees
+        for referee_id in new_referee_ids:
+            referee = db.get(models.User, referee_id)
+            if referee:
+                notification_utils.notify_on_referee_assignment(db, db_entry, referee)
+
+    # Queue status update notifications if status changed
     if status_changed and old_status and new_status:
-        try:
-            from .email_utils import send_status_update_notification
-            import os
-            
-            # Get the Brevo API key
-            api_key = os.getenv("BREVO_API_KEY")
-            if api_key:
-                # Get all authors for this entry
-                authors_statement = select(models.JournalEntryAuthorLink).where(
-                    models.JournalEntryAuthorLink.journal_entry_id == db_entry.id
-                )
-                author_links = db.exec(authors_statement).all()
-                
-                # Get all referees for this entry
-                referees_statement = select(models.JournalEntryRefereeLink).where(
-                    models.JournalEntryRefereeLink.journal_entry_id == db_entry.id
-                )
-                referee_links = db.exec(referees_statement).all()
-                
-                # Send notifications to all authors
-                for author_link in author_links:
-                    author = db.get(models.User, author_link.user_id)
-                    if author and author.email:
-                        try:
-                            send_status_update_notification(
-                                api_key=api_key,
-                                user_email=author.email,
-                                user_name=author.name,
-                                entry_title=db_entry.title,
-                                entry_id=db_entry.id,
-                                old_status=old_status,
-                                new_status=new_status
-                            )
-                        except Exception as email_error:
-                            print(f"Failed to send status update notification to author {author.email}: {email_error}")
-                            # Continue processing even if email fails
-                
-                # Send notifications to all referees
-                for referee_link in referee_links:
-                    referee = db.get(models.User, referee_link.user_id)
-                    if referee and referee.email:
-                        try:
-                            send_status_update_notification(
-                                api_key=api_key,
-                                user_email=referee.email,
-                                user_name=referee.name,
-                                entry_title=db_entry.title,
-                                entry_id=db_entry.id,
-                                old_status=old_status,
-                                new_status=new_status
-                            )
-                        except Exception as email_error:
-                            print(f"Failed to send status update notification to referee {referee.email}: {email_error}")
-                            # Continue processing even if email fails
-                            
-        except Exception as e:
-            print(f"Error sending status update notifications: {e}")
-            # Don't fail the whole operation if email fails
+        notification_utils.notify_on_status_change(db, db_entry, old_status, new_status)
 
     db.add(db_entry)
     db.commit()
@@ -333,11 +262,15 @@ def get_user_by_reset_token(db: Session, token: str) -> Optional[models.User]:
     statement = select(models.User).where(models.User.reset_password_token == token)
     return db.exec(statement).first()
 
-def create_user(db: Session, user: schemas.UserCreate) -> models.User:
-    """Create a new user, hashing the password before saving."""
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None) -> models.User:
+    """
+    Create a new user, hashing the password before saving. Async handlers
+    pass the hash they computed with security.get_password_hash_async.
+    """
     from .security import get_password_hash # Import here to avoid circular imports
 
-    hashed_password = get_password_hash(user.password)
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     user_data = user.model_dump(exclude={"password", "recaptcha_token"})
     
     # Generate confirmation token
@@ -518,8 +451,11 @@ def delete_user(db: Session, user_id: int, transfer_to_user_id: int) -> bool:
 # --- Settings CRUD --- #
 
 def get_settings(db: Session) -> models.Settings:
-    """Get the application settings. There should only be one row with id=1."""
-    return db.get(models.Settings, 1)
+    """
+    Get the application settings. There should only be one row with id=1.
+    Served from the settings cache, so the result must not be modified.
+    """
+    return settings_cache.get(db)
 
 def create_settings(db: Session) -> models.Settings:
     """Create the initial settings row if it doesn't exist."""
@@ -530,8 +466,8 @@ def create_settings(db: Session) -> models.Settings:
     return settings
 
 def update_settings(db: Session, settings_update: models.SettingsUpdate) -> models.Settings:
-    """Update the application settings."""
-    db_settings = get_settings(db)
+    """Update the application settings. Committing invalidates the settings cache."""
+    db_settings = db.get(models.Settings, 1)
     if not db_settings:
         db_settings = create_settings(db)
     
@@ -594,7 +530,7 @@ def create_confirmation_token(db: Session, email: str) -> Optional[models.User]:
     return user
 
 def update_user_password(db: Session, user_id: int, new_password: str) -> models.User:
-    """Update a user's password and clear the reset token."""
+    """Update a user's password, clear the reset token and revoke the user's access tokens."""
     from .security import get_password_hash  # Import here to avoid circular imports
     
     # Get the user
@@ -611,6 +547,7 @@ def update_user_password(db: Session, user_id: int, new_password: str) -> models
     user.hashed_password = hashed_password
     user.reset_password_token = None
     user.reset_password_token_created_at = None
+    user.token_version += 1
     
     db.add(user)
     db.commit()
@@ -618,6 +555,17 @@ def update_user_password(db: Session, user_id: int, new_password: str) -> models
     
     return user
 
+def revoke_user_tokens(db: Session, user_id: int) -> models.User | None:
+    """Invalidate every access token issued to a user so far (logout everywhere)."""
+    user = get_user(db, user_id)
+    if not user:
+        return None
+    user.token_version += 1
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
 def delete_journal(db: Session, journal_id: int) -> models.Journal | None:
     """Delete a journal and reassign its entries to journal ID 1."""
     # Don't allow deleting journal ID 1
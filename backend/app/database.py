@@ -1,5 +1,12 @@
 import os
+import threading
+import time
 from sqlmodel import create_engine, SQLModel, Session
+from fastapi import Request, Response
+from sqlalchemy import event, exc, Insert, Update, Delete
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from contextlib import contextmanager
 from dotenv import load_dotenv
 
@@ -11,8 +18,268 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable not set")
 
+
+def _async_database_url(url: str) -> str:
+    """Derive the async driver URL (asyncpg / aiosqlite) from DATABASE_URL."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+# The async engine normally shares DATABASE_URL; ASYNC_DATABASE_URL overrides it
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(DATABASE_URL)
+
+# Optional read replica. Safe GET handlers read from it; everything else uses the primary.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+ASYNC_DATABASE_REPLICA_URL = os.getenv("ASYNC_DATABASE_REPLICA_URL") or (
+    _async_database_url(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else None
+)
+# After a successful write, the client keeps reading from the primary for this long
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 10))
+PRIMARY_STICKY_COOKIE = "db_primary_until"
+
+# Connection pool settings (see .env). Defaults match SQLAlchemy's own defaults,
+# except pre-ping and recycle which protect us from stale connections after a
+# Postgres restart.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds, -1 disables recycling
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))  # 0 disables the timeout
+
+
+class PoolStats:
+    """
+    Collects connection pool usage so the pool can be sized from real data.
+    Wait times are bucketed into a histogram in milliseconds.
+    """
+
+    WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_count = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * (len(self.WAIT_BUCKETS_MS) + 1)  # last bucket is +Inf
+
+    def observe_wait(self, wait_ms: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            if timed_out:
+                self.timeouts += 1
+            for index, bound in enumerate(self.WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    self.wait_buckets[index] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+
+    def increment(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            histogram = {
+                f"le_{bound}": count
+                for bound, count in zip(self.WAIT_BUCKETS_MS, self.wait_buckets)
+            }
+            histogram["le_inf"] = self.wait_buckets[-1]
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_count": self.wait_count,
+                "wait_avg_ms": round(self.wait_total_ms / self.wait_count, 3) if self.wait_count else 0.0,
+                "wait_max_ms": round(self.wait_max_ms, 3),
+                "wait_histogram_ms": histogram,
+            }
+
+
+pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+replica_pool_stats = PoolStats()
+async_replica_pool_stats = PoolStats()
+
+
+class _WaitTimingMixin:
+    """Records how long callers wait for a connection from the pool."""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.stats.observe_wait((time.perf_counter() - start) * 1000, timed_out=timed_out)
+
+
+def _instrumented_pool_class(base, stats: PoolStats):
+    """Create a pool class that reports wait times to the given PoolStats."""
+    return type(f"Instrumented{base.__name__}", (_WaitTimingMixin, base), {"stats": stats})
+
+
+def _engine_kwargs(url: str, stats: PoolStats, is_async: bool = False) -> dict:
+    """Build create_engine() keyword arguments for the configured pool."""
+    if url.startswith("sqlite"):
+        # SQLite picks its own pool implementation; pool sizing does not apply
+        return {}
+
+    kwargs = {
+        "poolclass": _instrumented_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool, stats),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if DB_STATEMENT_TIMEOUT_MS and url.startswith("postgresql"):
+        if is_async:
+            kwargs["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            kwargs["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return kwargs
+
+
+def _instrument_pool(target_engine, stats: PoolStats):
+    """Attach pool event listeners that feed the given PoolStats."""
+    @event.listens_for(target_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats.increment("connects")
+
+    @event.listens_for(target_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.increment("checkouts")
+
+    @event.listens_for(target_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        stats.increment("invalidations")
+
+
 # Connection parameters
-engine = create_engine(DATABASE_URL, echo=False)  # echo=False disables SQL query logging
+engine = create_engine(DATABASE_URL, echo=False, **_engine_kwargs(DATABASE_URL, pool_stats))  # echo=False disables SQL query logging
+_instrument_pool(engine, pool_stats)
+
+# Async engine for handlers that are declared `async def`; each worker gets its own pool
+async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False, **_engine_kwargs(ASYNC_DATABASE_URL, async_pool_stats, is_async=True))
+_instrument_pool(async_engine.sync_engine, async_pool_stats)
+
+# Replica engines fall back to the primary when no replica is configured
+if DATABASE_REPLICA_URL:
+    replica_engine = create_engine(DATABASE_REPLICA_URL, echo=False, **_engine_kwargs(DATABASE_REPLICA_URL, replica_pool_stats))
+    _instrument_pool(replica_engine, replica_pool_stats)
+    async_replica_engine = create_async_engine(
+        ASYNC_DATABASE_REPLICA_URL, echo=False,
+        **_engine_kwargs(ASYNC_DATABASE_REPLICA_URL, async_replica_pool_stats, is_async=True)
+    )
+    _instrument_pool(async_replica_engine.sync_engine, async_replica_pool_stats)
+else:
+    replica_engine = engine
+    async_replica_engine = async_engine
+
+
+def _describe_pool(pool, stats: PoolStats) -> dict:
+    status = {
+        "pool_class": type(pool).__name__,
+        "status": pool.status(),
+    }
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "timeout": DB_POOL_TIMEOUT,
+            "recycle": DB_POOL_RECYCLE,
+            "pre_ping": DB_POOL_PRE_PING,
+        })
+    status["stats"] = stats.snapshot()
+    return status
+
+
+def get_pool_status() -> dict:
+    """Return the current state of both pools together with the collected statistics."""
+    status = {
+        "sync": _describe_pool(engine.pool, pool_stats),
+        "async": _describe_pool(async_engine.pool, async_pool_stats),
+    }
+    if DATABASE_REPLICA_URL:
+        status["replica_sync"] = _describe_pool(replica_engine.pool, replica_pool_stats)
+        status["replica_async"] = _describe_pool(async_replica_engine.pool, async_replica_pool_stats)
+    return status
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to the replica and writes to the primary.
+
+    Once the session flushes (or is created with use_primary=True) it stays
+    on the primary, so a handler always reads its own writes.
+    """
+
+    primary_bind = engine
+    replica_bind = replica_engine
+
+    def __init__(self, *args, use_primary: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.use_primary = use_primary
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.use_primary = True
+        return self.primary_bind if self.use_primary else self.replica_bind
+
+
+class AsyncRoutingSession(RoutingSession):
+    """Sync side of the async routing session (see AsyncSession.sync_session_class)."""
+
+    primary_bind = async_engine.sync_engine
+    replica_bind = async_replica_engine.sync_engine
+
+
+def _prefers_primary(request: Request) -> bool:
+    """True while the client is inside its read-your-own-writes window."""
+    until = request.cookies.get(PRIMARY_STICKY_COOKIE)
+    try:
+        return until is not None and float(until) > time.time()
+    except ValueError:
+        return False
+
+
+def mark_primary_sticky(request: Request, response: Response):
+    """
+    After a successful write, route the client's reads to the primary for
+    REPLICA_STICKY_SECONDS so it does not observe replica lag.
+    """
+    if not DATABASE_REPLICA_URL:
+        return
+    if request.method in ("GET", "HEAD", "OPTIONS") or response.status_code >= 400:
+        return
+    response.set_cookie(
+        PRIMARY_STICKY_COOKIE,
+        str(time.time() + REPLICA_STICKY_SECONDS),
+        max_age=REPLICA_STICKY_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
 
 def create_db_and_tables():
     """
@@ -29,6 +296,28 @@ def get_session():
     with Session(engine) as session:
         yield session
 
+async def get_async_session():
+    """
+    Dependency for `async def` handlers. Objects stay loaded after commit,
+    so relationships must be eager-loaded (e.g. selectinload) before returning.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+def get_read_session(request: Request):
+    """Dependency for read-mostly GET handlers; reads go to the replica when one is configured."""
+    with RoutingSession(use_primary=_prefers_primary(request)) as session:
+        yield session
+
+async def get_async_read_session(request: Request):
+    """Async counterpart of get_read_session."""
+    async with AsyncSession(
+        sync_session_class=AsyncRoutingSession,
+        expire_on_commit=False,
+        use_primary=_prefers_primary(request),
+    ) as session:
+        yield session
+
 @contextmanager
 def session_scope():
     """Provide a transactional scope around a series of operations."""
@@ -40,4 +329,4 @@ def session_scope():
         session.rollback()
         raise
     finally:
-        session.close() 
\ No newline at end of file
+        session.close()
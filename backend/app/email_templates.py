@@ -0,0 +1,271 @@
+"""
+Registry of the compiled email templates.
+
+Each kind of email has a bilingual HTML body in app/templates/email/<kind>.html
+(Turkish first) and a subject per language in SUBJECTS. The registry compiles
+every (kind, language) pair once, at startup: the body is placed in the
+shared layout.html and split into literal text and {field} slots, so
+rendering is a single join. A slot may name a filter after a colon, as in
+{old_status:status_tr}. Values are HTML-escaped in bodies but not in subjects,
+except through the html filter, which is for markup rendered by this module.
+
+For a batch, partial() fills in the fields shared by all recipients once and
+keeps the PER_RECIPIENT_FIELDS slots. render() on the result only substitutes
+those, and brevo_html() turns them into {{ params.<field> }} for Brevo message
+versions, filled in with brevo_params() (see email_utils.send_email_batch).
+
+Coalesced and digest emails list their events with the one-line EVENT_ITEMS
+templates, joined by render_events() and placed with {events_tr:html}.
+"""
+import html
+import threading
+from pathlib import Path
+from string import Formatter
+from typing import NamedTuple
+
+TEMPLATE_DIR = Path(__file__).parent / "templates" / "email"
+LANGUAGES = ("en", "tr")
+# Fields that differ between the recipients of a batch
+PER_RECIPIENT_FIELDS = ("user_email", "user_name")
+# Values of fields the caller may leave out
+DEFAULT_FIELDS = {"base_url": "http://localhost:5173"}
+
+SUBJECTS = {
+    "confirmation": {
+        "tr": "E-posta Adresinizi Onaylayın",
+        "en": "Confirm your email address | E-posta adresinizi onaylayın",
+    },
+    "password_reset": {
+        "tr": "Şifrenizi Sıfırlayın",
+        "en": "Reset Your Password | Şifrenizi sıfırlayın",
+    },
+    "author_update": {
+        "tr": "Yazar Güncellemesi: {entry_title}",
+        "en": "Author Update: {entry_title} | Yazar güncellemesi",
+    },
+    "referee_update": {
+        "tr": "Hakem Değerlendirmesi: {entry_title}",
+        "en": "Referee Review: {entry_title} | Hakem değerlendirmesi",
+    },
+    "referee_assignment": {
+        "tr": "Hakem Atandı: {entry_title}",
+        "en": "Referee Assigned: {entry_title} | Hakem atandı",
+    },
+    "status_update": {
+        "tr": "Durum Güncellemesi: {entry_title}",
+        "en": "Status Update: {entry_title} | Durum güncellemesi",
+    },
+    "login_link": {
+        "tr": "Giriş Bağlantınız",
+        "en": "Your Login Link | Giriş bağlantınız",
+    },
+    "entry_activity": {
+        "tr": "{count} Güncelleme: {entry_title}",
+        "en": "{count} Updates: {entry_title} | {count} güncelleme",
+    },
+    "digest": {
+        "tr": "Günlük Özet: {count} Bildirim",
+        "en": "Daily Digest: {count} Notifications | Günlük özet",
+    },
+}
+
+# A list item per event in entry_activity and digest emails, by event kind
+EVENT_ITEMS = {
+    "author_update": {
+        "tr": '<li>{time} · <strong>{author_name}</strong> yazar güncellemesi yaptı: '
+              '<a href="{base_url}/entries/{entry_id}/updates">{entry_title}</a></li>',
+        "en": '<li>{time} · <strong>{author_name}</strong> posted an author update on '
+              '<a href="{base_url}/entries/{entry_id}/updates">{entry_title}</a></li>',
+    },
+    "referee_update": {
+        "tr": '<li>{time} · <strong>{referee_name}</strong> hakem değerlendirmesi ekledi: '
+              '<a href="{base_url}/entries/{entry_id}/updates">{entry_title}</a></li>',
+        "en": '<li>{time} · <strong>{referee_name}</strong> posted a referee review on '
+              '<a href="{base_url}/entries/{entry_id}/updates">{entry_title}</a></li>',
+    },
+}
+
+STATUS_NAMES = {
+    "en": {
+        'waiting_for_payment': 'Waiting for Payment',
+        'waiting_for_authors': 'Waiting for Authors',
+        'waiting_for_referees': 'Waiting for Referees',
+        'waiting_for_editors': 'Waiting for Editors',
+        'accepted': 'Accepted',
+        'not_accepted': 'Not Accepted',
+        'rejected': 'Rejected',
+        'pending': 'Pending'
+    },
+    "tr": {
+        'waiting_for_payment': 'Ödeme Bekleniyor',
+        'waiting_for_authors': 'Yazarlar Bekleniyor',
+        'waiting_for_referees': 'Hakemler Bekleniyor',
+        'waiting_for_editors': 'Editörler Bekleniyor',
+        'accepted': 'Kabul Edildi',
+        'not_accepted': 'Kabul Edilmedi',
+        'rejected': 'Reddedildi',
+        'pending': 'Beklemede'
+    },
+}
+
+
+def _status_name(language: str):
+    names = STATUS_NAMES[language]
+    return lambda value: names.get(value, value.replace('_', ' ').title())
+
+
+FILTERS = {
+    "status_en": _status_name("en"),
+    "status_tr": _status_name("tr"),
+    # Trusted markup, left unescaped
+    "html": str,
+}
+
+
+class CompiledTemplate:
+    """A template split into (literal, field, filter) parts; field is None after the last literal."""
+
+    __slots__ = ("parts", "escape")
+
+    def __init__(self, parts: list, escape: bool):
+        self.parts = parts
+        self.escape = escape
+
+    @classmethod
+    def compile(cls, source: str, escape: bool = True) -> "CompiledTemplate":
+        parts = []
+        for literal, field, filter_name, _ in Formatter().parse(source):
+            if filter_name and filter_name not in FILTERS:
+                raise ValueError(f"Unknown email template filter: {filter_name}")
+            parts.append((literal, field, filter_name or None))
+        return cls(parts, escape)
+
+    @property
+    def fields(self) -> set:
+        return {field for _, field, _ in self.parts if field is not None}
+
+    def _value(self, fields: dict, field: str, filter_name):
+        try:
+            value = str(fields[field])
+        except KeyError:
+            raise ValueError(f"Missing email template field: {field}") from None
+        if filter_name:
+            value = FILTERS[filter_name](value)
+        return html.escape(value) if self.escape and filter_name != "html" else value
+
+    def render(self, fields: dict) -> str:
+        chunks = []
+        for literal, field, filter_name in self.parts:
+            chunks.append(literal)
+            if field is not None:
+                chunks.append(self._value(fields, field, filter_name))
+        return "".join(chunks)
+
+    def partial(self, fields: dict) -> "CompiledTemplate":
+        """The template with the given fields filled in and the others kept as slots."""
+        parts = []
+        pending = ""
+        for literal, field, filter_name in self.parts:
+            pending += literal
+            if field is None:
+                continue
+            if field in fields:
+                pending += self._value(fields, field, filter_name)
+            else:
+                parts.append((pending, field, filter_name))
+                pending = ""
+        parts.append((pending, None, None))
+        return CompiledTemplate(parts, self.escape)
+
+    def brevo_html(self) -> str:
+        """The template with every remaining slot as a Brevo {{ params.<field> }} placeholder."""
+        chunks = []
+        for literal, field, filter_name in self.parts:
+            chunks.append(literal)
+            if field is not None:
+                if filter_name:
+                    raise ValueError(f"Field {field} needs filter {filter_name} and cannot be a Brevo param")
+                chunks.append(f"{{{{ params.{field} }}}}")
+        return "".join(chunks)
+
+    def brevo_params(self, fields: dict) -> dict:
+        """Values for the placeholders of brevo_html(), escaped as render() would."""
+        return {field: self._value(fields, field, None) for field in self.fields}
+
+
+class EmailTemplate(NamedTuple):
+    subject: CompiledTemplate
+    body: CompiledTemplate
+
+
+class TemplateRegistry:
+    """The compiled templates by kind and language."""
+
+    def __init__(self, directory: Path = TEMPLATE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._templates = None
+        self._events = None
+
+    def load(self) -> int:
+        """Read and compile every template; returns how many were compiled."""
+        layout = (self.directory / "layout.html").read_text(encoding="utf-8")
+        templates = {}
+        for kind, subjects in SUBJECTS.items():
+            content = (self.directory / f"{kind}.html").read_text(encoding="utf-8")
+            # Placed with replace(): the layout itself has no slots
+            body = CompiledTemplate.compile(layout.replace("{CONTENT}", content))
+            for language in LANGUAGES:
+                templates[kind, language] = EmailTemplate(
+                    subject=CompiledTemplate.compile(subjects[language], escape=False),
+                    body=body,
+                )
+        events = {
+            (kind, language): CompiledTemplate.compile(items[language])
+            for kind, items in EVENT_ITEMS.items() for language in LANGUAGES
+        }
+        with self._lock:
+            self._templates = templates
+            self._events = events
+        return len(templates)
+
+    @property
+    def kinds(self) -> set:
+        return set(SUBJECTS)
+
+    def get(self, kind: str, language: str = "en") -> EmailTemplate:
+        """The template of an email kind; any language but Turkish gets English."""
+        if self._templates is None:
+            self.load()
+        if language not in LANGUAGES:
+            language = "en"
+        try:
+            return self._templates[kind, language]
+        except KeyError:
+            raise ValueError(f"Unknown email kind: {kind}") from None
+
+    def event(self, kind: str, language: str = "en") -> CompiledTemplate:
+        """The list item template of an event kind."""
+        if self._events is None:
+            self.load()
+        try:
+            return self._events[kind, language]
+        except KeyError:
+            raise ValueError(f"Unknown event kind: {kind}") from None
+
+
+templates = TemplateRegistry()
+
+
+def render(kind: str, language: str = "en", **fields) -> tuple:
+    """The (subject, html) of an email."""
+    template = templates.get(kind, language)
+    fields = {**DEFAULT_FIELDS, **fields}
+    return template.subject.render(fields), template.body.render(fields)
+
+
+def render_events(events: list, language: str) -> str:
+    """The list items of (kind, fields) events, for an {events_<language>:html} slot."""
+    return "\n".join(
+        templates.event(kind, language).render({**DEFAULT_FIELDS, **fields}) for kind, fields in events
+    )
@@ -0,0 +1,136 @@
+"""
+Print and compare the query plans of the hot queries.
+
+Run it before and after applying an index migration:
+
+    python -m app.explain_queries --save plans_before.json
+    alembic upgrade head
+    python -m app.explain_queries --save plans_after.json --compare plans_before.json
+
+Works against PostgreSQL (EXPLAIN) and SQLite (EXPLAIN QUERY PLAN).
+"""
+import argparse
+import json
+
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from . import models
+from .database import engine
+from .models import JournalEntryStatus
+
+
+def _sample_ids(db: Session) -> dict:
+    """Pick existing ids so the planner sees realistic parameters."""
+    journal_id = db.exec(select(models.Journal.id).order_by(models.Journal.id.desc())).first()
+    entry_id = db.exec(select(models.JournalEntry.id).order_by(models.JournalEntry.id.desc())).first()
+    user_id = db.exec(select(models.User.id).order_by(models.User.id.desc())).first()
+    return {
+        "journal_id": journal_id or 1,
+        "entry_id": entry_id or 1,
+        "user_id": user_id or 1,
+    }
+
+
+def hot_queries(ids: dict) -> dict:
+    """The statements issued on the hot paths, keyed by where they come from."""
+    return {
+        "public.get_public_journal_entries": select(models.JournalEntry).where(
+            models.JournalEntry.journal_id == ids["journal_id"],
+            models.JournalEntry.status == JournalEntryStatus.ACCEPTED,
+        ),
+        "public.get_published_journals": select(models.Journal).where(
+            models.Journal.is_published == True
+        ),
+        "crud.get_entries_by_user": select(models.JournalEntry).join(
+            models.JournalEntryAuthorLink,
+            models.JournalEntry.id == models.JournalEntryAuthorLink.journal_entry_id,
+        ).where(models.JournalEntryAuthorLink.user_id == ids["user_id"]),
+        "crud.get_entries_by_referee": select(models.JournalEntry).join(
+            models.JournalEntryRefereeLink,
+            models.JournalEntry.id == models.JournalEntryRefereeLink.journal_entry_id,
+        ).where(models.JournalEntryRefereeLink.user_id == ids["user_id"]),
+        "crud.get_journals_by_editor": select(models.Journal).join(
+            models.JournalEditorLink,
+            models.Journal.id == models.JournalEditorLink.journal_id,
+        ).where(models.JournalEditorLink.user_id == ids["user_id"]),
+        "crud.delete_user.journals_as_chief": select(models.Journal).where(
+            models.Journal.editor_in_chief_id == ids["user_id"]
+        ),
+        "public.search.entries": select(models.JournalEntry).join(
+            models.Journal, models.JournalEntry.journal_id == models.Journal.id
+        ).where(
+            models.JournalEntry.status == JournalEntryStatus.ACCEPTED,
+            models.Journal.is_published == True,
+        ),
+        "crud.get_author_updates_by_entry": select(models.AuthorUpdate).where(
+            models.AuthorUpdate.entry_id == ids["entry_id"]
+        ).order_by(models.AuthorUpdate.created_date),
+        "crud.get_referee_updates_by_entry": select(models.RefereeUpdate).where(
+            models.RefereeUpdate.entry_id == ids["entry_id"]
+        ).order_by(models.RefereeUpdate.created_date),
+        "crud.delete_user.author_updates": select(models.AuthorUpdate).where(
+            models.AuthorUpdate.author_id == ids["user_id"]
+        ),
+        "crud.delete_user.referee_updates": select(models.RefereeUpdate).where(
+            models.RefereeUpdate.referee_id == ids["user_id"]
+        ),
+    }
+
+
+def explain(db: Session, statement) -> list[str]:
+    """Return the plan of a statement as a list of lines."""
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    if engine.dialect.name == "postgresql":
+        rows = db.exec(text(f"EXPLAIN {sql}")).all()
+        return [row[0] for row in rows]
+    if engine.dialect.name == "sqlite":
+        rows = db.exec(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        return [row[-1] for row in rows]
+    raise ValueError(f"EXPLAIN is not supported for the {engine.dialect.name} dialect")
+
+
+def collect_plans() -> dict:
+    with Session(engine) as db:
+        ids = _sample_ids(db)
+        return {name: explain(db, statement) for name, statement in hot_queries(ids).items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the query plans of the hot queries.")
+    parser.add_argument("--save", help="Write the plans to this JSON file")
+    parser.add_argument("--compare", help="Compare the plans with a previously saved JSON file")
+    args = parser.parse_args()
+
+    plans = collect_plans()
+    previous = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+
+    changed = 0
+    for name, plan in plans.items():
+        print(f"=== {name}")
+        if args.compare and name in previous:
+            if previous[name] == plan:
+                print("  (plan unchanged)")
+            else:
+                changed += 1
+                print("  before:")
+                for line in previous[name]:
+                    print(f"    {line}")
+                print("  after:")
+        for line in plan:
+            print(f"    {line}")
+
+    if args.compare:
+        print(f"\n{changed} of {len(plans)} plans changed")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(plans, f, ensure_ascii=False, indent=2)
+        print(f"Plans saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Streaming exports of the admin tables.
+
+The admin list endpoints build every ORM object and response model before
+sending anything. An export instead selects plain columns, fetches them in
+batches of EXPORT_BATCH_SIZE from a server-side cursor (yield_per) and writes
+each batch out as NDJSON or CSV while the next one is read, so memory stays
+flat however large the table is.
+"""
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from enum import Enum
+
+from sqlalchemy import Enum as SAEnum, String, select, type_coerce
+from sqlmodel import Session
+
+from . import models
+from .database import replica_engine
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _columns(table, only=None, exclude=()):
+    columns = [column for column in table.columns if column.name not in exclude]
+    if only is not None:
+        columns = [column for column in columns if column.name in only]
+    return columns
+
+
+# Export name (as in the admin URLs) -> exported columns
+EXPORTS = {
+    # Same fields as UserRead: never the password hash or tokens
+    "users": _columns(models.User.__table__, only=set(models.UserRead.model_fields)),
+    "journal-entries": _columns(models.JournalEntry.__table__, exclude=("title_folded", "title_en_folded")),
+    "author-updates": _columns(models.AuthorUpdate.__table__),
+    "referee-updates": _columns(models.RefereeUpdate.__table__),
+    "journal-editor-links": _columns(models.JournalEditorLink.__table__),
+    "journal-entry-author-links": _columns(models.JournalEntryAuthorLink.__table__),
+    "journal-entry-referee-links": _columns(models.JournalEntryRefereeLink.__table__),
+}
+
+
+def _raw(column):
+    # Read enums as the stored string, so one legacy value cannot abort an export
+    if isinstance(column.type, SAEnum):
+        return type_coerce(column, String).label(column.name)
+    return column
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _ndjson_batch(keys, rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(keys, map(_plain, row))), ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def _csv_batch(rows, header=None) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def stream_export(name: str, export_format: str):
+    """
+    Generator yielding the export as text chunks, one per batch of rows.
+
+    It opens its own session, so the connection is held only while the
+    response is being sent and released even if the client disconnects.
+    """
+    columns = EXPORTS[name]
+    keys = [column.name for column in columns]
+    primary_key = [column for column in columns if column.primary_key]
+    statement = select(*(_raw(column) for column in columns)).order_by(*primary_key)
+
+    with Session(replica_engine) as db:
+        result = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        if export_format == "csv":
+            yield _csv_batch([], header=keys)
+        for rows in result.partitions():
+            if export_format == "csv":
+                yield _csv_batch(rows)
+            else:
+                yield _ndjson_batch(keys, rows)
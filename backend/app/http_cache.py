@@ -0,0 +1,106 @@
+"""
+Conditional GET (ETag / Last-Modified) and Cache-Control for public endpoints.
+
+A handler first reads a cheap version stamp of what it is about to return
+(the updated_at and count of the rows involved, see models.VERSIONED_MODELS)
+and only runs its real queries when the client does not have that version:
+
+    version = (await db.exec(version_statement)).one()
+    not_modified = conditional_response(request, response, make_etag(...), last_modified)
+    if not_modified:
+        return not_modified
+
+The ETags are weak: they identify the data, not the exact bytes.
+"""
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+import pytz
+from fastapi import Request, Response, status
+
+# Seconds browsers and nginx may reuse a public response without revalidating
+PUBLIC_CACHE_MAX_AGE = int(os.getenv("PUBLIC_CACHE_MAX_AGE", 60))
+
+# Timestamps are stored as naive Europe/Istanbul times (see models)
+LOCAL_TIMEZONE = pytz.timezone('Europe/Istanbul')
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag for a version stamp made of any repr()-able values."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def latest(*timestamps) -> Optional[datetime]:
+    """The most recent of the given timestamps, ignoring missing ones."""
+    present = [value for value in timestamps if value is not None]
+    return max(present) if present else None
+
+
+def _to_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = LOCAL_TIMEZONE.localize(value)
+    return value.astimezone(timezone.utc)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole seconds
+    return _to_utc(last_modified).replace(microsecond=0) <= since
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    max_age: int = PUBLIC_CACHE_MAX_AGE,
+) -> Optional[Response]:
+    """
+    Put the validators and Cache-Control on the response, and return a 304
+    Not Modified response if the request's If-None-Match (or, without it,
+    If-Modified-Since) shows the client already has this version.
+
+    Args:
+        request: The incoming request
+        response: The response FastAPI will send if None is returned
+        etag: ETag of the current version (see make_etag)
+        last_modified: When the data last changed, if known
+        max_age: Seconds the response may be reused; 0 means always revalidate
+
+    Returns:
+        Response: A 304 response to return as is, or None to build the full response
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}" if max_age > 0 else "public, no-cache",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_to_utc(last_modified), usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        matched = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        matched = bool(if_modified_since and last_modified and _not_modified_since(if_modified_since, last_modified))
+
+    if matched:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
@@ -0,0 +1,113 @@
+"""
+Cross-worker invalidation of the in-process caches.
+
+Each uvicorn worker keeps its own caches (app/response_cache.py,
+app/settings_cache.py). A write invalidates the cache of the worker that made
+it when its session commits; the other workers hear about it through
+PostgreSQL LISTEN/NOTIFY:
+
+    notify(session, "settings")              # in an after_flush handler
+    subscribe("settings", handler)           # handler(keys) on every worker
+
+The NOTIFY is sent on the writing transaction's own connection, so it is
+delivered when (and only if) that transaction commits. listen() runs in the
+background of every worker; after losing its connection it calls each handler
+with keys=None, since notifications sent in the meantime are lost. On other
+databases invalidation stays local to the worker and the caches' TTLs bound
+how stale another worker can be.
+"""
+import asyncio
+import json
+import os
+import uuid
+
+from sqlalchemy import text
+
+from .database import async_engine
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+# Seconds between checks that the listening connection is still alive
+INVALIDATION_PING_INTERVAL = float(os.getenv("INVALIDATION_PING_INTERVAL", 30))
+INVALIDATION_RECONNECT_DELAY = 5  # seconds
+# NOTIFY payloads are limited to 8000 bytes, so long key lists are split
+NOTIFY_KEYS_PER_MESSAGE = 100
+
+# Identifies this process, which already invalidated its own caches on commit
+WORKER_ID = uuid.uuid4().hex
+
+# cache name -> handlers called with the invalidated keys, or None for everything
+_handlers = {}
+
+
+def subscribe(name: str, handler):
+    """Call handler(keys) when another worker invalidates the named cache."""
+    _handlers.setdefault(name, []).append(handler)
+
+
+def notify(session, name: str, keys=()):
+    """
+    Tell the other workers to invalidate keys of the named cache (the whole
+    cache if there are none) once the session's transaction commits.
+    """
+    connection = session.connection()
+    if connection.dialect.name != "postgresql":
+        return
+    keys = sorted(keys)
+    for start in range(0, max(len(keys), 1), NOTIFY_KEYS_PER_MESSAGE):
+        payload = json.dumps({
+            "worker": WORKER_ID,
+            "cache": name,
+            "keys": keys[start:start + NOTIFY_KEYS_PER_MESSAGE] or None,
+        })
+        connection.execute(text("SELECT pg_notify(:channel, :payload)"), {
+            "channel": INVALIDATION_CHANNEL, "payload": payload,
+        })
+
+
+def _dispatch(name: str, keys):
+    for handler in _handlers.get(name, ()):
+        try:
+            handler(keys)
+        except Exception as e:
+            print(f"Error invalidating cache {name}: {e}")
+
+
+def _dispatch_all():
+    for name in list(_handlers):
+        _dispatch(name, None)
+
+
+def _on_notification(connection, pid, channel, payload):
+    try:
+        message = json.loads(payload)
+    except ValueError:
+        print(f"Ignoring malformed cache invalidation: {payload!r}")
+        return
+    if message.get("worker") == WORKER_ID:
+        return
+    _dispatch(message.get("cache"), message.get("keys"))
+
+
+async def listen():
+    """Background task applying the other workers' invalidations (PostgreSQL only)."""
+    if async_engine.dialect.name != "postgresql":
+        return
+    while True:
+        try:
+            async with async_engine.connect() as connection:
+                raw_connection = await connection.get_raw_connection()
+                # Used directly: notifications are only delivered outside a transaction
+                listener = raw_connection.driver_connection
+                # Keep the listener off the pool; the connection is closed when we are done
+                raw_connection.detach()
+                await listener.add_listener(INVALIDATION_CHANNEL, _on_notification)
+                # Anything may have changed while nobody was listening
+                _dispatch_all()
+                while True:
+                    await asyncio.sleep(INVALIDATION_PING_INTERVAL)
+                    await listener.fetchval("SELECT 1")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Cache invalidation listener disconnected: {e}")
+            await asyncio.sleep(INVALIDATION_RECONNECT_DELAY)
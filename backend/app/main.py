@@ -1,5 +1,7 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request, status
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from sqlmodel import Session, select
@@ -16,7 +18,7 @@ if not hasattr(bcrypt, '__about__'):
 
 # Import models here to ensure they are registered with SQLModel metadata
 from . import models # This line is important
-from .database import create_db_and_tables, engine, get_session # Import engine if needed elsewhere, or just the function
+from .database import create_db_and_tables, engine, async_engine, async_replica_engine, get_session, mark_primary_sticky # Import engine if needed elsewhere, or just the function
 from .routers import entries # Import the entries router
 from .routers import auth # Import auth router
 from .routers import admin # Import admin router
@@ -24,8 +26,15 @@ from .routers import journals # Import journals router
 from .routers import editors # Import editors router
 from .routers import public # Import public router
 from . import crud
-from .security import get_password_hash
+from .security import PasswordPoolBusy, get_password_hash
 from .file_utils import UPLOAD_DIR
+from .query_stats import track_queries
+from .counters import entry_counters, flush_periodically
+from .analytics import prepare_partitions
+from .invalidation import listen as listen_for_invalidations
+from .outbox import deliver_periodically as deliver_queued_emails
+from .pending_notifications import flush_periodically as flush_pending_notifications
+from .email_templates import templates as email_templates
 
 @asynccontextmanager
 async def lifecycle(app: FastAPI):
@@ -35,7 +44,9 @@ async def lifecycle(app: FastAPI):
     # Note: In production, you should use Alembic migrations instead
     # Run `alembic upgrade head` before starting the application
     create_db_and_tables()
+    prepare_partitions()
     print("Database and tables created.")
+    print(f"Compiled {email_templates.load()} email templates.")
     
     # Create admin user if it doesn't exist and ADMIN creds are provided
     admin_email = os.getenv("ADMIN_EMAIL", "admin@admin.com")  # Default admin email
@@ -141,10 +152,27 @@ Logonun solunda yer alan kale burcu, geçmişin savunmacı kent yapısını, med
             updated_settings = crud.update_settings(db_session, settings_update)
             print(f"✅ Set journal 'Henüz Bir Dergiye Atanmamıştır' as active")
     
+    # Write buffered view/download counts in the background (see app/counters.py)
+    counter_flusher = asyncio.create_task(flush_periodically())
+    # Drop cached settings and responses when another worker changes them (see app/invalidation.py)
+    invalidation_listener = asyncio.create_task(listen_for_invalidations())
+    # Send queued notification emails (see app/outbox.py)
+    email_sender = asyncio.create_task(deliver_queued_emails())
+    # Queue coalesced update emails and daily digests (see app/pending_notifications.py)
+    notification_flusher = asyncio.create_task(flush_pending_notifications())
+    
     yield
     
     # Code to run on shutdown (if any)
     print("Shutting down...")
+    counter_flusher.cancel()
+    invalidation_listener.cancel()
+    email_sender.cancel()
+    notification_flusher.cancel()
+    entry_counters.flush()
+    await async_engine.dispose()
+    if async_replica_engine is not async_engine:
+        await async_replica_engine.dispose()
 
 app = FastAPI(lifespan=lifecycle)
 
@@ -171,6 +199,25 @@ app.add_middleware(
     allow_headers=["*"],         # Allow all headers
 )
 
+@app.middleware("http")
+async def keep_writers_on_primary(request: Request, call_next):
+    """Pin clients that just wrote to the primary database for a short while."""
+    response = await call_next(request)
+    mark_primary_sticky(request, response)
+    return response
+
+# Count SQL statements per request and flag N+1 patterns (see app/query_stats.py)
+app.middleware("http")(track_queries)
+
+@app.exception_handler(PasswordPoolBusy)
+async def password_pool_busy(request: Request, exc: PasswordPoolBusy):
+    """Ask clients to retry when too many password hashes are waiting (see security.PasswordHashPool)."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many login attempts at the moment, please try again."},
+        headers={"Retry-After": "1"},
+    )
+
 app.include_router(entries.router) # Include the entries router
 app.include_router(auth.router) # Include auth router
 app.include_router(admin.router) # Include admin router
@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List, Optional, Literal
 from enum import Enum
 import random
@@ -6,7 +6,12 @@ import string
 import pytz
 
 from sqlmodel import Field, Relationship, SQLModel
-from sqlalchemy import Enum as SAEnum, Column, Text, JSON
+from sqlalchemy import Enum as SAEnum, Column, Text, JSON, Index, DDL, event
+
+try:
+    from .text_utils import fold_text
+except ImportError:  # imported as a top-level module by app/seed.py
+    from text_utils import fold_text
 
 
 class UserRole(str, Enum):
@@ -49,6 +54,8 @@ class ArticleLanguage(str, Enum):
 # between Journal and User (editors)
 class JournalEditorLink(SQLModel, table=True):
     __tablename__ = "journal_editor_link"
+    # The primary key covers lookups by journal; this one covers lookups by editor
+    __table_args__ = (Index("ix_journal_editor_link_user_id_journal_id", "user_id", "journal_id"),)
     journal_id: Optional[int] = Field(
         default=None, foreign_key="journal.id", primary_key=True
     )
@@ -61,6 +68,7 @@ class JournalEditorLink(SQLModel, table=True):
 # between JournalEntry and User (authors)
 class JournalEntryAuthorLink(SQLModel, table=True):
     __tablename__ = "journal_entry_author_link"
+    __table_args__ = (Index("ix_journal_entry_author_link_user_id_journal_entry_id", "user_id", "journal_entry_id"),)
     journal_entry_id: Optional[int] = Field(
         default=None, foreign_key="journalentry.id", primary_key=True
     )
@@ -73,6 +81,7 @@ class JournalEntryAuthorLink(SQLModel, table=True):
 # between JournalEntry and User (referees)
 class JournalEntryRefereeLink(SQLModel, table=True):
     __tablename__ = "journal_entry_referee_link"
+    __table_args__ = (Index("ix_journal_entry_referee_link_user_id_journal_entry_id", "user_id", "journal_entry_id"),)
     journal_entry_id: Optional[int] = Field(
         default=None, foreign_key="journalentry.id", primary_key=True
     )
@@ -116,6 +125,14 @@ class User(UserBase, table=True):
     reset_password_token_created_at: Optional[datetime] = Field(default=None)
     tutorial_done: bool = Field(default=False)
     marked_for_deletion: bool = Field(default=False)
+    # Search copy of name, kept up to date on write (see FOLDED_COLUMNS)
+    name_folded: Optional[str] = Field(default=None, exclude=True)
+    # Version stamp for HTTP caching, bumped on every ORM update (see VERSIONED_MODELS)
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(pytz.timezone('Europe/Istanbul')).replace(tzinfo=None), exclude=True)
+    # Access tokens carry this as "ver"; bumping it revokes them (see auth.get_current_user)
+    token_version: int = Field(default=0, exclude=True)
+    # Entry update emails arrive as one daily digest (see app/pending_notifications.py)
+    notification_digest: bool = Field(default=False)
 
     chief_of_journals: List["Journal"] = Relationship(back_populates="editor_in_chief")
     editing_journals: List["Journal"] = Relationship(back_populates="editors", link_model=JournalEditorLink)
@@ -130,6 +147,7 @@ class UserRead(UserBase):
     id: int
     marked_for_deletion: bool = Field(default=False)
     tutorial_done: bool = Field(default=False)
+    notification_digest: bool = Field(default=False)
 
 
 # Define a User model for creation (including password)
@@ -160,7 +178,7 @@ class JournalBase(SQLModel):
     created_date: datetime = Field(default_factory=lambda: datetime.now(pytz.timezone('Europe/Istanbul')).replace(tzinfo=None))
     issue: str
     issue_en: Optional[str] = Field(default="")
-    is_published: bool = Field(default=False)
+    is_published: bool = Field(default=False, index=True)
     publication_date: Optional[datetime] = Field(default=None)  # Manually set publication date
     publication_place: Optional[str] = None
     cover_photo: Optional[str] = None  # Path to cover photo file
@@ -173,9 +191,14 @@ class JournalBase(SQLModel):
 
 # Define the Journal model for database table creation
 class Journal(JournalBase, table=True):
+    # Cursor pagination walks (created_date, id), see pagination.JOURNAL_KEYSET
+    __table_args__ = (Index("ix_journal_created_date_id", "created_date", "id"),)
     id: Optional[int] = Field(default=None, primary_key=True)
+    title_folded: Optional[str] = Field(default=None, exclude=True)
+    title_en_folded: Optional[str] = Field(default=None, exclude=True)
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(pytz.timezone('Europe/Istanbul')).replace(tzinfo=None), exclude=True)
     
-    editor_in_chief_id: Optional[int] = Field(default=None, foreign_key="users.id")
+    editor_in_chief_id: Optional[int] = Field(default=None, foreign_key="users.id", index=True)
     editor_in_chief: Optional["User"] = Relationship(back_populates="chief_of_journals")
     
     editors: List["User"] = Relationship(back_populates="editing_journals", link_model=JournalEditorLink)
@@ -240,14 +263,23 @@ class JournalEntryBase(SQLModel):
     full_pdf: Optional[str] = None  # Path to .pdf file
     download_count: int = Field(default=0)
     read_count: int = Field(default=0)
-    status: Optional[str] = None
+    status: Optional[str] = Field(default=None, index=True)
     journal_id: Optional[int] = Field(default=None, foreign_key="journal.id")
 
 
 # Define the JournalEntry model for database table creation
 class JournalEntry(JournalEntryBase, table=True):
     __tablename__ = "journalentry"
+    # Public/editor listings filter on journal and status together; cursor
+    # pagination walks (created_date, id)
+    __table_args__ = (
+        Index("ix_journalentry_journal_id_status", "journal_id", "status"),
+        Index("ix_journalentry_created_date_id", "created_date", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
+    title_folded: Optional[str] = Field(default=None, exclude=True)
+    title_en_folded: Optional[str] = Field(default=None, exclude=True)
+    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now(pytz.timezone('Europe/Istanbul')).replace(tzinfo=None), exclude=True)
 
     journal: Optional[Journal] = Relationship(back_populates="entries")
     authors: List["User"] = Relationship(back_populates="authored_entries", link_model=JournalEntryAuthorLink)
@@ -313,7 +345,7 @@ class AuthorUpdateBase(SQLModel):
     created_date: datetime = Field(default_factory=lambda: datetime.now(pytz.timezone('Europe/Istanbul')).replace(tzinfo=None))
 
     entry_id: int = Field(foreign_key="journalentry.id")
-    author_id: int = Field(foreign_key="users.id")
+    author_id: int = Field(foreign_key="users.id", index=True)
 
 
 # Add this new schema for creation request body
@@ -329,6 +361,10 @@ class AuthorUpdateCreate(SQLModel):
 
 class AuthorUpdate(AuthorUpdateBase, table=True):
     __tablename__ = "author_updates"
+    __table_args__ = (
+        Index("ix_author_updates_entry_id_created_date", "entry_id", "created_date"),
+        Index("ix_author_updates_created_date_id", "created_date", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
 
     entry: "JournalEntry" = Relationship(back_populates="author_updates")
@@ -341,7 +377,7 @@ class RefereeUpdateBase(SQLModel):
     notes: Optional[str] = Field(default=None, sa_column=Column(Text))
     created_date: datetime = Field(default_factory=lambda: datetime.now(pytz.timezone('Europe/Istanbul')).replace(tzinfo=None))
 
-    referee_id: int = Field(foreign_key="users.id")
+    referee_id: int = Field(foreign_key="users.id", index=True)
     entry_id: int = Field(foreign_key="journalentry.id")
 
 
@@ -353,6 +389,10 @@ class RefereeUpdateCreate(SQLModel):
 
 class RefereeUpdate(RefereeUpdateBase, table=True):
     __tablename__ = "referee_updates"
+    __table_args__ = (
+        Index("ix_referee_updates_entry_id_created_date", "entry_id", "created_date"),
+        Index("ix_referee_updates_created_date_id", "created_date", "id"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
 
     entry: "JournalEntry" = Relationship(back_populates="referee_updates")
@@ -384,10 +424,210 @@ class SettingsUpdate(SQLModel):
     about: Optional[str] = None
 
 
+# --------------------- Entry analytics models ---------------------
+# Views and downloads per entry and day (see app/analytics.py). There are no
+# foreign keys, so deleting an entry or journal keeps its history.
+
+# Prefix of the daily partitions of entry_activity on PostgreSQL
+ENTRY_ACTIVITY_PARTITION_PREFIX = "entry_activity_"
+
+
+# Raw counts, appended by every flush of the counter buffer (app/counters.py).
+# On PostgreSQL the table is partitioned by day so old days can be dropped.
+class EntryActivity(SQLModel, table=True):
+    __tablename__ = "entry_activity"
+    __table_args__ = {"postgresql_partition_by": "RANGE (day)"}
+    day: date = Field(primary_key=True)
+    entry_id: int = Field(primary_key=True)
+    flush_id: str = Field(primary_key=True, max_length=32)  # one row per entry, day and flush
+    reads: int = Field(default=0)
+    downloads: int = Field(default=0)
+
+
+# Nightly rollup of entry_activity per entry and day
+class EntryDailyStats(SQLModel, table=True):
+    __tablename__ = "entry_daily_stats"
+    entry_id: int = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    journal_id: Optional[int] = Field(default=None, index=True)
+    reads: int = Field(default=0)
+    downloads: int = Field(default=0)
+
+
+# Nightly rollup of entry_daily_stats per journal and day
+class JournalDailyStats(SQLModel, table=True):
+    __tablename__ = "journal_daily_stats"
+    journal_id: int = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    reads: int = Field(default=0)
+    downloads: int = Field(default=0)
+
+
+# --------------------- Email outbox ---------------------
+# Notification emails are written here in the transaction of the change they
+# announce and sent by a background worker (see app/outbox.py).
+
+class EmailOutboxStatus:
+    pending = "pending"  # waiting for its first attempt or a retry
+    sent = "sent"
+    dead = "dead"        # gave up after OUTBOX_MAX_ATTEMPTS
+
+
+class EmailOutbox(SQLModel, table=True):
+    __tablename__ = "email_outbox"
+    # The worker's poll: pending rows whose next attempt is due
+    __table_args__ = (Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),)
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(max_length=50)  # email kind (see app/email_templates.py)
+    payload: dict = Field(sa_column=Column(JSON, nullable=False))  # fields of the email template
+    status: str = Field(default=EmailOutboxStatus.pending, max_length=10)
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=lambda: datetime.now(pytz.timezone('Europe/Istanbul')).replace(tzinfo=None))
+    last_error: Optional[str] = Field(default=None, sa_column=Column(Text))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(pytz.timezone('Europe/Istanbul')).replace(tzinfo=None))
+    sent_at: Optional[datetime] = None
+
+
+# Entry update events waiting to be merged into one email per recipient and
+# entry, or into the recipient's daily digest (see app/pending_notifications.py)
+class PendingNotification(SQLModel, table=True):
+    __tablename__ = "pending_notifications"
+    __table_args__ = (
+        # The flush: events whose email is due
+        Index("ix_pending_notifications_deliver_after", "deliver_after"),
+        # Joining an open window when an event is recorded
+        Index("ix_pending_notifications_user_id_entry_id", "user_id", "entry_id"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int  # recipient
+    entry_id: int
+    kind: str = Field(max_length=50)  # email kind of the event on its own
+    payload: dict = Field(sa_column=Column(JSON, nullable=False))  # fields of that email but the recipient's
+    digest: bool = Field(default=False)  # part of the daily digest rather than a per-entry window
+    created_at: datetime = Field(default_factory=lambda: datetime.now(pytz.timezone('Europe/Istanbul')).replace(tzinfo=None))
+    deliver_after: datetime
+
+
+# --------------------- Folded search columns ---------------------
+# Accent- and Turkish-case-folded copies of names and titles, so searches can
+# use a plain LIKE on an indexed column. Refreshed on every ORM insert/update.
+FOLDED_COLUMNS = {
+    User: {"name_folded": "name"},
+    Journal: {"title_folded": "title", "title_en_folded": "title_en"},
+    JournalEntry: {"title_folded": "title", "title_en_folded": "title_en"},
+}
+
+
+def _refresh_folded_columns(mapper, connection, target):
+    for folded_column, source_column in FOLDED_COLUMNS[mapper.class_].items():
+        setattr(target, folded_column, fold_text(getattr(target, source_column)))
+
+
+for _model in FOLDED_COLUMNS:
+    event.listen(_model, "before_insert", _refresh_folded_columns)
+    event.listen(_model, "before_update", _refresh_folded_columns)
+
+
+# --------------------- Version stamps ---------------------
+# updated_at changes whenever what the public API shows of a row changes, so
+# it can be used for ETag/Last-Modified (see app/http_cache.py). The write-
+# behind view/download counters use Core UPDATEs and do not bump it.
+VERSIONED_MODELS = (User, Journal, JournalEntry)
+
+# Link rows are part of their parent's payload: (parent model, parent id column)
+LINK_PARENTS = {
+    JournalEditorLink: (Journal, "journal_id"),
+    JournalEntryAuthorLink: (JournalEntry, "journal_entry_id"),
+    JournalEntryRefereeLink: (JournalEntry, "journal_entry_id"),
+}
+
+
+def _local_now() -> datetime:
+    return datetime.now(pytz.timezone('Europe/Istanbul')).replace(tzinfo=None)
+
+
+def _touch(mapper, connection, target):
+    target.updated_at = _local_now()
+
+
+def _touch_link_parent(mapper, connection, target):
+    parent, parent_id_column = LINK_PARENTS[mapper.class_]
+    table = parent.__table__
+    connection.execute(
+        table.update().where(table.c.id == getattr(target, parent_id_column)).values(updated_at=_local_now())
+    )
+
+
+for _model in VERSIONED_MODELS:
+    event.listen(_model, "before_update", _touch)
+
+for _model in LINK_PARENTS:
+    event.listen(_model, "after_insert", _touch_link_parent)
+    event.listen(_model, "after_delete", _touch_link_parent)
+
+
 # Link models now that they are all defined
 User.update_forward_refs()
 Journal.update_forward_refs()
 JournalEntry.update_forward_refs()
 AuthorUpdate.update_forward_refs()
 RefereeUpdate.update_forward_refs()
-# JournalEntryProgress.update_forward_refs() 
\ No newline at end of file
+# JournalEntryProgress.update_forward_refs() 
+
+
+# --------------------- PostgreSQL-only search objects ---------------------
+# These are not mapped on the models: they are created by the DDL below when
+# create_all() runs on PostgreSQL, and by migrations (see alembic/env.py
+# UNMAPPED_SCHEMA_OBJECTS). Queries using them live in app/search.py.
+
+# Full-text search vector. The title follows the entry's language, the *_en
+# fields are English and the remaining fields Turkish.
+JOURNAL_ENTRY_SEARCH_VECTOR = """
+    setweight(to_tsvector(CASE WHEN language = 'en' THEN 'english'::regconfig ELSE 'turkish'::regconfig END, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(title_en, '')), 'A') ||
+    setweight(to_tsvector('turkish'::regconfig, coalesce(keywords, '')), 'B') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(keywords_en, '')), 'B') ||
+    setweight(to_tsvector('turkish'::regconfig, coalesce(abstract_tr, '')), 'C') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(abstract_en, '')), 'C')
+"""
+
+# Trigram indexes on the folded columns, used by LIKE '%...%' and by the
+# typo-tolerant lookups: (index name, table, column)
+TRIGRAM_INDEXES = [
+    ("ix_users_name_folded_trgm", "users", "name_folded"),
+    ("ix_journal_title_folded_trgm", "journal", "title_folded"),
+    ("ix_journal_title_en_folded_trgm", "journal", "title_en_folded"),
+    ("ix_journalentry_title_folded_trgm", "journalentry", "title_folded"),
+    ("ix_journalentry_title_en_folded_trgm", "journalentry", "title_en_folded"),
+]
+
+
+def _postgresql_ddl(target, when: str, statement: str):
+    event.listen(target, when, DDL(statement).execute_if(dialect="postgresql"))
+
+
+_postgresql_ddl(SQLModel.metadata, "before_create", "CREATE EXTENSION IF NOT EXISTS pg_trgm")
+_postgresql_ddl(
+    JournalEntry.__table__,
+    "after_create",
+    "ALTER TABLE journalentry ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({JOURNAL_ENTRY_SEARCH_VECTOR}) STORED",
+)
+_postgresql_ddl(
+    JournalEntry.__table__,
+    "after_create",
+    "CREATE INDEX IF NOT EXISTS ix_journalentry_search_vector ON journalentry USING gin (search_vector)",
+)
+for _index_name, _table_name, _column_name in TRIGRAM_INDEXES:
+    _postgresql_ddl(
+        SQLModel.metadata.tables[_table_name],
+        "after_create",
+        f"CREATE INDEX IF NOT EXISTS {_index_name} ON {_table_name} USING gin ({_column_name} gin_trgm_ops)",
+    )
+
+# Rows for days without their own partition (see app/analytics.py ensure_partitions)
+_postgresql_ddl(
+    EntryActivity.__table__,
+    "after_create",
+    f"CREATE TABLE IF NOT EXISTS {ENTRY_ACTIVITY_PARTITION_PREFIX}default PARTITION OF entry_activity DEFAULT",
+)
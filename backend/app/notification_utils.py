@@ -1,10 +1,8 @@
 from typing import List
 import os
-from sqlmodel import Session
-from . import models, email_utils
+from sqlmodel import Session, select
+from . import models, outbox, pending_notifications
 
-# Get the Brevo API key from environment variable
-BREVO_API_KEY = os.environ.get("BREVO_API_KEY", "")
 # Frontend base URL for building links
 FRONTEND_BASE_URL = os.environ.get("FRONTEND_BASE_URL", "http://localhost:5173")
 
@@ -15,7 +13,9 @@ def notify_on_author_update(
     author_update_id: int
 ):
     """
-    Notify all referees and editors about an author update.
+    Notify all referees and editors about an author update. The events are
+    recorded once the caller commits db and their emails are coalesced per
+    recipient (see app/pending_notifications.py).
     
     Args:
         db: Database session
@@ -47,33 +47,21 @@ def notify_on_author_update(
     
     # Notify all referees
     for referee in referees:
-        try:
-            email_utils.send_author_update_notification(
-                api_key=BREVO_API_KEY,
-                user_email=referee.email,
-                user_name=referee.name,
-                author_name=author.name,
-                entry_title=entry.title,
-                entry_id=entry_id,
-                base_url=FRONTEND_BASE_URL
-            )
-        except Exception as e:
-            print(f"Failed to send notification to referee {referee.id}: {e}")
+        pending_notifications.record_event(
+            db, referee, "author_update", entry_id,
+            author_name=author.name,
+            entry_title=entry.title,
+            base_url=FRONTEND_BASE_URL
+        )
 
     # Notify editor in chief
     if editor_in_chief and editor_in_chief.id != author_id:  # Don't notify if author is also editor
-        try:
-            email_utils.send_author_update_notification(
-                api_key=BREVO_API_KEY,
-                user_email=editor_in_chief.email,
-                user_name=editor_in_chief.name,
-                author_name=author.name,
-                entry_title=entry.title,
-                entry_id=entry_id,
-                base_url=FRONTEND_BASE_URL
-            )
-        except Exception as e:
-            print(f"Failed to send notification to editor in chief {editor_in_chief.id}: {e}")
+        pending_notifications.record_event(
+            db, editor_in_chief, "author_update", entry_id,
+            author_name=author.name,
+            entry_title=entry.title,
+            base_url=FRONTEND_BASE_URL
+        )
     
     # Get all editors associated with the journal
     if entry.journal_id:
@@ -87,18 +75,12 @@ def notify_on_author_update(
         # Notify editors (excluding editor in chief who was already notified)
         for editor in editors:
             if editor.id != author_id and (not editor_in_chief or editor.id != editor_in_chief.id):
-                try:
-                    email_utils.send_author_update_notification(
-                        api_key=BREVO_API_KEY,
-                        user_email=editor.email,
-                        user_name=editor.name,
-                        author_name=author.name,
-                        entry_title=entry.title,
-                        entry_id=entry_id,
-                        base_url=FRONTEND_BASE_URL
-                    )
-                except Exception as e:
-                    print(f"Failed to send notification to editor {editor.id}: {e}")
+                pending_notifications.record_event(
+                    db, editor, "author_update", entry_id,
+                    author_name=author.name,
+                    entry_title=entry.title,
+                    base_url=FRONTEND_BASE_URL
+                )
 
 
 def notify_on_referee_update(
@@ -108,7 +90,9 @@ def notify_on_referee_update(
     referee_update_id: int
 ):
     """
-    Notify all authors and editors about a referee update.
+    Notify all authors and editors about a referee update. The events are
+    recorded once the caller commits db and their emails are coalesced per
+    recipient (see app/pending_notifications.py).
     
     Args:
         db: Database session
@@ -140,33 +124,21 @@ def notify_on_referee_update(
     
     # Notify all authors
     for author in authors:
-        try:
-            email_utils.send_referee_update_notification(
-                api_key=BREVO_API_KEY,
-                user_email=author.email,
-                user_name=author.name,
-                referee_name=referee.name,
-                entry_title=entry.title,
-                entry_id=entry_id,
-                base_url=FRONTEND_BASE_URL
-            )
-        except Exception as e:
-            print(f"Failed to send notification to author {author.id}: {e}")
+        pending_notifications.record_event(
+            db, author, "referee_update", entry_id,
+            referee_name=referee.name,
+            entry_title=entry.title,
+            base_url=FRONTEND_BASE_URL
+        )
 
     # Notify editor in chief
     if editor_in_chief and editor_in_chief.id != referee_id:  # Don't notify if referee is also editor
-        try:
-            email_utils.send_referee_update_notification(
-                api_key=BREVO_API_KEY,
-                user_email=editor_in_chief.email,
-                user_name=editor_in_chief.name,
-                referee_name=referee.name,
-                entry_title=entry.title,
-                entry_id=entry_id,
-                base_url=FRONTEND_BASE_URL
-            )
-        except Exception as e:
-            print(f"Failed to send notification to editor in chief {editor_in_chief.id}: {e}")
+        pending_notifications.record_event(
+            db, editor_in_chief, "referee_update", entry_id,
+            referee_name=referee.name,
+            entry_title=entry.title,
+            base_url=FRONTEND_BASE_URL
+        )
     
     # Get all editors associated with the journal
     if entry.journal_id:
@@ -180,15 +152,76 @@ def notify_on_referee_update(
         # Notify editors (excluding editor in chief who was already notified)
         for editor in editors:
             if editor.id != referee_id and (not editor_in_chief or editor.id != editor_in_chief.id):
-                try:
-                    email_utils.send_referee_update_notification(
-                        api_key=BREVO_API_KEY,
-                        user_email=editor.email,
-                        user_name=editor.name,
-                        referee_name=referee.name,
-                        entry_title=entry.title,
-                        entry_id=entry_id,
-                        base_url=FRONTEND_BASE_URL
-                    )
-                except Exception as e:
-                    print(f"Failed to send notification to editor {editor.id}: {e}") 
\ No newline at end of file
+                pending_notifications.record_event(
+                    db, editor, "referee_update", entry_id,
+                    referee_name=referee.name,
+                    entry_title=entry.title,
+                    base_url=FRONTEND_BASE_URL
+                )
+
+
+def _linked_users(db: Session, link_model, entry_id: int) -> List[models.User]:
+    # Queried rather than read from entry.authors/referees, which may predate
+    # link changes made earlier in the same transaction
+    return db.exec(
+        select(models.User)
+        .join(link_model, link_model.user_id == models.User.id)
+        .where(link_model.journal_entry_id == entry_id)
+    ).all()
+
+
+def notify_on_referee_assignment(
+    db: Session,
+    entry: models.JournalEntry,
+    referee: models.User
+):
+    """
+    Notify all authors of an entry that a referee was assigned to it. The
+    emails are queued in the outbox and sent once the caller commits db.
+
+    Args:
+        db: Database session
+        entry: The journal entry the referee was assigned to
+        referee: The assigned referee
+    """
+    for author in _linked_users(db, models.JournalEntryAuthorLink, entry.id):
+        if author.email:
+            outbox.enqueue(
+                db, "referee_assignment",
+                user_email=author.email,
+                user_name=author.name,
+                referee_name=referee.name,
+                entry_title=entry.title,
+                entry_id=entry.id
+            )
+
+
+def notify_on_status_change(
+    db: Session,
+    entry: models.JournalEntry,
+    old_status: str,
+    new_status: str
+):
+    """
+    Notify all authors and referees of an entry that its status changed. The
+    emails are queued in the outbox and sent once the caller commits db.
+
+    Args:
+        db: Database session
+        entry: The journal entry whose status changed
+        old_status: Previous status of the entry
+        new_status: New status of the entry
+    """
+    authors = _linked_users(db, models.JournalEntryAuthorLink, entry.id)
+    referees = _linked_users(db, models.JournalEntryRefereeLink, entry.id)
+    for user in authors + referees:
+        if user.email:
+            outbox.enqueue(
+                db, "status_update",
+                user_email=user.email,
+                user_name=user.name,
+                entry_title=entry.title,
+                entry_id=entry.id,
+                old_status=getattr(old_status, "value", old_status),
+                new_status=getattr(new_status, "value", new_status)
+            )
@@ -0,0 +1,195 @@
+"""
+Transactional outbox for notification emails.
+
+Status changes, author/referee updates and referee assignments used to call
+Brevo inside the request, one HTTP call per recipient. They now only add an
+email_outbox row per recipient to the session of the change they announce:
+
+    outbox.enqueue(db, "status_update", user_email=..., user_name=..., ...)
+    db.commit()   # the change and its emails are committed together
+
+so a rolled back change sends nothing and a committed one is never lost.
+deliver_periodically() runs in the background of every worker. It claims due
+rows (FOR UPDATE SKIP LOCKED on PostgreSQL, so workers never claim the same
+row), sends them outside any transaction and records the outcome. A failed
+send is retried with exponential backoff; after OUTBOX_MAX_ATTEMPTS the row
+is marked dead and stays in the table for an admin to inspect and retry.
+
+Claiming a row pushes its next attempt OUTBOX_CLAIM_TIMEOUT seconds ahead, so
+rows claimed by a worker that died are picked up again. Delivery is therefore
+at least once: a worker dying between sending and recording may send twice.
+"""
+import asyncio
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytz
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+
+from . import email_templates, email_utils, models
+from .database import engine
+
+BREVO_API_KEY = os.environ.get("BREVO_API_KEY", "")
+# Emails are only queued and sent with an API key, or to the fake transport
+DELIVERY_ENABLED = bool(BREVO_API_KEY) or email_utils.EMAIL_TRANSPORT == "fake"
+
+# Seconds between polls when there is nothing left to send
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 5))
+# Rows claimed per poll
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 50))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+# Delay before the first retry, doubled for every further one up to the maximum
+OUTBOX_RETRY_BASE_DELAY = float(os.getenv("OUTBOX_RETRY_BASE_DELAY", 30))  # seconds
+OUTBOX_RETRY_MAX_DELAY = 6 * 60 * 60  # seconds
+# How long a claimed row is left to its worker before others may retry it
+OUTBOX_CLAIM_TIMEOUT = 5 * 60  # seconds
+
+def _now() -> datetime:
+    return datetime.now(pytz.timezone('Europe/Istanbul')).replace(tzinfo=None)
+
+
+def enqueue(db: Session, kind: str, **payload):
+    """
+    Add an email to the session; it is sent after the caller commits. Without
+    a Brevo API key (or the fake transport) nothing is queued, as nothing
+    was sent before the outbox.
+    """
+    if kind not in email_templates.templates.kinds:
+        raise ValueError(f"Unknown email kind: {kind}")
+    if not DELIVERY_ENABLED:
+        return None
+    message = models.EmailOutbox(kind=kind, payload=payload)
+    db.add(message)
+    return message
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait after the given number of failed attempts."""
+    return min(OUTBOX_RETRY_BASE_DELAY * 2 ** (attempts - 1), OUTBOX_RETRY_MAX_DELAY)
+
+
+def claim_due(bind=engine, limit: int = OUTBOX_BATCH_SIZE) -> list:
+    """Claim up to limit due rows and return (id, kind, payload, attempts) for each."""
+    outbox = models.EmailOutbox
+    now = _now()
+    with Session(bind) as db:
+        statement = (
+            select(outbox)
+            .where(outbox.status == models.EmailOutboxStatus.pending, outbox.next_attempt_at <= now)
+            .order_by(outbox.next_attempt_at, outbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        messages = db.exec(statement).all()
+        claimed = []
+        for message in messages:
+            message.attempts += 1
+            message.next_attempt_at = now + timedelta(seconds=OUTBOX_CLAIM_TIMEOUT)
+            claimed.append((message.id, message.kind, dict(message.payload), message.attempts))
+        db.commit()
+    return claimed
+
+
+def _record(bind, message_ids: list, **values):
+    outbox = models.EmailOutbox
+    with bind.begin() as connection:
+        connection.execute(update(outbox).where(outbox.id.in_(message_ids)).values(**values))
+
+
+def _shared_fields(payload: dict) -> dict:
+    return {key: value for key, value in payload.items() if key not in email_templates.PER_RECIPIENT_FIELDS}
+
+
+def deliver(kind: str, messages: list, bind=engine) -> bool:
+    """
+    Send claimed rows of one kind that share all but the recipient fields, as
+    one batch, and record the outcome. messages are (id, payload, attempts).
+    Returns whether they were sent.
+    """
+    message_ids = [message_id for message_id, _, _ in messages]
+    recipients = [(payload["user_email"], payload["user_name"]) for _, payload, _ in messages]
+    try:
+        if kind not in email_templates.templates.kinds:
+            raise ValueError(f"Unknown email kind: {kind}")
+        email_utils.send_email_batch(BREVO_API_KEY, kind, recipients, **_shared_fields(messages[0][1]))
+    except Exception as e:
+        error = str(e) or type(e).__name__
+        for message_id, _, attempts in messages:
+            if kind not in email_templates.templates.kinds or attempts >= OUTBOX_MAX_ATTEMPTS:
+                print(f"Giving up on email {message_id} ({kind}) after {attempts} attempts: {error}")
+                _record(bind, [message_id], status=models.EmailOutboxStatus.dead, last_error=error)
+            else:
+                print(f"Failed to send email {message_id} ({kind}), attempt {attempts}: {error}")
+                _record(
+                    bind, [message_id], last_error=error,
+                    next_attempt_at=_now() + timedelta(seconds=retry_delay(attempts)),
+                )
+        return False
+    _record(bind, message_ids, status=models.EmailOutboxStatus.sent, sent_at=_now())
+    return True
+
+
+def deliver_pending(bind=engine) -> int:
+    """
+    Send one batch of due rows and return how many were claimed. Rows that
+    only differ in their recipient (say, a status change announced to all
+    authors and referees) go out in a single provider call.
+    """
+    claimed = claim_due(bind)
+    batches = defaultdict(list)
+    for message_id, kind, payload, attempts in claimed:
+        key = (kind, json.dumps(_shared_fields(payload), sort_keys=True))
+        batches[key].append((message_id, payload, attempts))
+    for (kind, _), messages in batches.items():
+        deliver(kind, messages, bind=bind)
+    return len(claimed)
+
+
+async def deliver_periodically():
+    """Background task sending due rows, polling every OUTBOX_POLL_INTERVAL seconds when idle."""
+    if not DELIVERY_ENABLED:
+        return
+    while True:
+        try:
+            claimed = await asyncio.to_thread(deliver_pending)
+        except Exception as e:
+            print(f"Error delivering queued emails: {e}")
+            claimed = 0
+        # A full batch suggests a backlog, so go again right away
+        if claimed < OUTBOX_BATCH_SIZE:
+            await asyncio.sleep(OUTBOX_POLL_INTERVAL)
+
+
+def requeue_dead(db: Session) -> int:
+    """Give the dead rows a fresh set of attempts and return how many there were."""
+    outbox = models.EmailOutbox
+    result = db.execute(
+        update(outbox).where(outbox.status == models.EmailOutboxStatus.dead).values(
+            status=models.EmailOutboxStatus.pending, attempts=0, next_attempt_at=_now(),
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+def stats(db: Session) -> dict:
+    """Row counts per status and the age of the oldest due pending row."""
+    outbox = models.EmailOutbox
+    counts = dict(db.exec(select(outbox.status, func.count()).group_by(outbox.status)).all())
+    now = _now()
+    oldest_due = db.exec(
+        select(func.min(outbox.next_attempt_at)).where(
+            outbox.status == models.EmailOutboxStatus.pending, outbox.next_attempt_at <= now
+        )
+    ).one()
+    return {
+        "pending": counts.get(models.EmailOutboxStatus.pending, 0),
+        "sent": counts.get(models.EmailOutboxStatus.sent, 0),
+        "dead": counts.get(models.EmailOutboxStatus.dead, 0),
+        "oldest_due_seconds": round((now - oldest_due).total_seconds(), 1) if oldest_due else None,
+        "delivering": DELIVERY_ENABLED,
+        "transports": email_utils.transport_stats(),
+    }
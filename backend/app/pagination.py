@@ -0,0 +1,158 @@
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+List endpoints accept `cursor` next to the old `skip`/`limit`. Without a
+cursor they behave as before and return a plain list. With a cursor (an empty
+value asks for the first page) they return a Page envelope:
+
+    {"items": [...], "next_cursor": "<opaque>" | null}
+
+The cursor encodes the sort key of the last returned row, so the next page is
+read with `WHERE (created_date, id) < (...)` from an index instead of skipping
+over all previous rows, and rows inserted meanwhile do not shift the pages.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Generic, List, Optional, TypeVar, Union
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import tuple_
+
+from . import models
+
+T = TypeVar("T")
+
+MAX_PAGE_SIZE = 500
+
+
+class Page(BaseModel, Generic[T]):
+    """One page of a cursor-paginated list."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+def paged(model):
+    """response_model for endpoints that return a list or, with a cursor, a Page."""
+    return Union[List[model], Page[model]]
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: list) -> str:
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list):
+            raise ValueError("cursor must encode a list")
+        return [_decode_value(value) for value in values]
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+class Keyset:
+    """The unique sort key a list is paginated on, e.g. (created_date, id) newest first."""
+
+    def __init__(self, *columns, descending: bool = False):
+        self.columns = columns
+        self.descending = descending
+
+    def order_by(self, statement):
+        return statement.order_by(None).order_by(
+            *(column.desc() if self.descending else column.asc() for column in self.columns)
+        )
+
+    def after(self, statement, values: list):
+        if len(values) != len(self.columns):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor"
+            )
+        key = tuple_(*self.columns)
+        return statement.where(key < tuple_(*values) if self.descending else key > tuple_(*values))
+
+    def values_of(self, item) -> list:
+        if isinstance(item, dict):
+            return [item[column.key] for column in self.columns]
+        return [getattr(item, column.key) for column in self.columns]
+
+
+USER_KEYSET = Keyset(models.User.id)
+JOURNAL_KEYSET = Keyset(models.Journal.created_date, models.Journal.id, descending=True)
+ENTRY_KEYSET = Keyset(models.JournalEntry.created_date, models.JournalEntry.id, descending=True)
+AUTHOR_UPDATE_KEYSET = Keyset(models.AuthorUpdate.created_date, models.AuthorUpdate.id, descending=True)
+REFEREE_UPDATE_KEYSET = Keyset(models.RefereeUpdate.created_date, models.RefereeUpdate.id, descending=True)
+JOURNAL_EDITOR_LINK_KEYSET = Keyset(models.JournalEditorLink.journal_id, models.JournalEditorLink.user_id)
+ENTRY_AUTHOR_LINK_KEYSET = Keyset(models.JournalEntryAuthorLink.journal_entry_id, models.JournalEntryAuthorLink.user_id)
+ENTRY_REFEREE_LINK_KEYSET = Keyset(models.JournalEntryRefereeLink.journal_entry_id, models.JournalEntryRefereeLink.user_id)
+
+
+class PageParams:
+    """
+    Dependency holding the pagination query parameters of a list endpoint.
+
+    Usage:
+        statement = page.apply(select(models.Journal), JOURNAL_KEYSET)
+        return page.respond(db.exec(statement).all(), JOURNAL_KEYSET)
+    """
+
+    def __init__(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = Query(None, description="Opaque cursor from next_cursor; empty for the first page"),
+    ):
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+        # skip/limit keep their old, unchecked meaning; cursor pages are bounded
+        self.page_size = min(max(limit, 1), MAX_PAGE_SIZE)
+
+    @property
+    def uses_cursor(self) -> bool:
+        return self.cursor is not None
+
+    def apply(self, statement, keyset: Keyset, offset: bool = True):
+        """
+        Restrict the statement to the requested page. With offset=False the
+        legacy (cursor-less) request is left unpaginated, for endpoints that
+        have always returned everything.
+        """
+        if not self.uses_cursor:
+            return statement.offset(self.skip).limit(self.limit) if offset else statement
+        statement = keyset.order_by(statement)
+        if self.cursor:
+            statement = keyset.after(statement, decode_cursor(self.cursor))
+        # One extra row tells whether there is a next page
+        return statement.limit(self.page_size + 1)
+
+    def respond(self, rows, keyset: Keyset):
+        """Return rows as the legacy list, or as a Page when a cursor was given."""
+        rows = list(rows)
+        if not self.uses_cursor:
+            return rows
+        items = rows[:self.page_size]
+        next_cursor = None
+        if len(rows) > self.page_size:
+            next_cursor = encode_cursor(keyset.values_of(items[-1]))
+        return Page(items=items, next_cursor=next_cursor)
@@ -0,0 +1,216 @@
+"""
+Coalescing of entry update emails per recipient.
+
+An author uploading several revisions in a row used to send every referee and
+editor one email per revision. notify_on_author_update and
+notify_on_referee_update now record each event for each recipient as a
+pending_notifications row instead:
+
+    pending_notifications.record_event(db, referee, "author_update", entry.id, ...)
+    db.commit()
+
+The first event of a recipient on an entry opens a window of
+NOTIFICATION_COALESCE_MINUTES; later events on that entry join it until it is
+due. Recipients who opted into notification_digest get their events in one
+email a day, at NOTIFICATION_DIGEST_HOUR (Istanbul time), whatever the entry.
+
+flush_periodically() runs in the background of every worker. It takes the due
+rows a whole window or digest at a time (FOR UPDATE SKIP LOCKED on
+PostgreSQL) and, in the same transaction, deletes them and queues their
+emails in the outbox (see app/outbox.py): the original email for a lone
+event, entry_activity for a window with several, and digest for a day's
+events.
+"""
+import asyncio
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytz
+from sqlalchemy import and_, case, delete, func, null, or_, true
+from sqlmodel import Session, select
+
+from . import email_templates, models, outbox
+from .database import engine
+
+# Minutes an entry's events are collected before one email goes out; 0 sends each right away
+NOTIFICATION_COALESCE_MINUTES = float(os.getenv("NOTIFICATION_COALESCE_MINUTES", 10))
+# Hour of the day (Istanbul time) daily digests are sent at
+NOTIFICATION_DIGEST_HOUR = int(os.getenv("NOTIFICATION_DIGEST_HOUR", 8))
+# Seconds between flushes of due events
+NOTIFICATION_FLUSH_INTERVAL = float(os.getenv("NOTIFICATION_FLUSH_INTERVAL", 30))
+# Rows taken per flush
+NOTIFICATION_FLUSH_BATCH_SIZE = int(os.getenv("NOTIFICATION_FLUSH_BATCH_SIZE", 500))
+
+
+def _now() -> datetime:
+    return datetime.now(pytz.timezone('Europe/Istanbul')).replace(tzinfo=None)
+
+
+def next_digest_at(now: datetime) -> datetime:
+    """The first digest time after now."""
+    digest_at = now.replace(hour=NOTIFICATION_DIGEST_HOUR, minute=0, second=0, microsecond=0)
+    return digest_at if digest_at > now else digest_at + timedelta(days=1)
+
+
+def record_event(db: Session, recipient: models.User, kind: str, entry_id: int, **fields):
+    """
+    Add an event for recipient to the session; its email is queued when the
+    recipient's window or digest is due. fields are those of the kind's email
+    but the recipient's, which are read when the email is queued.
+    """
+    if kind not in email_templates.EVENT_ITEMS:
+        raise ValueError(f"Unknown event kind: {kind}")
+    if not outbox.DELIVERY_ENABLED or not recipient.email:
+        return None
+    now = _now()
+    digest = recipient.notification_digest
+    if digest:
+        deliver_after = next_digest_at(now)
+    elif NOTIFICATION_COALESCE_MINUTES <= 0:
+        return outbox.enqueue(
+            db, kind, user_email=recipient.email, user_name=recipient.name, entry_id=entry_id, **fields
+        )
+    else:
+        # Join the recipient's open window on this entry, if any
+        pending = models.PendingNotification
+        deliver_after = db.exec(
+            select(func.min(pending.deliver_after)).where(
+                pending.user_id == recipient.id,
+                pending.entry_id == entry_id,
+                pending.digest.is_(False),
+                pending.deliver_after > now,
+            )
+        ).one()
+        if deliver_after is None:
+            deliver_after = now + timedelta(minutes=NOTIFICATION_COALESCE_MINUTES)
+    event = models.PendingNotification(
+        user_id=recipient.id, entry_id=entry_id, kind=kind,
+        payload={"entry_id": entry_id, **fields}, digest=digest,
+        created_at=now, deliver_after=deliver_after,
+    )
+    db.add(event)
+    return event
+
+
+def _queue_email(db: Session, user: models.User, events: list, digest: bool):
+    """Queue the email announcing events, rows of one user (and entry, unless digest) in order."""
+    recipient = {"user_email": user.email, "user_name": user.name}
+    if len(events) == 1 and not digest:
+        outbox.enqueue(db, events[0].kind, **recipient, **events[0].payload)
+        return
+    items = [
+        (event.kind, {**event.payload, "time": event.created_at.strftime("%d.%m.%Y %H:%M")})
+        for event in events
+    ]
+    fields = {
+        "count": len(events),
+        "events_tr": email_templates.render_events(items, "tr"),
+        "events_en": email_templates.render_events(items, "en"),
+    }
+    latest = events[-1].payload
+    if "base_url" in latest:
+        fields["base_url"] = latest["base_url"]
+    if digest:
+        outbox.enqueue(db, "digest", **recipient, **fields)
+    else:
+        outbox.enqueue(
+            db, "entry_activity", **recipient, **fields,
+            entry_id=latest["entry_id"], entry_title=latest["entry_title"],
+        )
+
+
+def _group_entry_id(pending):
+    """The entry part of an event's group: its entry, or NULL for digest events, which span entries."""
+    return case((pending.digest.is_(True), null()), else_=pending.entry_id)
+
+
+def flush_due(bind=engine, limit: int = NOTIFICATION_FLUSH_BATCH_SIZE) -> int:
+    """
+    Queue the emails of due events, about limit of them, and return how many
+    were taken. Events are taken in whole groups, one per email, so a window
+    or digest is never split between two emails: groups are picked first and
+    only those whose due events could all be locked are taken. The rest are
+    left to the next flush.
+    """
+    pending = models.PendingNotification
+    group_entry_id = _group_entry_id(pending)
+    now = _now()
+    due = pending.deliver_after <= now
+    with Session(bind) as db:
+        keys = db.exec(
+            select(pending.user_id, pending.digest, group_entry_id, func.count())
+            .where(due)
+            .group_by(pending.user_id, pending.digest, group_entry_id)
+            .order_by(func.min(pending.deliver_after))
+            .limit(limit)
+        ).all()
+        # Whole groups up to limit events, and at least one group
+        sizes = {}
+        for user_id, digest, entry_id, count in keys:
+            if sizes and sum(sizes.values()) + count > limit:
+                break
+            sizes[user_id, digest, entry_id] = count
+        if not sizes:
+            return 0
+        events = db.exec(
+            select(pending)
+            .where(due, or_(*(
+                and_(
+                    pending.user_id == user_id,
+                    pending.digest.is_(digest),
+                    true() if digest else pending.entry_id == entry_id,
+                )
+                for user_id, digest, entry_id in sizes
+            )))
+            .with_for_update(skip_locked=True)
+        ).all()
+        groups = defaultdict(list)
+        for event in events:
+            groups[event.user_id, event.digest, None if event.digest else event.entry_id].append(event)
+        # Another flusher holds part of a group (or took it since): leave it whole
+        groups = {key: group for key, group in groups.items() if len(group) == sizes[key]}
+        if not groups:
+            return 0
+        user_ids = {user_id for user_id, _, _ in groups}
+        users = {user.id: user for user in db.exec(select(models.User).where(models.User.id.in_(user_ids))).all()}
+        taken = []
+        for (user_id, digest, _), group in groups.items():
+            taken.extend(event.id for event in group)
+            user = users.get(user_id)
+            if not user or not user.email:
+                print(f"Dropping {len(group)} notifications for missing user {user_id}")
+                continue
+            group.sort(key=lambda event: (event.created_at, event.id))
+            _queue_email(db, user, group, digest)
+        db.execute(delete(pending).where(pending.id.in_(taken)))
+        db.commit()
+    return len(taken)
+
+
+async def flush_periodically():
+    """Background task queueing the emails of due events every NOTIFICATION_FLUSH_INTERVAL seconds."""
+    if not outbox.DELIVERY_ENABLED:
+        return
+    while True:
+        try:
+            taken = await asyncio.to_thread(flush_due)
+        except Exception as e:
+            print(f"Error flushing pending notifications: {e}")
+            taken = 0
+        # A full batch suggests a backlog, so go again right away
+        if taken < NOTIFICATION_FLUSH_BATCH_SIZE:
+            await asyncio.sleep(NOTIFICATION_FLUSH_INTERVAL)
+
+
+def stats(db: Session) -> dict:
+    """Waiting events, how many of them are for digests and the age of the oldest due one."""
+    pending = models.PendingNotification
+    counts = dict(db.exec(select(pending.digest, func.count()).group_by(pending.digest)).all())
+    now = _now()
+    oldest_due = db.exec(select(func.min(pending.deliver_after)).where(pending.deliver_after <= now)).one()
+    return {
+        "waiting": sum(counts.values()),
+        "digest": counts.get(True, 0),
+        "oldest_due_seconds": round((now - oldest_due).total_seconds(), 1) if oldest_due else None,
+    }
@@ -0,0 +1,133 @@
+"""
+Who may do what with a journal entry.
+
+Admins and owners may do anything. Everyone else gets the actions of their
+relations to the entry: author, referee, or editor of the entry's journal
+(editor role only). One query answers all three relations, and the answer is
+kept for the rest of the request:
+
+    def handler(entry_id: int, permissions: Permissions = Depends()):
+        permissions.require_entry(entry_id, "edit", "You don't have permission to update this entry.")
+
+The editor scope helpers at the end restrict a statement to the journals an
+editor manages, as a subquery, so a scoped listing is a single statement.
+"""
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import exists, false, literal, select, union
+from sqlmodel import Session
+
+from . import auth, models
+from .database import get_session
+
+# Relations to an entry that allow each action
+ENTRY_ACTIONS = {
+    "read": {"author", "referee", "editor"},    # the entry and its updates
+    "edit": {"author", "editor"},               # the entry, its files, author updates
+    "review": {"referee", "editor"},            # referee updates
+}
+
+PRIVILEGED_ROLES = (models.UserRole.admin, models.UserRole.owner)
+
+
+def entry_relations_statement(user: models.User, entry_id: int):
+    """One row with (author?, referee?, editor?) for the entry, or no row if it does not exist."""
+    entry = models.JournalEntry
+    author_link = models.JournalEntryAuthorLink
+    referee_link = models.JournalEntryRefereeLink
+    editor_link = models.JournalEditorLink
+    if user.role == models.UserRole.editor:
+        is_editor = exists().where(editor_link.journal_id == entry.journal_id, editor_link.user_id == user.id)
+    else:
+        is_editor = false()
+    return select(
+        exists().where(author_link.journal_entry_id == entry.id, author_link.user_id == user.id),
+        exists().where(referee_link.journal_entry_id == entry.id, referee_link.user_id == user.id),
+        is_editor,
+    ).where(entry.id == entry_id)
+
+
+class Permissions:
+    """Permission checks for the current user, memoized per request (use as a dependency)."""
+
+    def __init__(
+        self,
+        db: Session = Depends(get_session),
+        current_user: models.User = Depends(auth.get_current_active_user),
+    ):
+        self.db = db
+        self.user = current_user
+        # entry id -> relations, or None for a missing entry
+        self._entry_relations = {}
+
+    @property
+    def is_privileged(self) -> bool:
+        return self.user.role in PRIVILEGED_ROLES
+
+    def entry_relations(self, entry_id: int) -> Optional[frozenset]:
+        """The user's relations to the entry, or None if there is no such entry."""
+        if entry_id not in self._entry_relations:
+            row = self.db.exec(entry_relations_statement(self.user, entry_id)).first()
+            if row is None:
+                relations = None
+            else:
+                relations = frozenset(
+                    name for name, related in zip(("author", "referee", "editor"), row) if related
+                )
+            self._entry_relations[entry_id] = relations
+        return self._entry_relations[entry_id]
+
+    def can_entry(self, entry_id: int, action: str) -> bool:
+        """Whether the user may perform the action on an existing entry."""
+        relations = self.entry_relations(entry_id)
+        if relations is None:
+            return False
+        return self.is_privileged or bool(relations & ENTRY_ACTIONS[action])
+
+    def require_entry(self, entry_id: int, action: str, detail: str):
+        """Raise 404 if the entry does not exist and 403 if the user may not perform the action."""
+        if self.entry_relations(entry_id) is None:
+            raise HTTPException(status_code=404, detail="Journal entry not found")
+        if not self.can_entry(entry_id, action):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+
+# --------------------- Editor scope ---------------------
+# The journals an editor manages are those of their journal_editor_link rows.
+
+def editor_journal_ids(user_id: int):
+    """Subquery of the ids of the journals the user edits."""
+    link = models.JournalEditorLink
+    return select(link.journal_id).where(link.user_id == user_id)
+
+
+def editor_entry_ids(user_id: int):
+    """Subquery of the ids of the entries in journals the user edits."""
+    entry = models.JournalEntry
+    link = models.JournalEditorLink
+    return select(entry.id).join(link, link.journal_id == entry.journal_id).where(link.user_id == user_id)
+
+
+def editor_related_user_ids(user_id: int):
+    """
+    Subquery of the editor, the other editors of their journals and the
+    authors and referees of the entries in them.
+    """
+    editor_link = models.JournalEditorLink
+    author_link = models.JournalEntryAuthorLink
+    referee_link = models.JournalEntryRefereeLink
+    return union(
+        select(literal(user_id)),
+        select(editor_link.user_id).where(editor_link.journal_id.in_(editor_journal_ids(user_id))),
+        select(author_link.user_id).where(author_link.journal_entry_id.in_(editor_entry_ids(user_id))),
+        select(referee_link.user_id).where(referee_link.journal_entry_id.in_(editor_entry_ids(user_id))),
+    )
+
+
+def edits_journal(db: Session, user_id: int, journal_id: int) -> bool:
+    """Whether the user is one of the journal's editors."""
+    link = models.JournalEditorLink
+    # SQLAlchemy's select: scalar() returns the EXISTS value itself, not a row
+    # (which would always be truthy)
+    return db.scalar(select(exists().where(link.journal_id == journal_id, link.user_id == user_id)))
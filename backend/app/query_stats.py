@@ -0,0 +1,172 @@
+"""
+Per-request SQL statistics.
+
+Every statement executed through any engine is counted against the current
+request (number of queries, time spent in the database and how often each
+statement shape repeats). A shape that repeats DB_N_PLUS_ONE_THRESHOLD times or
+more in one request is reported as a likely N+1 (e.g. lazy loading
+entry.authors inside a loop).
+
+With DB_QUERY_DEBUG=true the numbers are also returned as X-DB-* response
+headers. Per-route totals are always collected and exposed by
+GET /admin/health/queries.
+"""
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DB_QUERY_DEBUG = os.getenv("DB_QUERY_DEBUG", "false").lower() in ("1", "true", "yes")
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", 5))
+
+# Collapse whitespace and expanded IN (...) lists so that the same query with
+# different parameters maps to one shape
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%\([^)]*\)s|\$\d+)(?:\s*,\s*(?:\?|%\([^)]*\)s|\$\d+))*\s*\)")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so repeated queries can be recognised."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    return _PLACEHOLDER_LIST.sub("(?)", shape)
+
+
+class RequestQueryStats:
+    """Statements executed while handling a single request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement: str, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated_shapes(self) -> list:
+        """Statement shapes that ran often enough to look like an N+1."""
+        return [
+            {"statement": shape, "count": count}
+            for shape, count in self.shapes.most_common()
+            if count >= DB_N_PLUS_ONE_THRESHOLD
+        ]
+
+
+class RouteQueryStats:
+    """Aggregated query statistics per route, shared by all requests of a worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def observe(self, route: str, stats: RequestQueryStats):
+        repeated = stats.repeated_shapes()
+        with self._lock:
+            entry = self._routes.setdefault(route, {
+                "requests": 0,
+                "queries": 0,
+                "max_queries": 0,
+                "db_time_ms": 0.0,
+                "max_db_time_ms": 0.0,
+                "n_plus_one_requests": 0,
+                "repeated_statements": {},
+            })
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["max_queries"] = max(entry["max_queries"], stats.count)
+            entry["db_time_ms"] += stats.total_ms
+            entry["max_db_time_ms"] = max(entry["max_db_time_ms"], stats.total_ms)
+            if repeated:
+                entry["n_plus_one_requests"] += 1
+                for item in repeated:
+                    seen = entry["repeated_statements"].get(item["statement"], 0)
+                    entry["repeated_statements"][item["statement"]] = max(seen, item["count"])
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            summary = {}
+            for route, entry in self._routes.items():
+                requests = entry["requests"]
+                summary[route] = {
+                    "requests": requests,
+                    "avg_queries": round(entry["queries"] / requests, 2),
+                    "max_queries": entry["max_queries"],
+                    "avg_db_time_ms": round(entry["db_time_ms"] / requests, 3),
+                    "max_db_time_ms": round(entry["max_db_time_ms"], 3),
+                    "n_plus_one_requests": entry["n_plus_one_requests"],
+                    "repeated_statements": [
+                        {"statement": statement, "max_count": count}
+                        for statement, count in sorted(
+                            entry["repeated_statements"].items(), key=lambda item: -item[1]
+                        )
+                    ],
+                }
+            return summary
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+route_query_stats = RouteQueryStats()
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed_ms = (time.perf_counter() - start_times.pop()) * 1000
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+
+
+@event.listens_for(Engine, "handle_error")
+def _on_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    start_times = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+    if start_times:
+        start_times.pop()
+
+
+def _route_name(request: Request) -> str:
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or "<unmatched>"
+    return f"{request.method} {path}"
+
+
+async def track_queries(request: Request, call_next):
+    """HTTP middleware that collects query statistics for the request."""
+    stats = RequestQueryStats()
+    token = _current_stats.set(stats)
+    try:
+        response: Response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+
+    route = _route_name(request)
+    route_query_stats.observe(route, stats)
+    if DB_QUERY_DEBUG:
+        repeated = stats.repeated_shapes()
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Query-Time-Ms"] = f"{stats.total_ms:.2f}"
+        response.headers["X-DB-N-Plus-One"] = str(len(repeated))
+        for item in repeated:
+            print(f"⚠️ Possible N+1 in {route}: {item['count']}x {item['statement'][:200]}")
+    return response
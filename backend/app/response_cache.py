@@ -0,0 +1,209 @@
+"""
+In-process cache of serialized public responses.
+
+Published journal pages rarely change, so /public/journals/{id} and
+/public/journals/{id}/entries keep their rendered JSON here (LRU, at most
+RESPONSE_CACHE_MAX_ENTRIES, each for RESPONSE_CACHE_TTL seconds) together
+with its ETag, and a hit costs no queries at all.
+
+Every cached response is tagged with what it shows ("journal:3", "entry:12",
+"user:5"). Writes invalidate the tags of the rows they touch when their
+session commits, whichever endpoint or crud function made them (updates,
+deletes, uploads, editor/author/referee link changes); the other workers
+drop theirs when they hear about it (see app/invalidation.py).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from functools import lru_cache
+from itertools import chain
+from typing import Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from . import models
+from .http_cache import conditional_response
+from .invalidation import notify, subscribe
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 300))  # seconds
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1000))
+
+
+class CachedResponse:
+    """A rendered JSON body with the validators it was served with."""
+
+    def __init__(self, body: bytes, etag: str, last_modified: Optional[datetime], max_age: int, tags: set):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.max_age = max_age
+        self.tags = tags
+        self.expires_at = time.monotonic() + RESPONSE_CACHE_TTL
+
+    def respond(self, request: Request) -> Response:
+        """The cached body, or 304 if the client already has it."""
+        response = Response(content=self.body, media_type="application/json")
+        not_modified = conditional_response(request, response, self.etag, self.last_modified, self.max_age)
+        return not_modified or response
+
+
+class ResponseCache:
+    """LRU + TTL cache of CachedResponse objects with tag invalidation."""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._keys_by_tag = defaultdict(set)
+        # Bumped by every invalidation, and remembered per tag; see set()
+        self.generation = 0
+        self._invalidated_at = {}
+        self._cleared_at = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key) -> Optional[CachedResponse]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached.expires_at <= time.monotonic():
+                self._remove(key)
+                cached = None
+            if cached is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached
+
+    def set(self, key, cached: CachedResponse, generation: int) -> CachedResponse:
+        """
+        Store a response built from data read while the cache was at
+        `generation`. If one of its tags was invalidated since, the data may
+        predate that write, so it is not stored.
+        """
+        with self._lock:
+            if self._cleared_at > generation or any(self._invalidated_at.get(tag, 0) > generation for tag in cached.tags):
+                return cached
+            self._remove(key)
+            self._entries[key] = cached
+            for tag in cached.tags:
+                self._keys_by_tag[tag].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return cached
+
+    def invalidate(self, tags):
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                self._invalidated_at[tag] = self.generation
+                for key in self._keys_by_tag.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._cleared_at = self.generation
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self._invalidated_at.clear()
+
+    def _remove(self, key):
+        cached = self._entries.pop(key, None)
+        if cached is None:
+            return
+        for tag in cached.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": RESPONSE_CACHE_TTL,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+
+response_cache = ResponseCache()
+subscribe("responses", lambda tags: response_cache.clear() if tags is None else response_cache.invalidate(tags))
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_model) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def render(response_model, content) -> bytes:
+    """Serialize content the way FastAPI would for this response_model."""
+    adapter = _adapter(response_model)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+# --------------------- Invalidation on commit ---------------------
+
+def _journal_ids(entry) -> set:
+    # An entry moved to another journal leaves the old one as well
+    history = inspect(entry).attrs.journal_id.history
+    return {journal_id for journal_id in chain([entry.journal_id], history.deleted or ()) if journal_id is not None}
+
+
+def tags_of(instance) -> set:
+    """Cache tags affected by a change to this ORM instance."""
+    if isinstance(instance, models.Journal):
+        return {f"journal:{instance.id}"}
+    if isinstance(instance, models.JournalEntry):
+        return {f"entry:{instance.id}"} | {f"journal:{journal_id}" for journal_id in _journal_ids(instance)}
+    if isinstance(instance, models.JournalEditorLink):
+        return {f"journal:{instance.journal_id}"}
+    if isinstance(instance, (models.JournalEntryAuthorLink, models.JournalEntryRefereeLink)):
+        return {f"entry:{instance.journal_entry_id}"}
+    if isinstance(instance, models.User):
+        return {f"user:{instance.id}"}
+    return set()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_tags(session, flush_context):
+    flushed = set()
+    for instance in chain(session.new, session.dirty, session.deleted):
+        flushed |= tags_of(instance)
+    tags = session.info.setdefault("response_cache_tags", set())
+    if flushed - tags:
+        notify(session, "responses", flushed - tags)
+    tags |= flushed
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    tags = session.info.pop("response_cache_tags", None)
+    if tags:
+        response_cache.invalidate(tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop("response_cache_tags", None)
@@ -1,13 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
 from typing import List
-from sqlalchemy import text
+from sqlalchemy import literal_column, select as sa_select
 import os
 import sib_api_v3_sdk
 from sib_api_v3_sdk.rest import ApiException
 
-from .. import models, auth, schemas
-from ..database import get_session
+from .. import models, auth, schemas, notification_utils
+from ..database import get_session, get_read_session, get_pool_status
+from ..query_stats import route_query_stats
+from ..exports import EXPORTS, EXPORT_FORMATS, stream_export
+from ..response_cache import response_cache
+from ..settings_cache import settings_cache
+from ..user_cache import user_cache
+from ..security import password_hash_pool
+from .. import outbox, pending_notifications
+from ..pagination import (
+    PageParams, paged, USER_KEYSET, JOURNAL_KEYSET, ENTRY_KEYSET, AUTHOR_UPDATE_KEYSET,
+    REFEREE_UPDATE_KEYSET, JOURNAL_EDITOR_LINK_KEYSET, ENTRY_AUTHOR_LINK_KEYSET, ENTRY_REFEREE_LINK_KEYSET,
+)
 from .. import crud
 from ..email_utils import SENDER_EMAIL, SENDER_NAME, send_login_link_email as send_login_link_email_util
 
@@ -26,20 +38,20 @@ def get_current_admin_user(current_user: models.User = Depends(auth.get_current_
         )
     return current_user
 
-@router.get("/users", response_model=List[models.UserRead])
+@router.get("/users", response_model=paged(models.UserRead))
 def get_all_users(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_admin_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get all users. Only accessible to admin users.
     """
     # First get raw users data without ORM to avoid enum validation errors
     try:
-        # Use raw SQL to bypass SQLAlchemy's enum validation
-        result = db.execute(text(f"SELECT * FROM users LIMIT {limit} OFFSET {skip}"))
+        # Select the raw columns (no ORM enum types) to bypass SQLAlchemy's enum validation
+        statement = page.apply(sa_select(literal_column("*")).select_from(models.User.__table__), USER_KEYSET)
+        result = db.execute(statement)
         users_data = result.mappings().all()
         
         # Convert to dictionary objects to avoid enum validation issues
@@ -76,39 +88,39 @@ def get_all_users(
             
             sanitized_users.append(user_dict)
         
-        return sanitized_users
+        return page.respond(sanitized_users, USER_KEYSET)
+    except HTTPException:
+        raise
     except Exception as e:
         # Fallback to standard ORM method if the raw query fails
         print(f"Error in raw SQL method: {e}")
-        statement = select(models.User).offset(skip).limit(limit)
+        statement = page.apply(select(models.User), USER_KEYSET)
         users = db.exec(statement).all()
-        return users
+        return page.respond(users, USER_KEYSET)
 
-@router.get("/journals", response_model=List[models.Journal])
+@router.get("/journals", response_model=paged(models.Journal))
 def get_all_journals(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_admin_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get all journals. Only accessible to admin users.
     """
-    statement = select(models.Journal).offset(skip).limit(limit)
+    statement = page.apply(select(models.Journal), JOURNAL_KEYSET)
     journals = db.exec(statement).all()
-    return journals
+    return page.respond(journals, JOURNAL_KEYSET)
 
-@router.get("/journal-entries", response_model=List[models.JournalEntry])
+@router.get("/journal-entries", response_model=paged(models.JournalEntry))
 def get_all_journal_entries(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_admin_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get all journal entries. Only accessible to admin users.
     """
-    statement = select(models.JournalEntry).offset(skip).limit(limit)
+    statement = page.apply(select(models.JournalEntry), ENTRY_KEYSET)
     entries = db.exec(statement).all()
     
     # Generate random tokens for entries that don't have one
@@ -121,7 +133,7 @@ def get_all_journal_entries(
     if any(not entry.random_token for entry in entries):
         db.commit()
         
-    return entries
+    return page.respond(entries, ENTRY_KEYSET)
 
 # @router.get("/journal-entry-progress", response_model=List[models.JournalEntryProgress])
 # def get_all_journal_entry_progress(
@@ -139,7 +151,7 @@ def get_all_journal_entries(
 
 @router.get("/settings", response_model=models.SettingsRead)
 def get_settings(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_admin_user),
 ):
     """
@@ -147,6 +159,115 @@ def get_settings(
     """
     return crud.get_settings(db=db)
 
+@router.get("/health/db", response_model=dict)
+def get_database_health(
+    current_user: models.User = Depends(get_current_admin_user),
+):
+    """
+    Get connection pool usage (checked-out connections, overflow and wait time histogram).
+    Only accessible to admin users.
+    """
+    return get_pool_status()
+
+@router.get("/health/passwords", response_model=dict)
+def get_password_hashing_health(
+    reset: bool = False,
+    current_user: models.User = Depends(get_current_admin_user),
+):
+    """
+    Get usage of the password hashing pool (queue depth, waits, rejected calls).
+    Pass reset=true to zero the counters. Only accessible to admin users.
+    """
+    summary = password_hash_pool.stats()
+    if reset:
+        password_hash_pool.reset_stats()
+    return summary
+
+@router.get("/health/queries", response_model=dict)
+def get_query_health(
+    reset: bool = False,
+    current_user: models.User = Depends(get_current_admin_user),
+):
+    """
+    Get per-route SQL statistics (query count, database time and repeated
+    statements that look like N+1 queries). Pass reset=true to start over.
+    Only accessible to admin users.
+    """
+    summary = route_query_stats.snapshot()
+    if reset:
+        route_query_stats.reset()
+    return summary
+
+@router.get("/health/cache", response_model=dict)
+def get_cache_health(
+    reset: bool = False,
+    current_user: models.User = Depends(get_current_admin_user),
+):
+    """
+    Get hit/miss counters of the in-process caches. Pass reset=true to zero them.
+    Only accessible to admin users.
+    """
+    summary = {
+        "responses": response_cache.stats(),
+        "settings": settings_cache.stats(),
+        "users": user_cache.stats(),
+    }
+    if reset:
+        response_cache.reset_stats()
+        settings_cache.reset_stats()
+        user_cache.reset_stats()
+    return summary
+
+@router.get("/health/outbox", response_model=dict)
+def get_outbox_health(
+    db: Session = Depends(get_session),
+    current_user: models.User = Depends(get_current_admin_user),
+):
+    """
+    Get the notification email outbox: rows per status and how long the
+    oldest due email has been waiting, plus the update events still being
+    coalesced. Only accessible to admin users.
+    """
+    return {**outbox.stats(db), "coalescing": pending_notifications.stats(db)}
+
+@router.post("/outbox/retry", response_model=dict)
+def retry_dead_emails(
+    db: Session = Depends(get_session),
+    current_user: models.User = Depends(get_current_admin_user),
+):
+    """
+    Queue every email that was given up on for delivery again, with a fresh
+    set of attempts. Only accessible to admin users.
+    """
+    return {"requeued": outbox.requeue_dead(db)}
+
+@router.get("/export/{table}")
+def export_table(
+    table: str,
+    format: str = Query("ndjson", description="ndjson or csv"),
+    current_user: models.User = Depends(get_current_admin_user),
+):
+    """
+    Stream a whole admin table (users, journal-entries, author-updates,
+    referee-updates or one of the link tables) as NDJSON or CSV.
+    Only accessible to admin users.
+    """
+    if table not in EXPORTS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown export: {table}. Valid exports are: {list(EXPORTS)}"
+        )
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format: {format}. Valid formats are: {list(EXPORT_FORMATS)}"
+        )
+    return StreamingResponse(
+        stream_export(table, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
+
 @router.put("/users/{user_id}", response_model=models.UserRead)
 def update_user(
     user_id: int,
@@ -189,10 +310,8 @@ def generate_login_token(
     
     # Create a special token with long expiration (6 months)
     token_expires = timedelta(days=180)  # 6 months instead of 15 minutes
-    token_data = {"sub": user.email, "is_temp_login": True, "user_id": user_id}
-    
     # Generate the token
-    token = security.create_access_token(data=token_data, expires_delta=token_expires)
+    token = security.create_user_token(user, expires_delta=token_expires, is_temp_login=True, user_id=user_id)
     
     return {"token": token}
 
@@ -269,75 +388,70 @@ def update_settings(
     """
     return crud.update_settings(db=db, settings_update=settings)
 
-@router.get("/author-updates", response_model=List[models.AuthorUpdate])
+@router.get("/author-updates", response_model=paged(models.AuthorUpdate))
 def get_all_author_updates(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_admin_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get all author updates. Only accessible to admin users.
     """
-    statement = select(models.AuthorUpdate).offset(skip).limit(limit)
+    statement = page.apply(select(models.AuthorUpdate), AUTHOR_UPDATE_KEYSET)
     updates = db.exec(statement).all()
-    return updates
+    return page.respond(updates, AUTHOR_UPDATE_KEYSET)
 
-@router.get("/referee-updates", response_model=List[models.RefereeUpdate])
+@router.get("/referee-updates", response_model=paged(models.RefereeUpdate))
 def get_all_referee_updates(
-    db: Session = Depends(get_session), 
+    db: Session = Depends(get_read_session), 
     current_user: models.User = Depends(get_current_admin_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get all referee updates. Only accessible to admin users.
     """
-    statement = select(models.RefereeUpdate).offset(skip).limit(limit)
+    statement = page.apply(select(models.RefereeUpdate), REFEREE_UPDATE_KEYSET)
     updates = db.exec(statement).all()
-    return updates
+    return page.respond(updates, REFEREE_UPDATE_KEYSET)
 
-@router.get("/journal-editor-links", response_model=List[models.JournalEditorLink])
+@router.get("/journal-editor-links", response_model=paged(models.JournalEditorLink))
 def get_all_journal_editor_links(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_admin_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get all journal-editor links. Only accessible to admin users.
     """
-    statement = select(models.JournalEditorLink).offset(skip).limit(limit)
+    statement = page.apply(select(models.JournalEditorLink), JOURNAL_EDITOR_LINK_KEYSET)
     links = db.exec(statement).all()
-    return links
+    return page.respond(links, JOURNAL_EDITOR_LINK_KEYSET)
 
-@router.get("/journal-entry-author-links", response_model=List[models.JournalEntryAuthorLink])
+@router.get("/journal-entry-author-links", response_model=paged(models.JournalEntryAuthorLink))
 def get_all_journal_entry_author_links(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_admin_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get all journal entry author links. Only accessible to admin users.
     """
-    statement = select(models.JournalEntryAuthorLink).offset(skip).limit(limit)
+    statement = page.apply(select(models.JournalEntryAuthorLink), ENTRY_AUTHOR_LINK_KEYSET)
     links = db.exec(statement).all()
-    return links
+    return page.respond(links, ENTRY_AUTHOR_LINK_KEYSET)
 
-@router.get("/journal-entry-referee-links", response_model=List[models.JournalEntryRefereeLink])
+@router.get("/journal-entry-referee-links", response_model=paged(models.JournalEntryRefereeLink))
 def get_all_journal_entry_referee_links(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_admin_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get all journal entry referee links. Only accessible to admin users.
     """
-    statement = select(models.JournalEntryRefereeLink).offset(skip).limit(limit)
+    statement = page.apply(select(models.JournalEntryRefereeLink), ENTRY_REFEREE_LINK_KEYSET)
     referee_links = db.exec(statement).all()
-    return referee_links
+    return page.respond(referee_links, ENTRY_REFEREE_LINK_KEYSET)
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_user(
@@ -380,13 +494,12 @@ def delete_user(
     # Return 204 No Content
     return None
 
-@router.get("/users/role/{role}", response_model=List[models.UserRead])
+@router.get("/users/role/{role}", response_model=paged(models.UserRead))
 def get_users_by_role(
     role: str,
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_admin_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get users with a specific role. Only accessible to admin users.
@@ -401,10 +514,10 @@ def get_users_by_role(
         )
     
     # Query users with the specified role
-    statement = select(models.User).where(models.User.role == role_enum).offset(skip).limit(limit)
+    statement = page.apply(select(models.User).where(models.User.role == role_enum), USER_KEYSET)
     users = db.exec(statement).all()
     
-    return users
+    return page.respond(users, USER_KEYSET)
 
 @router.put("/journals/{journal_id}/editor-in-chief", response_model=models.Journal)
 def set_journal_editor_in_chief(
@@ -649,45 +762,12 @@ def add_entry_referee(
             detail=f"User with ID {data.user_id} is already a referee for this entry"
         )
     
-    # Create the link
+    # Create the link and queue email notifications to all authors in the same transaction
     link = models.JournalEntryRefereeLink(journal_entry_id=entry_id, user_id=data.user_id)
     db.add(link)
+    notification_utils.notify_on_referee_assignment(db, entry, referee)
     db.commit()
     
-    # Send email notifications to all authors
-    try:
-        from ..email_utils import send_referee_assignment_notification
-        import os
-        
-        # Get the Brevo API key
-        api_key = os.getenv("BREVO_API_KEY")
-        if api_key:
-            # Get all authors for this entry
-            authors_statement = select(models.JournalEntryAuthorLink).where(
-                models.JournalEntryAuthorLink.journal_entry_id == entry_id
-            )
-            author_links = db.exec(authors_statement).all()
-            
-            for author_link in author_links:
-                author = db.get(models.User, author_link.user_id)
-                if author and author.email:
-                    try:
-                        send_referee_assignment_notification(
-                            api_key=api_key,
-                            user_email=author.email,
-                            user_name=author.name,
-                            referee_name=referee.name,
-                            entry_title=entry.title,
-                            entry_id=entry_id
-                        )
-                    except Exception as email_error:
-                        print(f"Failed to send referee assignment notification to {author.email}: {email_error}")
-                        # Continue processing even if email fails
-                        
-    except Exception as e:
-        print(f"Error sending referee assignment notifications: {e}")
-        # Don't fail the whole operation if email fails
-    
     return link
 
 @router.delete("/entries/{entry_id}/referees/{referee_id}", status_code=status.HTTP_204_NO_CONTENT)
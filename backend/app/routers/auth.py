@@ -14,6 +14,7 @@ import logging
 
 from .. import crud, schemas, models, auth, security
 from ..database import get_session
+from ..pagination import PageParams, paged, ENTRY_KEYSET, JOURNAL_KEYSET
 from ..email_utils import send_confirmation_email, send_password_reset_email
 
 # Set up logging
@@ -74,7 +75,9 @@ async def register_user(user: schemas.UserCreate, db: Session = Depends(get_sess
     if db_user_by_email:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    created_user = crud.create_user(db=db, user=user)
+    # Hash off the event loop (see security.PasswordHashPool)
+    hashed_password = await security.get_password_hash_async(user.password)
+    created_user = crud.create_user(db=db, user=user, hashed_password=hashed_password)
 
     # Send confirmation email
     try:
@@ -146,10 +149,8 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
         )
 
     access_token_expires = timedelta(minutes=security.ACCESS_TOKEN_EXPIRE_MINUTES)
-    # The 'sub' claim in the token should be the user's email now
-    access_token = security.create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
+    # The 'sub' claim is the user id; 'ver' lets the user revoke the token later
+    access_token = security.create_user_token(user, expires_delta=access_token_expires)
     return {"access_token": access_token, "token_type": "bearer"}
 
 class TokenLoginData(BaseModel):
@@ -166,19 +167,18 @@ def login_with_token(token_data: TokenLoginData, db: Session = Depends(get_sessi
         payload = jwt.decode(token_data.token, security.SECRET_KEY, algorithms=[security.ALGORITHM])
         
         # Extract data from token
-        email = payload.get("sub")
         is_temp_login = payload.get("is_temp_login")
         user_id = payload.get("user_id")
         
         # Validate token data
-        if not email or not is_temp_login or user_id != token_data.user_id:
+        if not is_temp_login or user_id != token_data.user_id:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid login token"
             )
         
-        # Get the user
-        user = crud.get_user_by_email(db, email=email)
+        # Get the user (None if the token has been revoked since)
+        user = auth.get_user_for_token(db, security.decode_access_token(token_data.token))
         if not user or user.id != token_data.user_id:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -187,9 +187,7 @@ def login_with_token(token_data: TokenLoginData, db: Session = Depends(get_sessi
         
         # Create a regular access token
         access_token_expires = timedelta(minutes=security.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = security.create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
-        )
+        access_token = security.create_user_token(user, expires_delta=access_token_expires)
         
         return {"access_token": access_token, "token_type": "bearer"}
         
@@ -237,41 +235,38 @@ def update_users_me(
     
     return updated_user
 
-@router.get("/users/me/entries", response_model=list[schemas.JournalEntryRead], tags=["users"])
+@router.get("/users/me/entries", response_model=paged(schemas.JournalEntryRead), tags=["users"])
 def read_users_entries(
-    skip: int = 0, 
-    limit: int = 100,
+    page: PageParams = Depends(),
     db: Session = Depends(get_session),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """
     Get all journal entries for the currently authenticated user.
     """
-    return crud.get_entries_by_user(db, user_id=current_user.id, skip=skip, limit=limit) 
+    return page.respond(crud.get_entries_by_user(db, user_id=current_user.id, page=page), ENTRY_KEYSET) 
 
-@router.get("/users/me/referee-entries", response_model=list[schemas.JournalEntryRead], tags=["users"])
+@router.get("/users/me/referee-entries", response_model=paged(schemas.JournalEntryRead), tags=["users"])
 def read_users_referee_entries(
-    skip: int = 0, 
-    limit: int = 100,
+    page: PageParams = Depends(),
     db: Session = Depends(get_session),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """
     Get all journal entries where the currently authenticated user is a referee.
     """
-    return crud.get_entries_by_referee(db, user_id=current_user.id, skip=skip, limit=limit) 
+    return page.respond(crud.get_entries_by_referee(db, user_id=current_user.id, page=page), ENTRY_KEYSET) 
 
-@router.get("/users/me/edited-journals", response_model=list[models.Journal], tags=["users"])
+@router.get("/users/me/edited-journals", response_model=paged(models.Journal), tags=["users"])
 def read_users_edited_journals(
-    skip: int = 0, 
-    limit: int = 100,
+    page: PageParams = Depends(),
     db: Session = Depends(get_session),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """
     Get all journals where the currently authenticated user is an editor.
     """
-    return crud.get_journals_by_editor(db, user_id=current_user.id, skip=skip, limit=limit) 
+    return page.respond(crud.get_journals_by_editor(db, user_id=current_user.id, page=page), JOURNAL_KEYSET) 
 
 # Schema for forgot password request
 class ForgotPasswordRequest(BaseModel):
@@ -396,10 +391,26 @@ def change_password(
             detail="Current password is incorrect"
         )
     
-    # Update the password
-    crud.update_user_password(db, current_user.id, request.new_password)
+    # Update the password. This revokes all of the user's tokens, so this
+    # session continues with a new one.
+    user = crud.update_user_password(db, current_user.id, request.new_password)
     
-    return {"message": "Password has been successfully updated."}
+    return {
+        "message": "Password has been successfully updated.",
+        "access_token": security.create_user_token(user),
+        "token_type": "bearer",
+    }
+
+@router.post("/users/me/logout-all", status_code=status.HTTP_200_OK, tags=["auth"])
+def logout_everywhere(
+    db: Session = Depends(get_session),
+    current_user: models.User = Depends(auth.get_current_active_user)
+):
+    """
+    Revoke every access token of the current user, including the one used for this request.
+    """
+    crud.revoke_user_tokens(db, current_user.id)
+    return {"message": "You have been logged out on all devices."}
 
 class GoogleLoginData(BaseModel):
     credential: str
@@ -453,16 +464,15 @@ async def login_with_google(data: GoogleLoginData, db: Session = Depends(get_ses
                 is_auth=True,  # Google-authenticated users are automatically verified
                 recaptcha_token="google_oauth"  # Skip recaptcha for Google OAuth
             )
-            user = crud.create_user(db, user_data)
+            hashed_password = await security.get_password_hash_async(user_data.password)
+            user = crud.create_user(db, user_data, hashed_password=hashed_password)
             logger.info(f"New user created with ID: {user.id}")
         else:
             logger.info(f"Existing user found with ID: {user.id}")
 
         # Create access token
         access_token_expires = timedelta(minutes=security.ACCESS_TOKEN_EXPIRE_MINUTES)
-        access_token = security.create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
-        )
+        access_token = security.create_user_token(user, expires_delta=access_token_expires)
         
         logger.info(f"Login successful for user: {email}")
         return {"access_token": access_token, "token_type": "bearer"}
@@ -3,9 +3,14 @@ from sqlmodel import Session, select
 from typing import List
 from datetime import datetime
 
-from .. import models, auth, crud
-from ..database import get_session
+from .. import models, auth, notification_utils
+from ..database import get_session, get_read_session
 from ..schemas import EntryUserAdd
+from ..permissions import editor_entry_ids, editor_journal_ids, editor_related_user_ids, edits_journal
+from ..pagination import (
+    PageParams, paged, USER_KEYSET, JOURNAL_KEYSET, ENTRY_KEYSET, AUTHOR_UPDATE_KEYSET,
+    REFEREE_UPDATE_KEYSET, JOURNAL_EDITOR_LINK_KEYSET, ENTRY_AUTHOR_LINK_KEYSET, ENTRY_REFEREE_LINK_KEYSET,
+)
 
 # Create a dependency for editor authentication
 def get_current_editor_user(
@@ -28,12 +33,11 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
-@router.get("/users", response_model=List[models.User])
+@router.get("/users", response_model=paged(models.User))
 def get_editor_users(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_editor_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get users who are related to journals the editor manages.
@@ -42,94 +46,23 @@ def get_editor_users(
     """
     # If admin or owner, get all users
     if current_user.role in [models.UserRole.admin, models.UserRole.owner]:
-        statement = select(models.User).offset(skip).limit(limit)
-        users = db.exec(statement).all()
-        return users
-    
-    # For editors, first get journals they're assigned to
-    editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-    journal_ids = [j.id for j in editor_journals]
-    
-    if not journal_ids:
-        # Return at least the current user
-        statement = select(models.User).where(models.User.id == current_user.id)
+        statement = page.apply(select(models.User), USER_KEYSET)
         users = db.exec(statement).all()
-        return users
+        return page.respond(users, USER_KEYSET)
     
-    # Get entries for those journals
-    entries_statement = select(models.JournalEntry.id).where(
-        models.JournalEntry.journal_id.in_(journal_ids)
+    # For editors, the users related to their journals (see permissions.editor_related_user_ids)
+    statement = select(models.User).where(
+        models.User.id.in_(editor_related_user_ids(current_user.id))
     )
-    entries = db.exec(entries_statement).all()
-    
-    # The entries returned could be integers or row objects with an id attribute
-    if entries and hasattr(entries[0], 'id'):
-        entry_ids = [e.id for e in entries]
-    else:
-        # The entries are already ids (integers)
-        entry_ids = entries
-    
-    # Get unique user IDs from various sources
-    user_ids = set()
-    
-    # Add the current user
-    user_ids.add(current_user.id)
-    
-    # Add other editors of the same journals
-    if journal_ids:
-        editors_statement = select(models.JournalEditorLink.user_id).where(
-            models.JournalEditorLink.journal_id.in_(journal_ids)
-        )
-        editors = db.exec(editors_statement).all()
-        for editor in editors:
-            if hasattr(editor, 'user_id'):
-                user_ids.add(editor.user_id)
-            else:
-                user_ids.add(editor)
-    
-    # Add authors and referees of entries
-    if entry_ids:
-        # Add authors
-        authors_statement = select(models.JournalEntryAuthorLink.user_id).where(
-            models.JournalEntryAuthorLink.journal_entry_id.in_(entry_ids)
-        )
-        authors = db.exec(authors_statement).all()
-        for author in authors:
-            if hasattr(author, 'user_id'):
-                user_ids.add(author.user_id)
-            else:
-                user_ids.add(author)
-        
-        # Add referees
-        referees_statement = select(models.JournalEntryRefereeLink.user_id).where(
-            models.JournalEntryRefereeLink.journal_entry_id.in_(entry_ids)
-        )
-        referees = db.exec(referees_statement).all()
-        for referee in referees:
-            if hasattr(referee, 'user_id'):
-                user_ids.add(referee.user_id)
-            else:
-                user_ids.add(referee)
-    
-    # Get the users
-    if user_ids:
-        statement = select(models.User).where(
-            models.User.id.in_(list(user_ids))
-        ).offset(skip).limit(limit)
-        users = db.exec(statement).all()
-        return users
-    else:
-        # Return at least the current user if no other users found
-        statement = select(models.User).where(models.User.id == current_user.id)
-        users = db.exec(statement).all()
-        return users
+    statement = page.apply(statement, USER_KEYSET)
+    users = db.exec(statement).all()
+    return page.respond(users, USER_KEYSET)
 
-@router.get("/journals", response_model=List[models.Journal])
+@router.get("/journals", response_model=paged(models.Journal))
 def get_editor_journals(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_editor_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get all journals that the current editor is assigned to.
@@ -151,15 +84,15 @@ def get_editor_journals(
              )))
         ).order_by(models.Journal.created_date.desc())
     
+    statement = page.apply(statement, JOURNAL_KEYSET, offset=False)
     journals = db.exec(statement).all()
-    return journals
+    return page.respond(journals, JOURNAL_KEYSET)
 
-@router.get("/journal_entries", response_model=List[models.JournalEntry])
+@router.get("/journal_entries", response_model=paged(models.JournalEntry))
 def get_editor_journal_entries(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_editor_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get all journal entries from journals that the current editor is assigned to.
@@ -184,229 +117,129 @@ def get_editor_journal_entries(
             models.JournalEntry.journal_id.in_(user_journals)
         ).order_by(models.JournalEntry.created_date.desc())
     
+    statement = page.apply(statement, ENTRY_KEYSET, offset=False)
     entries = db.exec(statement).all()
-    return entries
+    return page.respond(entries, ENTRY_KEYSET)
 
-@router.get("/author_updates", response_model=List[models.AuthorUpdate])
+@router.get("/author_updates", response_model=paged(models.AuthorUpdate))
 def get_editor_author_updates(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_editor_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get all author updates for entries in journals that the current editor is assigned to.
     """
     # If admin or owner, get all author updates
     if current_user.role in [models.UserRole.admin, models.UserRole.owner]:
-        statement = select(models.AuthorUpdate).offset(skip).limit(limit)
+        statement = page.apply(select(models.AuthorUpdate), AUTHOR_UPDATE_KEYSET)
         updates = db.exec(statement).all()
-        return updates
-    
-    # For editors, first get entries from their journals
-    editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-    journal_ids = [j.id for j in editor_journals]
-    
-    if not journal_ids:
-        return []
-    
-    # Get entries from those journals
-    entry_statement = select(models.JournalEntry.id).where(
-        models.JournalEntry.journal_id.in_(journal_ids)
-    )
-    entries = db.exec(entry_statement).all()
-    
-    # The entries returned are already integers or row objects with an id attribute
-    # Let's handle both cases
-    if entries and hasattr(entries[0], 'id'):
-        entry_ids = [e.id for e in entries]
-    else:
-        # The entries are already ids (integers)
-        entry_ids = entries
+        return page.respond(updates, AUTHOR_UPDATE_KEYSET)
     
-    if not entry_ids:
-        return []
-    
-    # Then get author updates for those entries
+    # For editors, only author updates of entries in their journals
     statement = select(models.AuthorUpdate).where(
-        models.AuthorUpdate.entry_id.in_(entry_ids)
-    ).offset(skip).limit(limit)
+        models.AuthorUpdate.entry_id.in_(editor_entry_ids(current_user.id))
+    )
+    statement = page.apply(statement, AUTHOR_UPDATE_KEYSET)
     
     updates = db.exec(statement).all()
-    return updates
+    return page.respond(updates, AUTHOR_UPDATE_KEYSET)
 
-@router.get("/referee_updates", response_model=List[models.RefereeUpdate])
+@router.get("/referee_updates", response_model=paged(models.RefereeUpdate))
 def get_editor_referee_updates(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_editor_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get all referee updates for entries in journals that the current editor is assigned to.
     """
     # If admin or owner, get all referee updates
     if current_user.role in [models.UserRole.admin, models.UserRole.owner]:
-        statement = select(models.RefereeUpdate).offset(skip).limit(limit)
+        statement = page.apply(select(models.RefereeUpdate), REFEREE_UPDATE_KEYSET)
         updates = db.exec(statement).all()
-        return updates
-    
-    # For editors, first get entries from their journals
-    editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-    journal_ids = [j.id for j in editor_journals]
+        return page.respond(updates, REFEREE_UPDATE_KEYSET)
     
-    if not journal_ids:
-        return []
-    
-    # Get entries from those journals
-    entry_statement = select(models.JournalEntry.id).where(
-        models.JournalEntry.journal_id.in_(journal_ids)
-    )
-    entries = db.exec(entry_statement).all()
-    
-    # The entries returned are already integers or row objects with an id attribute
-    # Let's handle both cases
-    if entries and hasattr(entries[0], 'id'):
-        entry_ids = [e.id for e in entries]
-    else:
-        # The entries are already ids (integers)
-        entry_ids = entries
-    
-    if not entry_ids:
-        return []
-    
-    # Then get referee updates for those entries
+    # For editors, only referee updates of entries in their journals
     statement = select(models.RefereeUpdate).where(
-        models.RefereeUpdate.entry_id.in_(entry_ids)
-    ).offset(skip).limit(limit)
+        models.RefereeUpdate.entry_id.in_(editor_entry_ids(current_user.id))
+    )
+    statement = page.apply(statement, REFEREE_UPDATE_KEYSET)
     
     updates = db.exec(statement).all()
-    return updates
+    return page.respond(updates, REFEREE_UPDATE_KEYSET)
 
-@router.get("/journal_editor_links", response_model=List[models.JournalEditorLink])
+@router.get("/journal_editor_links", response_model=paged(models.JournalEditorLink))
 def get_editor_journal_editor_links(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_editor_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get journal-editor links for journals the editor manages.
     """
     # If admin or owner, get all links
     if current_user.role in [models.UserRole.admin, models.UserRole.owner]:
-        statement = select(models.JournalEditorLink).offset(skip).limit(limit)
+        statement = page.apply(select(models.JournalEditorLink), JOURNAL_EDITOR_LINK_KEYSET)
         links = db.exec(statement).all()
-        return links
-    
-    # For editors, first get journals they're assigned to
-    editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-    journal_ids = [j.id for j in editor_journals]
+        return page.respond(links, JOURNAL_EDITOR_LINK_KEYSET)
     
-    if not journal_ids:
-        return []
-    
-    # Get links only for those journals
+    # For editors, only links of their journals
     statement = select(models.JournalEditorLink).where(
-        models.JournalEditorLink.journal_id.in_(journal_ids)
-    ).offset(skip).limit(limit)
+        models.JournalEditorLink.journal_id.in_(editor_journal_ids(current_user.id))
+    )
+    statement = page.apply(statement, JOURNAL_EDITOR_LINK_KEYSET)
     
     links = db.exec(statement).all()
-    return links
+    return page.respond(links, JOURNAL_EDITOR_LINK_KEYSET)
 
-@router.get("/journal_entry_author_links", response_model=List[models.JournalEntryAuthorLink])
+@router.get("/journal_entry_author_links", response_model=paged(models.JournalEntryAuthorLink))
 def get_editor_journal_entry_author_links(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_editor_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get author links for entries in journals the editor manages.
     """
     # If admin or owner, get all links
     if current_user.role in [models.UserRole.admin, models.UserRole.owner]:
-        statement = select(models.JournalEntryAuthorLink).offset(skip).limit(limit)
+        statement = page.apply(select(models.JournalEntryAuthorLink), ENTRY_AUTHOR_LINK_KEYSET)
         links = db.exec(statement).all()
-        return links
-    
-    # For editors, first get journals they're assigned to
-    editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-    journal_ids = [j.id for j in editor_journals]
+        return page.respond(links, ENTRY_AUTHOR_LINK_KEYSET)
     
-    if not journal_ids:
-        return []
-    
-    # Get entries for those journals
-    entries_statement = select(models.JournalEntry.id).where(
-        models.JournalEntry.journal_id.in_(journal_ids)
-    )
-    entries = db.exec(entries_statement).all()
-    
-    # The entries returned could be integers or row objects with an id attribute
-    if entries and hasattr(entries[0], 'id'):
-        entry_ids = [e.id for e in entries]
-    else:
-        # The entries are already ids (integers)
-        entry_ids = entries
-    
-    if not entry_ids:
-        return []
-    
-    # Get links only for those entries
+    # For editors, only links of entries in their journals
     statement = select(models.JournalEntryAuthorLink).where(
-        models.JournalEntryAuthorLink.journal_entry_id.in_(entry_ids)
-    ).offset(skip).limit(limit)
+        models.JournalEntryAuthorLink.journal_entry_id.in_(editor_entry_ids(current_user.id))
+    )
+    statement = page.apply(statement, ENTRY_AUTHOR_LINK_KEYSET)
     
     links = db.exec(statement).all()
-    return links
+    return page.respond(links, ENTRY_AUTHOR_LINK_KEYSET)
 
-@router.get("/journal_entry_referee_links", response_model=List[models.JournalEntryRefereeLink])
+@router.get("/journal_entry_referee_links", response_model=paged(models.JournalEntryRefereeLink))
 def get_editor_journal_entry_referee_links(
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
     current_user: models.User = Depends(get_current_editor_user),
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
 ):
     """
     Get referee links for entries in journals the editor manages.
     """
     # If admin or owner, get all links
     if current_user.role in [models.UserRole.admin, models.UserRole.owner]:
-        statement = select(models.JournalEntryRefereeLink).offset(skip).limit(limit)
+        statement = page.apply(select(models.JournalEntryRefereeLink), ENTRY_REFEREE_LINK_KEYSET)
         links = db.exec(statement).all()
-        return links
+        return page.respond(links, ENTRY_REFEREE_LINK_KEYSET)
     
-    # For editors, first get journals they're assigned to
-    editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-    journal_ids = [j.id for j in editor_journals]
-    
-    if not journal_ids:
-        return []
-    
-    # Get entries for those journals
-    entries_statement = select(models.JournalEntry.id).where(
-        models.JournalEntry.journal_id.in_(journal_ids)
-    )
-    entries = db.exec(entries_statement).all()
-    
-    # The entries returned could be integers or row objects with an id attribute
-    if entries and hasattr(entries[0], 'id'):
-        entry_ids = [e.id for e in entries]
-    else:
-        # The entries are already ids (integers)
-        entry_ids = entries
-    
-    if not entry_ids:
-        return []
-    
-    # Get links only for those entries
+    # For editors, only links of entries in their journals
     statement = select(models.JournalEntryRefereeLink).where(
-        models.JournalEntryRefereeLink.journal_entry_id.in_(entry_ids)
-    ).offset(skip).limit(limit)
+        models.JournalEntryRefereeLink.journal_entry_id.in_(editor_entry_ids(current_user.id))
+    )
+    statement = page.apply(statement, ENTRY_REFEREE_LINK_KEYSET)
     
     links = db.exec(statement).all()
-    return links
+    return page.respond(links, ENTRY_REFEREE_LINK_KEYSET)
 
 @router.post("/entries/{entry_id}/authors", response_model=models.JournalEntryAuthorLink)
 def add_entry_author_as_editor(
@@ -435,11 +268,8 @@ def add_entry_author_as_editor(
                 detail="Journal entry is not associated with any journal"
             )
         
-        # Get journals the editor manages
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        
-        if entry.journal_id not in journal_ids:
+        # Check that the editor manages the entry's journal
+        if not edits_journal(db, current_user.id, entry.journal_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to manage this entry"
@@ -500,11 +330,8 @@ def remove_entry_author_as_editor(
                 detail="Journal entry is not associated with any journal"
             )
         
-        # Get journals the editor manages
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        
-        if entry.journal_id not in journal_ids:
+        # Check that the editor manages the entry's journal
+        if not edits_journal(db, current_user.id, entry.journal_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to manage this entry"
@@ -556,11 +383,8 @@ def add_entry_referee_as_editor(
                 detail="Journal entry is not associated with any journal"
             )
         
-        # Get journals the editor manages
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        
-        if entry.journal_id not in journal_ids:
+        # Check that the editor manages the entry's journal
+        if not edits_journal(db, current_user.id, entry.journal_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to manage this entry"
@@ -593,45 +417,12 @@ def add_entry_referee_as_editor(
             detail=f"User with ID {data.user_id} is already a referee for this entry"
         )
     
-    # Create the link
+    # Create the link and queue email notifications to all authors in the same transaction
     link = models.JournalEntryRefereeLink(journal_entry_id=entry_id, user_id=data.user_id)
     db.add(link)
+    notification_utils.notify_on_referee_assignment(db, entry, referee)
     db.commit()
     
-    # Send email notifications to all authors
-    try:
-        from ..email_utils import send_referee_assignment_notification
-        import os
-        
-        # Get the Brevo API key
-        api_key = os.getenv("BREVO_API_KEY")
-        if api_key:
-            # Get all authors for this entry
-            authors_statement = select(models.JournalEntryAuthorLink).where(
-                models.JournalEntryAuthorLink.journal_entry_id == entry_id
-            )
-            author_links = db.exec(authors_statement).all()
-            
-            for author_link in author_links:
-                author = db.get(models.User, author_link.user_id)
-                if author and author.email:
-                    try:
-                        send_referee_assignment_notification(
-                            api_key=api_key,
-                            user_email=author.email,
-                            user_name=author.name,
-                            referee_name=referee.name,
-                            entry_title=entry.title,
-                            entry_id=entry_id
-                        )
-                    except Exception as email_error:
-                        print(f"Failed to send referee assignment notification to {author.email}: {email_error}")
-                        # Continue processing even if email fails
-                        
-    except Exception as e:
-        print(f"Error sending referee assignment notifications: {e}")
-        # Don't fail the whole operation if email fails
-    
     return link
 
 @router.delete("/entries/{entry_id}/referees/{referee_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -661,11 +452,8 @@ def remove_entry_referee_as_editor(
                 detail="Journal entry is not associated with any journal"
             )
         
-        # Get journals the editor manages
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        
-        if entry.journal_id not in journal_ids:
+        # Check that the editor manages the entry's journal
+        if not edits_journal(db, current_user.id, entry.journal_id):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You do not have permission to manage this entry"
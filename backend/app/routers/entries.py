@@ -7,7 +7,10 @@ import pytz
 
 from .. import crud, models, schemas, auth, notification_utils
 from ..database import get_session
+from ..pagination import PageParams, paged, ENTRY_KEYSET, JOURNAL_KEYSET
+from ..counters import entry_counters
 from ..file_utils import save_upload_file, delete_upload_file, validate_pdf
+from ..permissions import Permissions
 
 router = APIRouter(
     prefix="/entries",
@@ -27,17 +30,16 @@ def create_journal_entry(
     return crud.create_entry(db=db, entry=entry, user_id=current_user.id)
 
 
-@router.get("/", response_model=List[schemas.JournalEntryRead])
+@router.get("/", response_model=paged(schemas.JournalEntryRead))
 def read_journal_entries(
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
     db: Session = Depends(get_session),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """
     Retrieve journal entries for the current user.
     """
-    entries = crud.get_entries_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
+    entries = crud.get_entries_by_user(db, user_id=current_user.id, page=page)
     
     # Generate random tokens for entries that don't have one
     for entry in entries:
@@ -49,55 +51,37 @@ def read_journal_entries(
     if any(not entry.random_token for entry in entries):
         db.commit()
     
-    return entries
+    return page.respond(entries, ENTRY_KEYSET)
 
 
-@router.get("/journals", response_model=List[models.Journal])
+@router.get("/journals", response_model=paged(models.Journal))
 def get_all_journals(
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
     db: Session = Depends(get_session),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
     """
     Get all journals. Accessible to all users.
     """
-    statement = select(models.Journal).offset(skip).limit(limit)
+    statement = page.apply(select(models.Journal), JOURNAL_KEYSET)
     journals = db.exec(statement).all()
-    return journals
+    return page.respond(journals, JOURNAL_KEYSET)
 
 
 @router.get("/{entry_id}", response_model=schemas.JournalEntryRead)
 def read_single_journal_entry(
     entry_id: int,
     db: Session = Depends(get_session),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    permissions: Permissions = Depends(),
 ):
     """
     Retrieve a specific journal entry by ID.
     Ensures the entry belongs to the current user.
     """
+    # Check that the entry exists and the user may read it
+    permissions.require_entry(entry_id, "read", "You don't have permission to access this entry.")
     db_entry = crud.get_entry(db, entry_id=entry_id)
-    if db_entry is None:
-        raise HTTPException(status_code=404, detail="Journal entry not found")
-    
-    # Check if the user has permissions to access this entry
-    is_author = any(author.id == current_user.id for author in db_entry.authors)
-    is_referee = any(referee.id == current_user.id for referee in db_entry.referees)
-    is_admin_or_owner = current_user.role in [models.UserRole.admin, models.UserRole.owner]
-    
-    # Check if user is editor of the journal containing this entry
-    is_journal_editor = False
-    if current_user.role == models.UserRole.editor and db_entry.journal_id:
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        is_journal_editor = db_entry.journal_id in journal_ids
-    
-    if not is_admin_or_owner and not is_journal_editor and not is_author and not is_referee:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to access this entry."
-        )
     
     # Generate a random token if one doesn't exist
     if not db_entry.random_token:
@@ -115,32 +99,15 @@ def update_journal_entry(
     entry_id: int,
     entry: schemas.JournalEntryUpdate,
     db: Session = Depends(get_session),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    permissions: Permissions = Depends(),
 ):
     """
     Update a specific journal entry by ID.
     Ensures the entry belongs to the current user before updating.
     """
-    db_entry = crud.get_entry(db, entry_id=entry_id) # Check existence first
-    if db_entry is None:
-        raise HTTPException(status_code=404, detail="Journal entry not found")
-    
-    # Check if the user has permissions to access this entry
-    is_author = any(author.id == current_user.id for author in db_entry.authors)
-    is_admin_or_owner = current_user.role in [models.UserRole.admin, models.UserRole.owner]
-    
-    # Check if user is editor of the journal containing this entry
-    is_journal_editor = False
-    if current_user.role == models.UserRole.editor and db_entry.journal_id:
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        is_journal_editor = db_entry.journal_id in journal_ids
-    
-    if not is_admin_or_owner and not is_journal_editor and not is_author:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to update this entry."
-        )
+    # Check that the entry exists and the user may change it
+    permissions.require_entry(entry_id, "edit", "You don't have permission to update this entry.")
     
     updated_entry = crud.update_entry(db=db, entry_id=entry_id, entry_update=entry)
     # crud.update_entry should technically not return None if the check above passed,
@@ -154,31 +121,21 @@ def update_journal_entry(
 def delete_journal_entry(
     entry_id: int,
     db: Session = Depends(get_session),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    permissions: Permissions = Depends(),
 ):
     """
     Delete a specific journal entry by ID.
     Ensures the entry belongs to the current user before deleting.
     """
-    db_entry = crud.get_entry(db, entry_id=entry_id) # Check existence and ownership
-    if db_entry is None:
+    if permissions.entry_relations(entry_id) is None: # Check existence and ownership
         # Return 204 even if not found, as the end state (not present) is achieved.
         # Or you could raise 404.
         # raise HTTPException(status_code=404, detail="Journal entry not found")
         return
     
-    # Check if the user has permissions to access this entry
-    is_author = any(author.id == current_user.id for author in db_entry.authors)
-    is_admin_or_owner = current_user.role in [models.UserRole.admin, models.UserRole.owner]
-    
-    # Check if user is editor of the journal containing this entry
-    is_journal_editor = False
-    if current_user.role == models.UserRole.editor and db_entry.journal_id:
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        is_journal_editor = db_entry.journal_id in journal_ids
-    
-    if not is_admin_or_owner and not is_journal_editor and not is_author:
+    # Check if the user has permissions to change this entry
+    if not permissions.can_entry(entry_id, "edit"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission to delete this entry."
@@ -198,24 +155,20 @@ def increment_download_count(
     Increment the download count for a journal entry.
     This endpoint is public and doesn't require authentication.
     """
-    db_entry = crud.get_entry(db, entry_id=entry_id)
-    if db_entry is None:
+    exists = db.exec(select(models.JournalEntry.id).where(models.JournalEntry.id == entry_id)).first()
+    if exists is None:
         raise HTTPException(status_code=404, detail="Journal entry not found")
     
-    # Increment the download count
-    db_entry.download_count += 1
-    db.add(db_entry)
-    db.commit()
-    db.refresh(db_entry)
+    # Count the download in the write-behind buffer (see app/counters.py)
+    entry_counters.increment(entry_id, "download_count")
     
     return {"message": "Download count incremented successfully"}
 
 
-@router.get("/by-journal/{journal_id}", response_model=List[schemas.JournalEntryRead])
+@router.get("/by-journal/{journal_id}", response_model=paged(schemas.JournalEntryRead))
 def read_journal_entries_by_journal(
     journal_id: int,
-    skip: int = 0,
-    limit: int = 100,
+    page: PageParams = Depends(),
     db: Session = Depends(get_session),
     current_user: models.User = Depends(auth.get_current_active_user)
 ):
@@ -224,53 +177,39 @@ def read_journal_entries_by_journal(
     """
     statement = select(models.JournalEntry).where(
         models.JournalEntry.journal_id == journal_id
-    ).offset(skip).limit(limit)
+    ).options(*crud.ENTRY_RELATIONSHIPS)
+    statement = page.apply(statement, ENTRY_KEYSET)
     
     entries = db.exec(statement).all()
     
     # Generate random tokens for entries that don't have one
+    missing_tokens = False
     for entry in entries:
         if not entry.random_token:
             entry.generate_random_token()
             db.add(entry)
+            missing_tokens = True
     
-    # Commit all changes at once for efficiency
-    db.commit()
+    # Commit all changes at once for efficiency. Only when something changed:
+    # a commit expires the entries and serializing them would reload each one.
+    if missing_tokens:
+        db.commit()
     
-    return entries
+    return page.respond(entries, ENTRY_KEYSET)
 
 
 @router.get("/{entry_id}/author-updates", response_model=List[models.AuthorUpdate])
 def get_entry_author_updates(
     entry_id: int,
     db: Session = Depends(get_session),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    permissions: Permissions = Depends(),
 ):
     """
     Get all author updates for a specific journal entry.
     """
-    # Check if entry exists
-    db_entry = crud.get_entry(db, entry_id=entry_id)
-    if db_entry is None:
-        raise HTTPException(status_code=404, detail="Journal entry not found")
-    
-    # Check if the user has permissions to access this entry
-    is_author = any(author.id == current_user.id for author in db_entry.authors)
-    is_referee = any(referee.id == current_user.id for referee in db_entry.referees)
-    is_admin_or_owner = current_user.role in [models.UserRole.admin, models.UserRole.owner]
-    
-    # Check if user is editor of the journal containing this entry
-    is_journal_editor = False
-    if current_user.role == models.UserRole.editor and db_entry.journal_id:
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        is_journal_editor = db_entry.journal_id in journal_ids
-    
-    if not is_admin_or_owner and not is_journal_editor and not is_author and not is_referee:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to access updates for this entry."
-        )
+    # Check that the entry exists and the user may read it
+    permissions.require_entry(entry_id, "read", "You don't have permission to access updates for this entry.")
     
     # Get author updates for this entry
     statement = select(models.AuthorUpdate).where(
@@ -286,32 +225,14 @@ def create_author_update(
     entry_id: int,
     author_update: models.AuthorUpdateCreate,
     db: Session = Depends(get_session),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    permissions: Permissions = Depends(),
 ):
     """
     Create a new author update for a specific journal entry.
     """
-    # Check if entry exists
-    db_entry = crud.get_entry(db, entry_id=entry_id)
-    if db_entry is None:
-        raise HTTPException(status_code=404, detail="Journal entry not found")
-    
-    # Check if the user has permissions to access this entry
-    is_author = any(author.id == current_user.id for author in db_entry.authors)
-    is_admin_or_owner = current_user.role in [models.UserRole.admin, models.UserRole.owner]
-    
-    # Check if user is editor of the journal containing this entry
-    is_journal_editor = False
-    if current_user.role == models.UserRole.editor and db_entry.journal_id:
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        is_journal_editor = db_entry.journal_id in journal_ids
-    
-    if not is_admin_or_owner and not is_journal_editor and not is_author:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to create author updates for this entry."
-        )
+    # Check that the entry exists and the user may change it
+    permissions.require_entry(entry_id, "edit", "You don't have permission to create author updates for this entry.")
     
     # Create new author update with the current user as author
     db_author_update = models.AuthorUpdate(
@@ -322,26 +243,23 @@ def create_author_update(
     )
     
     db.add(db_author_update)
+    db.flush()
+    
+    # Queue email notifications to referees and editors, committed with the update
+    notification_utils.notify_on_author_update(
+        db=db,
+        author_id=current_user.id,
+        entry_id=entry_id,
+        author_update_id=db_author_update.id
+    )
     db.commit()
     db.refresh(db_author_update)
     
-    # Send email notifications to referees and editors
-    try:
-        notification_utils.notify_on_author_update(
-            db=db,
-            author_id=current_user.id,
-            entry_id=entry_id,
-            author_update_id=db_author_update.id
-        )
-    except Exception as e:
-        # Log the error but don't fail the request if notification fails
-        print(f"Failed to send notifications for author update: {e}")
-    
     return db_author_update
 
 
 @router.post("/{entry_id}/author-updates/upload", response_model=models.AuthorUpdate, status_code=status.HTTP_201_CREATED)
-async def create_author_update_with_file(
+def create_author_update_with_file(
     entry_id: int,
     file: Optional[UploadFile] = File(None, description="Upload a .docx file. It will be automatically converted to PDF."),
     title: Optional[str] = Form(None),
@@ -351,33 +269,15 @@ async def create_author_update_with_file(
     keywords_en: Optional[str] = Form(None),
     notes: Optional[str] = Form(None),
     db: Session = Depends(get_session),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    permissions: Permissions = Depends(),
 ):
     """
     Create a new author update for a specific journal entry with file upload.
     Only .docx files are accepted and will be automatically converted to PDF.
     """
-    # Check if entry exists
-    db_entry = crud.get_entry(db, entry_id=entry_id)
-    if db_entry is None:
-        raise HTTPException(status_code=404, detail="Journal entry not found")
-    
-    # Check if the user has permissions to access this entry
-    is_author = any(author.id == current_user.id for author in db_entry.authors)
-    is_admin_or_owner = current_user.role in [models.UserRole.admin, models.UserRole.owner]
-    
-    # Check if user is editor of the journal containing this entry
-    is_journal_editor = False  
-    if current_user.role == models.UserRole.editor and db_entry.journal_id:
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        is_journal_editor = db_entry.journal_id in journal_ids
-    
-    if not is_admin_or_owner and not is_journal_editor and not is_author:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to create author updates for this entry."
-        )
+    # Check that the entry exists and the user may change it
+    permissions.require_entry(entry_id, "edit", "You don't have permission to create author updates for this entry.")
     
     # Make sure at least one field is filled or a file is uploaded
     if not title and not abstract_en and not abstract_tr and not keywords and not keywords_en and not notes and not file:
@@ -433,21 +333,18 @@ async def create_author_update_with_file(
     )
     
     db.add(db_author_update)
+    db.flush()
+    
+    # Queue email notifications to referees and editors, committed with the update
+    notification_utils.notify_on_author_update(
+        db=db,
+        author_id=current_user.id,
+        entry_id=entry_id,
+        author_update_id=db_author_update.id
+    )
     db.commit()
     db.refresh(db_author_update)
     
-    # Send email notifications to referees and editors
-    try:
-        notification_utils.notify_on_author_update(
-            db=db,
-            author_id=current_user.id,
-            entry_id=entry_id,
-            author_update_id=db_author_update.id
-        )
-    except Exception as e:
-        # Log the error but don't fail the request if notification fails
-        print(f"Failed to send notifications for author update: {e}")
-    
     return db_author_update
 
 
@@ -455,33 +352,14 @@ async def create_author_update_with_file(
 def get_entry_referee_updates(
     entry_id: int,
     db: Session = Depends(get_session),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    permissions: Permissions = Depends(),
 ):
     """
     Get all referee updates for a specific journal entry.
     """
-    # Check if entry exists
-    db_entry = crud.get_entry(db, entry_id=entry_id)
-    if db_entry is None:
-        raise HTTPException(status_code=404, detail="Journal entry not found")
-    
-    # Check if the user has permissions to access this entry
-    is_author = any(author.id == current_user.id for author in db_entry.authors)
-    is_referee = any(referee.id == current_user.id for referee in db_entry.referees)
-    is_admin_or_owner = current_user.role in [models.UserRole.admin, models.UserRole.owner]
-    
-    # Check if user is editor of the journal containing this entry
-    is_journal_editor = False
-    if current_user.role == models.UserRole.editor and db_entry.journal_id:
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        is_journal_editor = db_entry.journal_id in journal_ids
-    
-    if not is_admin_or_owner and not is_journal_editor and not is_author and not is_referee:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to access updates for this entry."
-        )
+    # Check that the entry exists and the user may read it
+    permissions.require_entry(entry_id, "read", "You don't have permission to access updates for this entry.")
     
     # Get referee updates for this entry
     statement = select(models.RefereeUpdate).where(
@@ -497,32 +375,14 @@ def create_referee_update(
     entry_id: int,
     referee_update: models.RefereeUpdateCreate,
     db: Session = Depends(get_session),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    permissions: Permissions = Depends(),
 ):
     """
     Create a new referee update for a specific journal entry.
     """
-    # Check if entry exists
-    db_entry = crud.get_entry(db, entry_id=entry_id)
-    if db_entry is None:
-        raise HTTPException(status_code=404, detail="Journal entry not found")
-    
-    # Check if the user has permissions to access this entry
-    is_referee = any(referee.id == current_user.id for referee in db_entry.referees)
-    is_admin_or_owner = current_user.role in [models.UserRole.admin, models.UserRole.owner]
-    
-    # Check if user is editor of the journal containing this entry
-    is_journal_editor = False
-    if current_user.role == models.UserRole.editor and db_entry.journal_id:
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        is_journal_editor = db_entry.journal_id in journal_ids
-    
-    if not is_admin_or_owner and not is_journal_editor and not is_referee:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to create referee updates for this entry."
-        )
+    # Check that the entry exists and the user may review it
+    permissions.require_entry(entry_id, "review", "You don't have permission to create referee updates for this entry.")
     
     # Create new referee update with the current user as referee
     db_referee_update = models.RefereeUpdate(
@@ -533,57 +393,36 @@ def create_referee_update(
     )
     
     db.add(db_referee_update)
+    db.flush()
+    
+    # Queue email notifications to authors and editors, committed with the update
+    notification_utils.notify_on_referee_update(
+        db=db,
+        referee_id=current_user.id,
+        entry_id=entry_id,
+        referee_update_id=db_referee_update.id
+    )
     db.commit()
     db.refresh(db_referee_update)
     
-    # Send email notifications to authors and editors
-    try:
-        notification_utils.notify_on_referee_update(
-            db=db,
-            referee_id=current_user.id,
-            entry_id=entry_id,
-            referee_update_id=db_referee_update.id
-        )
-    except Exception as e:
-        # Log the error but don't fail the request if notification fails
-        print(f"Failed to send notifications for referee update: {e}")
-    
     return db_referee_update
 
 
 @router.post("/{entry_id}/referee-updates/upload", response_model=models.RefereeUpdate, status_code=status.HTTP_201_CREATED)
-async def create_referee_update_with_file(
+def create_referee_update_with_file(
     entry_id: int,
     file: Optional[UploadFile] = File(None, description="Upload a .docx file. It will be automatically converted to PDF."),
     notes: Optional[str] = Form(None),
     db: Session = Depends(get_session),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    permissions: Permissions = Depends(),
 ):
     """
     Create a new referee update for a specific journal entry with file upload.
     Only .docx files are accepted and will be automatically converted to PDF.
     """
-    # Check if entry exists
-    db_entry = crud.get_entry(db, entry_id=entry_id)
-    if db_entry is None:
-        raise HTTPException(status_code=404, detail="Journal entry not found")
-    
-    # Check if the user has permissions to access this entry
-    is_referee = any(referee.id == current_user.id for referee in db_entry.referees)
-    is_admin_or_owner = current_user.role in [models.UserRole.admin, models.UserRole.owner]
-    
-    # Check if user is editor of the journal containing this entry
-    is_journal_editor = False
-    if current_user.role == models.UserRole.editor and db_entry.journal_id:
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        is_journal_editor = db_entry.journal_id in journal_ids
-    
-    if not is_admin_or_owner and not is_journal_editor and not is_referee:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to create referee updates for this entry."
-        )
+    # Check that the entry exists and the user may review it
+    permissions.require_entry(entry_id, "review", "You don't have permission to create referee updates for this entry.")
     
     # Make sure at least one field is filled or a file is uploaded
     if not notes and not file:
@@ -619,21 +458,18 @@ async def create_referee_update_with_file(
     )
     
     db.add(db_referee_update)
+    db.flush()
+    
+    # Queue email notifications to authors and editors, committed with the update
+    notification_utils.notify_on_referee_update(
+        db=db,
+        referee_id=current_user.id,
+        entry_id=entry_id,
+        referee_update_id=db_referee_update.id
+    )
     db.commit()
     db.refresh(db_referee_update)
     
-    # Send email notifications to authors and editors
-    try:
-        notification_utils.notify_on_referee_update(
-            db=db,
-            referee_id=current_user.id,
-            entry_id=entry_id,
-            referee_update_id=db_referee_update.id
-        )
-    except Exception as e:
-        # Log the error but don't fail the request if notification fails
-        print(f"Failed to send notifications for referee update: {e}")
-    
     return db_referee_update
 
 
@@ -727,36 +563,19 @@ def delete_referee_update(
 
 
 @router.post("/{entry_id}/upload", response_model=models.JournalEntry)
-async def upload_entry_file(
+def upload_entry_file(
     entry_id: int,
     file: UploadFile = File(..., description="Upload a PDF file."),
     db: Session = Depends(get_session),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    permissions: Permissions = Depends(),
 ):
     """
     Upload a file for a journal entry. Only PDF files are allowed.
     """
-    # Check if entry exists
+    # Check that the entry exists and the user may change it
+    permissions.require_entry(entry_id, "edit", "You don't have permission to upload files for this entry.")
     db_entry = crud.get_entry(db, entry_id=entry_id)
-    if db_entry is None:
-        raise HTTPException(status_code=404, detail="Journal entry not found")
-    
-    # Check if the user has permissions to access this entry
-    is_author = any(author.id == current_user.id for author in db_entry.authors)
-    is_admin_or_owner = current_user.role in [models.UserRole.admin, models.UserRole.owner]
-    
-    # Check if user is editor of the journal containing this entry
-    is_journal_editor = False
-    if current_user.role == models.UserRole.editor and db_entry.journal_id:
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        is_journal_editor = db_entry.journal_id in journal_ids
-    
-    if not is_admin_or_owner and not is_journal_editor and not is_author:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to upload files for this entry."
-        )
     
     # Delete previous file if exists
     if db_entry.file_path:
@@ -776,36 +595,19 @@ async def upload_entry_file(
 
 
 @router.post("/{entry_id}/upload-full-pdf", response_model=models.JournalEntry)
-async def upload_entry_full_pdf(
+def upload_entry_full_pdf(
     entry_id: int,
     file: UploadFile = File(..., description="Upload a PDF file."),
     db: Session = Depends(get_session),
-    current_user: models.User = Depends(auth.get_current_active_user)
+    current_user: models.User = Depends(auth.get_current_active_user),
+    permissions: Permissions = Depends(),
 ):
     """
     Upload a full PDF file for a journal entry. Only PDF files are allowed.
     """
-    # Check if entry exists
+    # Check that the entry exists and the user may change it
+    permissions.require_entry(entry_id, "edit", "You don't have permission to upload files for this entry.")
     db_entry = crud.get_entry(db, entry_id=entry_id)
-    if db_entry is None:
-        raise HTTPException(status_code=404, detail="Journal entry not found")
-    
-    # Check if the user has permissions to access this entry
-    is_author = any(author.id == current_user.id for author in db_entry.authors)
-    is_admin_or_owner = current_user.role in [models.UserRole.admin, models.UserRole.owner]
-    
-    # Check if user is editor of the journal containing this entry
-    is_journal_editor = False
-    if current_user.role == models.UserRole.editor and db_entry.journal_id:
-        editor_journals = crud.get_journals_by_editor(db, user_id=current_user.id)
-        journal_ids = [j.id for j in editor_journals]
-        is_journal_editor = db_entry.journal_id in journal_ids
-    
-    if not is_admin_or_owner and not is_journal_editor and not is_author:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You don't have permission to upload files for this entry."
-        )
     
     # Delete previous file if exists
     if db_entry.full_pdf:
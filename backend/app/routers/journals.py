@@ -6,6 +6,7 @@ import os
 
 from .. import models, auth, crud
 from ..database import get_session
+from ..pagination import PageParams, paged, JOURNAL_KEYSET
 from ..file_utils import save_upload_file, validate_image, validate_docx, validate_pdf, delete_upload_file
 from ..docx_utils import merge_docx_files, create_table_of_contents
 
@@ -43,7 +44,7 @@ def create_journal(
     return db_journal
 
 @router.post("/{journal_id}/upload", response_model=models.Journal)
-async def upload_journal_files(
+def upload_journal_files(
     journal_id: int,
     cover_photo: Optional[UploadFile] = File(None),
     meta_files: Optional[UploadFile] = File(None),
@@ -142,19 +143,18 @@ async def upload_journal_files(
     
     return db_journal
 
-@router.get("/", response_model=List[models.Journal])
+@router.get("/", response_model=paged(models.Journal))
 def get_journals(
     db: Session = Depends(get_session),
     current_user: models.User = Depends(auth.get_current_active_user),
-    skip: int = 0,
-    limit: int = 100
+    page: PageParams = Depends(),
 ):
     """
     Get all journals. Only authenticated users can view journals.
     """
-    statement = select(models.Journal).offset(skip).limit(limit)
+    statement = page.apply(select(models.Journal), JOURNAL_KEYSET)
     journals = db.exec(statement).all()
-    return journals
+    return page.respond(journals, JOURNAL_KEYSET)
 
 @router.put("/{journal_id}", response_model=models.Journal)
 def update_journal(
@@ -224,7 +224,7 @@ def delete_journal(
     return None
 
 @router.post("/{journal_id}/merge", response_model=models.Journal)
-async def merge_journal_files(
+def merge_journal_files(
     journal_id: int,
     db: Session = Depends(get_session),
     current_user: models.User = Depends(auth.get_current_active_user)
@@ -394,7 +394,7 @@ async def merge_journal_files(
     return db_journal
 
 @router.post("/{journal_id}/table-of-contents", response_model=models.Journal)
-async def create_journal_toc(
+def create_journal_toc(
     journal_id: int,
     db: Session = Depends(get_session),
     current_user: models.User = Depends(auth.get_current_active_user)
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlmodel import Session, select, or_, and_
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
+from sqlmodel import select, or_, and_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import func
+from sqlalchemy.exc import DBAPIError
 from typing import List, Optional
+from datetime import timedelta
+from itertools import chain
 
-from .. import models, schemas
-from ..database import get_session
+from .. import models, schemas, search as entry_search
+from ..database import get_async_read_session
+from ..crud import ENTRY_RELATIONSHIPS
+from ..counters import entry_counters, today
+from ..http_cache import PUBLIC_CACHE_MAX_AGE, conditional_response, latest, make_etag
+from ..response_cache import CachedResponse, render, response_cache
+from ..pagination import PageParams, paged, ENTRY_KEYSET, JOURNAL_KEYSET
 from ..auth import get_current_user_optional
 from ..models import UserRole, JournalEntryStatus
 
@@ -13,18 +23,21 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
+
 @router.get("/entries/{entry_id}", response_model=schemas.JournalEntryRead)
-def get_public_entry(
+async def get_public_entry(
     entry_id: int,
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_async_read_session)
 ):
     """
     Get a public journal entry by ID.
     Returns entry regardless of journal publication status.
     """
     # Get the entry with its relationships
-    statement = select(models.JournalEntry).where(models.JournalEntry.id == entry_id)
-    db_entry = db.exec(statement).first()
+    statement = select(models.JournalEntry).where(
+        models.JournalEntry.id == entry_id
+    ).options(*ENTRY_RELATIONSHIPS)
+    db_entry = (await db.exec(statement)).first()
     
     if not db_entry:
         raise HTTPException(
@@ -32,43 +45,88 @@ def get_public_entry(
             detail="Journal entry not found"
         )
     
-    # Increment read count
-    db_entry.read_count += 1
-    db.add(db_entry)
-    db.commit()
-    db.refresh(db_entry)
+    # Count the view in the write-behind buffer (see app/counters.py)
+    entry_counters.increment(db_entry.id, "read_count")
+    entry_counters.apply_pending(db_entry)
     
     return db_entry
 
-@router.get("/journals", response_model=List[models.Journal])
-def get_public_journals(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_session)
+@router.get("/entries/{entry_id}/stats", response_model=schemas.EntryStats)
+async def get_public_entry_stats(
+    entry_id: int,
+    days: int = Query(30, ge=1, le=366),
+    db: AsyncSession = Depends(get_async_read_session)
+):
+    """
+    Get the views and downloads of an entry per day over the last `days` days.
+    Read from the nightly rollups, so today is not included yet.
+    """
+    since = today() - timedelta(days=days)
+    statement = select(models.EntryDailyStats).where(
+        models.EntryDailyStats.entry_id == entry_id,
+        models.EntryDailyStats.day >= since
+    ).order_by(models.EntryDailyStats.day)
+    rows = (await db.exec(statement)).all()
+    
+    return schemas.EntryStats(
+        entry_id=entry_id,
+        since=since,
+        reads=sum(row.reads for row in rows),
+        downloads=sum(row.downloads for row in rows),
+        days=[schemas.DailyStats(day=row.day, reads=row.reads, downloads=row.downloads) for row in rows],
+    )
+
+@router.get("/journals", response_model=paged(models.Journal))
+async def get_public_journals(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_read_session)
 ):
     """
     Get all published journals.
     """
+    # Answer 304 from the count and last change of the published journals
+    count, last_modified = (await db.exec(
+        select(func.count(models.Journal.id), func.max(models.Journal.updated_at)).where(
+            models.Journal.is_published == True
+        )
+    )).one()
+    etag = make_etag("journals", request.url.query, count, last_modified)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
+    
     statement = select(models.Journal).where(
         models.Journal.is_published == True
-    ).offset(skip).limit(limit)
+    )
+    statement = page.apply(statement, JOURNAL_KEYSET)
     
-    journals = db.exec(statement).all()
-    return journals
+    journals = (await db.exec(statement)).all()
+    return page.respond(journals, JOURNAL_KEYSET)
 
 @router.get("/journals/{journal_id}", response_model=models.Journal)
-def get_journal_by_id(
+async def get_journal_by_id(
     journal_id: int,
-    db: Session = Depends(get_session)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_session)
 ):
     """
     Get a journal by ID regardless of publication status.
+    Published journals are served from the response cache.
     """
-    journal = db.exec(
+    cache_key = ("journal", journal_id)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached.respond(request)
+    generation = response_cache.generation
+    
+    journal = (await db.exec(
         select(models.Journal).where(
             models.Journal.id == journal_id
         )
-    ).first()
+    )).first()
     
     if not journal:
         raise HTTPException(
@@ -76,25 +134,47 @@ def get_journal_by_id(
             detail="Journal not found"
         )
     
+    etag = make_etag("journal", journal.id, journal.updated_at)
+    # Unpublished journals are still being edited: always revalidate them
+    max_age = PUBLIC_CACHE_MAX_AGE if journal.is_published else 0
+    not_modified = conditional_response(request, response, etag, journal.updated_at, max_age)
+    if not_modified:
+        return not_modified
+    
+    if journal.is_published:
+        cached = CachedResponse(
+            render(models.Journal, journal), etag, journal.updated_at, max_age, {f"journal:{journal.id}"}
+        )
+        return response_cache.set(cache_key, cached, generation).respond(request)
+    
     return journal
 
-@router.get("/journals/{journal_id}/entries", response_model=List[schemas.JournalEntryRead])
-def get_public_journal_entries(
+@router.get("/journals/{journal_id}/entries", response_model=paged(schemas.JournalEntryRead))
+async def get_public_journal_entries(
     journal_id: int,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_session)
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_read_session)
 ):
     """
     Get all entries for a published journal.
+    Served from the response cache until the journal, one of the entries or
+    one of their authors or referees changes.
     """
+    cache_key = ("journal-entries", journal_id, request.url.query)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return cached.respond(request)
+    generation = response_cache.generation
+    
     # First check if the journal exists and is published
-    journal = db.exec(
+    journal = (await db.exec(
         select(models.Journal).where(
             models.Journal.id == journal_id,
             models.Journal.is_published == True
         )
-    ).first()
+    )).first()
     
     if not journal:
         raise HTTPException(
@@ -102,30 +182,70 @@ def get_public_journal_entries(
             detail="Journal not found"
         )
     
-    # Get entries for this journal
-    statement = select(models.JournalEntry).where(
+    # Only return accepted entries
+    entry_filter = (
         models.JournalEntry.journal_id == journal_id,
-        models.JournalEntry.status == JournalEntryStatus.ACCEPTED  # Only return accepted entries
-    ).offset(skip).limit(limit)
+        models.JournalEntry.status == JournalEntryStatus.ACCEPTED,
+    )
+    
+    # Answer 304 from the count and last change of the entries and of their
+    # authors and referees (the read/download counts are not versioned)
+    accepted_ids = select(models.JournalEntry.id).where(*entry_filter)
+    people_updated = select(func.max(models.User.updated_at)).where(or_(
+        models.User.id.in_(select(models.JournalEntryAuthorLink.user_id).where(
+            models.JournalEntryAuthorLink.journal_entry_id.in_(accepted_ids)
+        )),
+        models.User.id.in_(select(models.JournalEntryRefereeLink.user_id).where(
+            models.JournalEntryRefereeLink.journal_entry_id.in_(accepted_ids)
+        )),
+    )).scalar_subquery()
+    count, entries_last_modified, people_last_modified = (await db.exec(
+        select(
+            func.count(models.JournalEntry.id), func.max(models.JournalEntry.updated_at), people_updated
+        ).where(*entry_filter)
+    )).one()
+    etag = make_etag(
+        "journal-entries", journal_id, request.url.query, journal.updated_at,
+        count, entries_last_modified, people_last_modified
+    )
+    last_modified = latest(journal.updated_at, entries_last_modified, people_last_modified)
+    not_modified = conditional_response(request, response, etag, last_modified)
+    if not_modified:
+        return not_modified
     
-    entries = db.exec(statement).all()
-    return entries
+    # Get entries for this journal
+    statement = select(models.JournalEntry).where(*entry_filter).options(*ENTRY_RELATIONSHIPS)
+    statement = page.apply(statement, ENTRY_KEYSET)
+    
+    entries = (await db.exec(statement)).all()
+    
+    tags = {f"journal:{journal_id}"}
+    for entry in entries:
+        tags.add(f"entry:{entry.id}")
+        tags.update(f"user:{user.id}" for user in chain(entry.authors, entry.referees))
+    cached = CachedResponse(
+        render(paged(schemas.JournalEntryRead), page.respond(entries, ENTRY_KEYSET)),
+        etag, last_modified, PUBLIC_CACHE_MAX_AGE, tags
+    )
+    return response_cache.set(cache_key, cached, generation).respond(request)
 
 @router.get("/journals/{journal_id}/editors", response_model=List[models.JournalEditorLink])
-def get_journal_editors(
+async def get_journal_editors(
     journal_id: int,
-    db: Session = Depends(get_session)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_session)
 ):
     """
     Get all editors for a journal, regardless of publication status.
     This endpoint is public and doesn't require authentication.
     """
     # First check if the journal exists
-    journal = db.exec(
+    journal = (await db.exec(
         select(models.Journal).where(
             models.Journal.id == journal_id
         )
-    ).first()
+    )).first()
     
     if not journal:
         raise HTTPException(
@@ -133,18 +253,26 @@ def get_journal_editors(
             detail="Journal not found"
         )
     
+    # Adding or removing an editor bumps the journal's updated_at
+    etag = make_etag("journal-editors", journal.id, journal.updated_at)
+    not_modified = conditional_response(request, response, etag, journal.updated_at)
+    if not_modified:
+        return not_modified
+    
     # Get editor links for this journal
     statement = select(models.JournalEditorLink).where(
         models.JournalEditorLink.journal_id == journal_id
     )
     
-    editor_links = db.exec(statement).all()
+    editor_links = (await db.exec(statement)).all()
     return editor_links
 
 @router.get("/users/{user_id}", response_model=schemas.UserRead)
-def get_public_user_info(
+async def get_public_user_info(
     user_id: int,
-    db: Session = Depends(get_session)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_session)
 ):
     """
     Get basic information about a user by their ID.
@@ -152,7 +280,7 @@ def get_public_user_info(
     """
     # Get the user
     statement = select(models.User).where(models.User.id == user_id)
-    user = db.exec(statement).first()
+    user = (await db.exec(statement)).first()
     
     if not user:
         raise HTTPException(
@@ -160,19 +288,121 @@ def get_public_user_info(
             detail="User not found"
         )
     
+    etag = make_etag("user", user.id, user.updated_at)
+    not_modified = conditional_response(request, response, etag, user.updated_at)
+    if not_modified:
+        return not_modified
+    
     # Return the user's basic information
     return user
 
+@router.get("/search/entries", response_model=schemas.EntrySearchPage)
+async def search_entries(
+    q: str = Query(..., min_length=1),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_session),
+    current_user: Optional[models.User] = Depends(get_current_user_optional)
+):
+    """
+    Ranked full-text search over entry titles, abstracts and keywords (Turkish and English).
+    Supports web search syntax: "exact phrase", OR, -excluded.
+    Each result carries its rank and an abstract snippet with the matches in <mark> tags.
+    """
+    has_limited_access = (
+        current_user is None or
+        current_user.role not in (UserRole.admin, UserRole.editor, UserRole.owner)
+    )
+    # Fetch one extra row to know whether there is a next page
+    statement = entry_search.ranked_entries_statement(
+        q, offset=(page - 1) * page_size, limit=page_size + 1, public_only=has_limited_access
+    ).options(*ENTRY_RELATIONSHIPS)
+    rows = (await db.exec(statement)).all()
+
+    return schemas.EntrySearchPage(
+        q=q,
+        page=page,
+        page_size=page_size,
+        has_more=len(rows) > page_size,
+        results=[
+            schemas.EntrySearchHit(entry=entry, rank=rank or 0.0, snippet=snippet)
+            for entry, rank, snippet in rows[:page_size]
+        ],
+    )
+
+@router.get("/search/autocomplete", response_model=List[schemas.AutocompleteItem])
+async def autocomplete(
+    q: str = Query(..., min_length=2),
+    kind: str = Query("entries", pattern="^(users|journals|entries)$"),
+    limit: int = Query(8, ge=1, le=20),
+    db: AsyncSession = Depends(get_async_read_session),
+    current_user: Optional[models.User] = Depends(get_current_user_optional)
+):
+    """
+    Typo-tolerant suggestions for a search box: the best `limit` matching user
+    names (admin/owner only), journal titles or entry titles.
+    Returns an empty list rather than waiting when the lookup takes longer than
+    AUTOCOMPLETE_TIMEOUT_MS.
+    """
+    has_limited_access = (
+        current_user is None or
+        current_user.role not in (UserRole.admin, UserRole.editor, UserRole.owner)
+    )
+    if kind == "users":
+        if not current_user or current_user.role not in (UserRole.admin, UserRole.owner):
+            return []
+        columns = (models.User.name_folded,)
+        statement = select(models.User.id, models.User.name)
+    elif kind == "journals":
+        columns = (models.Journal.title_folded, models.Journal.title_en_folded)
+        statement = select(models.Journal.id, models.Journal.title)
+        if has_limited_access:
+            statement = statement.where(models.Journal.is_published == True)
+    else:
+        columns = (models.JournalEntry.title_folded, models.JournalEntry.title_en_folded)
+        statement = select(models.JournalEntry.id, models.JournalEntry.title)
+        if has_limited_access:
+            statement = entry_search.public_entries_only(statement)
+
+    rank = entry_search.fuzzy_rank(q, *columns)
+    statement = statement.add_columns(rank).where(
+        entry_search.fuzzy_match_condition(q, *columns)
+    ).order_by(rank.desc()).limit(limit)
+
+    try:
+        if entry_search.TRIGRAM_SEARCH:
+            await db.exec(entry_search.set_similarity_threshold(entry_search.similarity_threshold()))
+            await db.exec(entry_search.set_local_statement_timeout(entry_search.AUTOCOMPLETE_TIMEOUT_MS))
+        rows = (await db.exec(statement)).all()
+    except DBAPIError as e:
+        if not entry_search.is_statement_timeout(e):
+            raise
+        # Suggestions are optional, so give up quietly instead of making the user wait
+        print(f"Autocomplete for {kind!r} timed out after {entry_search.AUTOCOMPLETE_TIMEOUT_MS}ms")
+        await db.rollback()
+        return []
+
+    return [
+        schemas.AutocompleteItem(id=row_id, label=label, score=score or 0.0)
+        for row_id, label, score in rows
+    ]
+
 @router.get("/search", response_model=schemas.SearchResults)
 async def search(
     q: str,
-    db: Session = Depends(get_session),
+    db: AsyncSession = Depends(get_async_read_session),
     limit: int = 25,
+    fuzzy: bool = False,
+    threshold: Optional[float] = Query(None, ge=0, le=1),
     current_user: Optional[models.User] = Depends(get_current_user_optional)
 ):
     """
-    Search across users, journals, and journal entries by name, title, or token.
-    Case-insensitive search using SQL ILIKE.
+    Search across users, journals, and journal entries.
+    User names and journal titles are matched ignoring case, accents and the
+    Turkish dotted/dotless i; entries are matched by full-text search on
+    PostgreSQL (the same folded matching elsewhere) or by token.
+    With fuzzy=true, names and titles are matched by trigram similarity instead,
+    so misspelled names still match (threshold overrides SEARCH_SIMILARITY_THRESHOLD).
     Results are filtered based on authentication status and user role.
     """
     # Prepare empty results
@@ -182,9 +412,6 @@ async def search(
         entries=[]
     )
     
-    # Use % for wildcard matching and ilike for case-insensitive search
-    search_pattern = f"%{q}%"
-    
     # Determine if user has limited access (not logged in or author/referee)
     has_limited_access = (
         current_user is None or 
@@ -192,68 +419,59 @@ async def search(
          current_user.role != UserRole.editor and 
          current_user.role != UserRole.owner)
     )
-    
-    # Search users by name (case-insensitive)
+
+    if fuzzy and entry_search.TRIGRAM_SEARCH:
+        await db.exec(entry_search.set_similarity_threshold(entry_search.similarity_threshold(threshold)))
+
+    # Search users by name (case- and accent-insensitive)
     if len(q) >= 3:  # Only search if query is at least 3 characters
         # Only search for users if the current user is an admin or owner
         if current_user and (current_user.role == UserRole.admin or current_user.role == UserRole.owner):
-            users_statement = select(models.User).where(
-                models.User.name.ilike(search_pattern)
-            ).limit(limit)
-            users = db.exec(users_statement).all()
+            if fuzzy:
+                users_statement = select(models.User).where(
+                    entry_search.fuzzy_match_condition(q, models.User.name_folded)
+                ).order_by(entry_search.fuzzy_rank(q, models.User.name_folded).desc()).limit(limit)
+            else:
+                users_statement = select(models.User).where(
+                    entry_search.folded_match_condition(q, models.User.name_folded)
+                ).limit(limit)
+            users = (await db.exec(users_statement)).all()
             results.users = users
     
-    # Search journals by title or title_en (case-insensitive)
-    if has_limited_access:
-        # For limited access, only show published journals
+    # Search journals by title or title_en (case- and accent-insensitive)
+    journal_columns = (models.Journal.title_folded, models.Journal.title_en_folded)
+    if fuzzy:
         journals_statement = select(models.Journal).where(
-            and_(
-                or_(
-                    models.Journal.title.ilike(search_pattern),
-                    models.Journal.title_en.ilike(search_pattern)
-                ),
-                models.Journal.is_published == True
-            )
-        ).limit(limit)
+            entry_search.fuzzy_match_condition(q, *journal_columns)
+        ).order_by(entry_search.fuzzy_rank(q, *journal_columns).desc())
     else:
-        # For admin/editor/owner, show all journals
         journals_statement = select(models.Journal).where(
-            or_(
-                models.Journal.title.ilike(search_pattern),
-                models.Journal.title_en.ilike(search_pattern)
-            )
-        ).limit(limit)
+            entry_search.folded_match_condition(q, *journal_columns)
+        )
+    if has_limited_access:
+        # For limited access, only show published journals
+        journals_statement = journals_statement.where(models.Journal.is_published == True)
+    journals_statement = journals_statement.limit(limit)
     
-    journals = db.exec(journals_statement).all()
+    journals = (await db.exec(journals_statement)).all()
     results.journals = journals
     
-    # Search entries by title, title_en, or random_token (case-insensitive)
+    # Search entries by titles, abstracts, keywords (full-text on PostgreSQL) or random_token
+    entry_condition = entry_search.entry_match_condition(q)
+    entry_order = [entry_search.entry_rank(q).desc()]
+    if fuzzy:
+        entry_columns = (models.JournalEntry.title_folded, models.JournalEntry.title_en_folded)
+        entry_condition = or_(entry_condition, entry_search.fuzzy_match_condition(q, *entry_columns))
+        entry_order.insert(0, entry_search.fuzzy_rank(q, *entry_columns).desc())
+    entries_statement = select(models.JournalEntry).where(entry_condition)
     if has_limited_access:
         # For limited access, only show accepted entries that are in published journals
-        entries_statement = select(models.JournalEntry).join(
-            models.Journal, models.JournalEntry.journal_id == models.Journal.id
-        ).where(
-            and_(
-                or_(
-                    models.JournalEntry.title.ilike(search_pattern),
-                    models.JournalEntry.title_en.ilike(search_pattern),
-                    models.JournalEntry.random_token.ilike(search_pattern)
-                ),
-                models.JournalEntry.status == JournalEntryStatus.ACCEPTED,
-                models.Journal.is_published == True
-            )
-        ).limit(limit)
-    else:
-        # For admin/editor/owner, show all entries
-        entries_statement = select(models.JournalEntry).where(
-            or_(
-                models.JournalEntry.title.ilike(search_pattern),
-                models.JournalEntry.title_en.ilike(search_pattern),
-                models.JournalEntry.random_token.ilike(search_pattern)
-            )
-        ).limit(limit)
+        entries_statement = entry_search.public_entries_only(entries_statement)
+    entries_statement = entries_statement.order_by(
+        *entry_order, models.JournalEntry.created_date.desc()
+    ).options(*ENTRY_RELATIONSHIPS).limit(limit)
     
-    entries = db.exec(entries_statement).all()
+    entries = (await db.exec(entries_statement)).all()
     results.entries = entries
     
-    return results 
\ No newline at end of file
+    return results
@@ -13,7 +13,7 @@ from .models import (
 from pydantic import BaseModel, EmailStr, Field, validator
 from typing import Optional, List
 from enum import Enum
-from datetime import datetime
+from datetime import date, datetime
 import re
 
 # User schemas
@@ -51,6 +51,7 @@ class UserUpdate(BaseModel):
     is_auth: Optional[bool] = None
     marked_for_deletion: Optional[bool] = None
     tutorial_done: Optional[bool] = None
+    notification_digest: Optional[bool] = None
 
 
 class UserDelete(BaseModel):
@@ -80,12 +81,52 @@ class SearchResults(BaseModel):
     entries: List[JournalEntryRead] = []
 
 
+class EntrySearchHit(BaseModel):
+    """A journal entry matched by full-text search."""
+    entry: JournalEntryRead
+    rank: float = 0.0
+    snippet: Optional[str] = None  # abstract fragment, matches wrapped in <mark>
+
+
+class EntrySearchPage(BaseModel):
+    """One page of ranked entry search results."""
+    q: str
+    page: int
+    page_size: int
+    has_more: bool
+    results: List[EntrySearchHit] = []
+
+
+class AutocompleteItem(BaseModel):
+    """A search box suggestion."""
+    id: int
+    label: str
+    score: float = 0.0
+
+
+class DailyStats(BaseModel):
+    """Views and downloads on one day."""
+    day: date
+    reads: int = 0
+    downloads: int = 0
+
+
+class EntryStats(BaseModel):
+    """Daily views and downloads of an entry, from the nightly rollups."""
+    entry_id: int
+    since: date
+    reads: int = 0
+    downloads: int = 0
+    days: List[DailyStats] = []
+
+
 class UserRead(UserBase):
     id: int
     role: UserRole
     is_auth: bool
     marked_for_deletion: bool = False
     tutorial_done: bool = False
+    notification_digest: bool = False
 
 # Define __all__ to explicitly export the schemas
 __all__ = [
@@ -93,5 +134,6 @@ __all__ = [
     'Journal', 'JournalCreate', 'JournalRead',
     'JournalEntry', 'JournalEntryCreate', 'JournalEntryRead', 'JournalEntryUpdate',
     'UserBase', 'UserDelete', 'EditorInChiefUpdate', 'EditorAdd', 'EntryUserAdd', 'TokenData',
-    'SearchResults'
+    'SearchResults', 'EntrySearchHit', 'EntrySearchPage', 'AutocompleteItem',
+    'DailyStats', 'EntryStats'
 ] 
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+Full-text and fuzzy search.
+
+On PostgreSQL entries are matched against the generated
+journalentry.search_vector column (see models.JOURNAL_ENTRY_SEARCH_VECTOR)
+with websearch_to_tsquery, ranked with ts_rank_cd and highlighted with
+ts_headline. Names and titles can also be looked up with pg_trgm word
+similarity, which tolerates typos. Other databases (SQLite in development)
+fall back to ILIKE.
+
+Names and titles are always compared through their *_folded columns and a
+query folded with the same text_utils.fold_text, so "istanbul" finds
+"İstanbul" and "Isik" finds "Işık".
+"""
+import os
+
+from sqlalchemy import func, literal, literal_column, case, or_, and_, null
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlmodel import select
+
+from . import models
+from .database import engine
+from .models import JournalEntryStatus
+from .text_utils import fold_text
+
+FULL_TEXT_SEARCH = engine.dialect.name == "postgresql"
+TRIGRAM_SEARCH = engine.dialect.name == "postgresql"
+
+# pg_trgm word similarity (0-1) a name or title needs to count as a fuzzy match
+SEARCH_SIMILARITY_THRESHOLD = float(os.getenv("SEARCH_SIMILARITY_THRESHOLD", 0.3))
+# Autocomplete gives up (and returns nothing) after this many milliseconds
+AUTOCOMPLETE_TIMEOUT_MS = int(os.getenv("AUTOCOMPLETE_TIMEOUT_MS", 150))
+
+TURKISH = literal_column("'turkish'::regconfig")
+ENGLISH = literal_column("'english'::regconfig")
+
+search_vector = literal_column("journalentry.search_vector", type_=TSVECTOR)
+
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+
+def entry_tsquery(q: str):
+    """Query matching q as Turkish or English (websearch syntax: quotes, OR, -word)."""
+    return func.websearch_to_tsquery(TURKISH, q).op("||")(func.websearch_to_tsquery(ENGLISH, q))
+
+
+def folded_match_condition(q: str, *columns):
+    """WHERE clause finding the folded q inside any of the folded columns."""
+    folded_q = fold_text(q)
+    return or_(*(column.contains(folded_q, autoescape=True) for column in columns))
+
+
+def _ilike_condition(q: str):
+    pattern = f"%{q}%"
+    return or_(
+        folded_match_condition(q, models.JournalEntry.title_folded, models.JournalEntry.title_en_folded),
+        models.JournalEntry.abstract_tr.ilike(pattern),
+        models.JournalEntry.abstract_en.ilike(pattern),
+        models.JournalEntry.keywords.ilike(pattern),
+        models.JournalEntry.keywords_en.ilike(pattern),
+    )
+
+
+def entry_match_condition(q: str):
+    """WHERE clause matching entries by text, or by their random token."""
+    token_match = models.JournalEntry.random_token.ilike(f"%{q}%")
+    if FULL_TEXT_SEARCH:
+        # to_tsvector keeps accents, so also look in the folded titles
+        title_match = folded_match_condition(q, models.JournalEntry.title_folded, models.JournalEntry.title_en_folded)
+        return or_(search_vector.op("@@")(entry_tsquery(q)), title_match, token_match)
+    return or_(_ilike_condition(q), token_match)
+
+
+def entry_rank(q: str):
+    """Relevance of an entry for q (0 when full-text search is unavailable)."""
+    if FULL_TEXT_SEARCH:
+        return func.ts_rank_cd(search_vector, entry_tsquery(q))
+    return literal_column("0.0")
+
+
+def entry_snippet(q: str):
+    """Abstract fragment with the matched words wrapped in <mark> tags."""
+    if not FULL_TEXT_SEARCH:
+        return null()
+    tsquery = entry_tsquery(q)
+    return case(
+        (
+            and_(models.JournalEntry.language == "en", models.JournalEntry.abstract_en.isnot(None)),
+            func.ts_headline(ENGLISH, models.JournalEntry.abstract_en, tsquery, HEADLINE_OPTIONS),
+        ),
+        else_=func.ts_headline(TURKISH, func.coalesce(models.JournalEntry.abstract_tr, ""), tsquery, HEADLINE_OPTIONS),
+    )
+
+
+def public_entries_only(statement):
+    """Restrict a JournalEntry query to accepted entries of published journals."""
+    return statement.join(
+        models.Journal, models.JournalEntry.journal_id == models.Journal.id
+    ).where(
+        and_(
+            models.JournalEntry.status == JournalEntryStatus.ACCEPTED,
+            models.Journal.is_published == True
+        )
+    )
+
+
+def ranked_entries_statement(q: str, offset: int, limit: int, public_only: bool = True):
+    """
+    Select (entry, rank, snippet) rows for q, best match first.
+
+    Ranking and pagination run on the entry ids alone; the snippets, which are
+    expensive to build, are only computed for the rows of the requested page.
+    """
+    rank = entry_rank(q).label("rank")
+    ranked = select(models.JournalEntry.id, rank).where(entry_match_condition(q))
+    if public_only:
+        ranked = public_entries_only(ranked)
+    ranked = ranked.order_by(
+        rank.desc(), models.JournalEntry.created_date.desc(), models.JournalEntry.id.desc()
+    ).offset(offset).limit(limit).subquery()
+
+    return select(
+        models.JournalEntry, ranked.c.rank, entry_snippet(q).label("snippet")
+    ).join(
+        ranked, models.JournalEntry.id == ranked.c.id
+    ).order_by(
+        ranked.c.rank.desc(), models.JournalEntry.created_date.desc(), models.JournalEntry.id.desc()
+    )
+
+
+
+def similarity_threshold(threshold: float = None) -> float:
+    """The requested threshold clamped to 0-1, or the configured default."""
+    if threshold is None:
+        return SEARCH_SIMILARITY_THRESHOLD
+    return min(max(threshold, 0.0), 1.0)
+
+
+def set_similarity_threshold(threshold: float):
+    """
+    Statement applying the fuzzy match threshold for the rest of the transaction.
+    The `<%` operator (and so the trigram index) uses it instead of a literal.
+    """
+    return select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True))
+
+
+def set_local_statement_timeout(timeout_ms: int):
+    """Statement limiting every following query of the transaction to timeout_ms."""
+    return select(func.set_config("statement_timeout", f"{timeout_ms}ms", True))
+
+
+def is_statement_timeout(error) -> bool:
+    """True if a DBAPIError was raised because statement_timeout expired."""
+    return getattr(error.orig, "pgcode", None) == "57014"  # query_canceled
+
+
+def fuzzy_match_condition(q: str, *columns):
+    """WHERE clause matching q against any of the folded columns despite typos."""
+    if TRIGRAM_SEARCH:
+        folded_q = fold_text(q)
+        return or_(*(literal(folded_q).op("<%")(column) for column in columns))
+    return folded_match_condition(q, *columns)
+
+
+def fuzzy_rank(q: str, *columns):
+    """Best word similarity of q against the folded columns (0 without pg_trgm)."""
+    if not TRIGRAM_SEARCH:
+        return literal_column("0.0")
+    folded_q = fold_text(q)
+    similarities = [func.word_similarity(literal(folded_q), func.coalesce(column, "")) for column in columns]
+    return similarities[0] if len(similarities) == 1 else func.greatest(*similarities)
@@ -1,6 +1,10 @@
+import asyncio
 import os
 import secrets
 import string
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Union, Optional
 
@@ -18,7 +22,95 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # --- Password Hashing --- 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# bcrypt cost factor for new hashes; existing hashes are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+# Threads hashing and verifying passwords, and how many calls may wait for one
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", 64))
+
+
+class PasswordPoolBusy(Exception):
+    """PASSWORD_HASH_MAX_QUEUE calls are already waiting for the pool; requests answer 503 (see main.py)."""
+
+
+class PasswordHashPool:
+    """
+    Bounded executor for bcrypt. A hash takes a few hundred milliseconds of
+    CPU, so at most PASSWORD_HASH_WORKERS run at once and a burst of logins
+    queues here instead of starving the event loop and the request threads.
+    Beyond PASSWORD_HASH_MAX_QUEUE waiting calls submit() raises PasswordPoolBusy.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise PasswordPoolBusy(f"{self.queued} password hashing calls are already waiting")
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        return self._executor.submit(self._run, time.perf_counter(), fn, *args)
+
+    def _run(self, submitted_at: float, fn, *args):
+        wait_ms = (time.perf_counter() - submitted_at) * 1000
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    def call(self, fn, *args):
+        """Run fn in the pool and wait for it (for sync code)."""
+        return self.submit(fn, *args).result()
+
+    async def run(self, fn, *args):
+        """Run fn in the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "rounds": BCRYPT_ROUNDS,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "max_queue_depth": self.max_queue_depth,
+                "wait_avg_ms": round(self.wait_total_ms / self.completed, 2) if self.completed else None,
+                "wait_max_ms": round(self.wait_max_ms, 2),
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.completed = self.rejected = 0
+            self.max_queue_depth = self.queued
+            self.wait_total_ms = self.wait_max_ms = 0.0
+
+
+password_hash_pool = PasswordHashPool()
+
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
     # Convert passwords to bytes
     password_bytes = plain_password.encode('utf-8')
     hashed_bytes = hashed_password.encode('utf-8')
@@ -26,16 +118,36 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
-def get_password_hash(password: str) -> str:
+def _hashpw(password: str) -> str:
     # Convert the password to bytes
     password_bytes = password.encode('utf-8')
     # Generate salt and hash the password
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     # Return the hash as a string
     return hashed.decode('utf-8')
 
 
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return password_hash_pool.call(_checkpw, plain_password, hashed_password)
+
+
+def get_password_hash(password: str) -> str:
+    return password_hash_pool.call(_hashpw, password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash for async handlers."""
+    return await password_hash_pool.run(_hashpw, password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different cost than BCRYPT_ROUNDS."""
+    # $2b$12$<salt and hash>
+    parts = hashed_password.split("$")
+    return len(parts) < 4 or not parts[2].isdigit() or int(parts[2]) != BCRYPT_ROUNDS
+
+
 def get_random_string(length: int) -> str:
     """Generate a random string of specified length."""
     alphabet = string.ascii_letters + string.digits
@@ -48,10 +160,18 @@ def get_random_string(length: int) -> str:
 SECRET_KEY = os.getenv("SECRET_KEY", "your_default_secret_key_here_if_not_set") # Keep secret! Default is insecure.
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 43200))
+# Tokens issued before user ids were used as subjects are accepted until this
+# UTC time (ISO 8601, e.g. 2026-10-24T00:00), so sessions can move to new
+# tokens; unset, they are rejected
+LEGACY_TOKENS_UNTIL = (
+    datetime.fromisoformat(os.environ["LEGACY_TOKENS_UNTIL"]) if os.getenv("LEGACY_TOKENS_UNTIL") else None
+)
 
 # Pydantic model for token data (the payload/claims)
 class TokenData(BaseModel):
-    email: Optional[str] = None
+    user_id: Optional[int] = None
+    email: Optional[str] = None  # subject of tokens issued before user ids were used
+    version: int = 0  # must match the user's token_version
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -62,4 +182,28 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt 
\ No newline at end of file
+    return encoded_jwt 
+
+
+def create_user_token(user, expires_delta: Optional[timedelta] = None, **claims) -> str:
+    """Access token for a user: the subject is the user id and "ver" the user's token_version."""
+    return create_access_token({"sub": str(user.id), "ver": user.token_version, **claims}, expires_delta)
+
+
+def decode_access_token(token: str) -> TokenData:
+    """The claims of a valid access token. Raises JWTError for anything else."""
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    subject = payload.get("sub")
+    if not isinstance(subject, str) or not subject:
+        raise JWTError("Token has no subject")
+    if subject.isdigit():
+        version = payload.get("ver", 0)
+        if not isinstance(version, int):
+            raise JWTError("Invalid token version")
+        return TokenData(user_id=int(subject), version=version)
+    # Older tokens name the user by email and predate token versions. Looked up
+    # by email, they would outlive an email change, so they are only accepted
+    # until LEGACY_TOKENS_UNTIL (and count as version 0 until then)
+    if LEGACY_TOKENS_UNTIL is None or datetime.utcnow() >= LEGACY_TOKENS_UNTIL:
+        raise JWTError("Email-subject tokens are no longer accepted")
+    return TokenData(email=subject)
@@ -0,0 +1,110 @@
+"""
+In-process cache of the single Settings row.
+
+The frontend asks for the settings (active journal, about text) on most page
+loads, so crud.get_settings serves them from memory and reads the row only
+after it changed or every SETTINGS_CACHE_TTL seconds. Any commit that writes
+the row (crud.update_settings, crud.create_settings) invalidates the cache of
+this worker at once and of the other workers through app/invalidation.py.
+"""
+import os
+import threading
+import time
+from itertools import chain
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import models
+from .invalidation import notify, subscribe
+
+# Upper bound on staleness when a worker missed an invalidation (e.g. without PostgreSQL)
+SETTINGS_CACHE_TTL = float(os.getenv("SETTINGS_CACHE_TTL", 60))  # seconds
+
+
+class SettingsCache:
+    """The column values of the settings row, reloaded after invalidation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = None
+        self._expires_at = 0.0
+        # Bumped by every invalidation so a read that raced a write is not stored
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, db) -> Optional[models.Settings]:
+        """
+        The settings, as a detached copy on a hit and as the session's own row
+        on a miss. Either way callers must not modify it; crud.update_settings
+        loads the row itself.
+        """
+        with self._lock:
+            values = self._values if self._expires_at > time.monotonic() else None
+            if values is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            generation = self.generation
+        if values is not None:
+            return models.Settings(**values)
+
+        settings = db.get(models.Settings, 1)
+        if settings is not None:
+            with self._lock:
+                if self.generation == generation:
+                    self._values = settings.model_dump()
+                    self._expires_at = time.monotonic() + SETTINGS_CACHE_TTL
+        return settings
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            if self._values is not None:
+                self.invalidations += 1
+            self._values = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cached": self._values is not None and self._expires_at > time.monotonic(),
+                "ttl_seconds": SETTINGS_CACHE_TTL,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "invalidations": self.invalidations,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.invalidations = 0
+
+
+settings_cache = SettingsCache()
+subscribe("settings", lambda keys: settings_cache.invalidate())
+
+
+# --------------------- Invalidation on commit ---------------------
+
+@event.listens_for(Session, "after_flush")
+def _collect_settings(session, flush_context):
+    if session.info.get("settings_changed"):
+        return
+    if any(isinstance(instance, models.Settings) for instance in chain(session.new, session.dirty, session.deleted)):
+        session.info["settings_changed"] = True
+        notify(session, "settings")
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    if session.info.pop("settings_changed", None):
+        settings_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop("settings_changed", None)
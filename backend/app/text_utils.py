@@ -0,0 +1,30 @@
+import re
+import unicodedata
+from typing import Optional
+
+# Turkish dotted/dotless i all fold to plain "i", so "istanbul", "İstanbul"
+# and "ISTANBUL" compare equal. Python's lower() would turn "İ" into "i̇"
+# and leave "I" as "i" instead of "ı", which is what ILIKE gets wrong as well.
+_TURKISH_I = str.maketrans({"İ": "i", "I": "i", "ı": "i"})
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fold_text(value: Optional[str]) -> Optional[str]:
+    """
+    Normalize text for searching: Turkish-aware lowercase, accents removed
+    (ş -> s, ğ -> g, â -> a, ...) and whitespace collapsed.
+
+    Used both for the *_folded search columns and for the query string,
+    so the two always match.
+
+    Args:
+        value: The text to fold
+
+    Returns:
+        str: The folded text, or None if value is None
+    """
+    if value is None:
+        return None
+    folded = unicodedata.normalize("NFKD", value.translate(_TURKISH_I))
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    return _WHITESPACE.sub(" ", folded.casefold()).strip()
@@ -0,0 +1,152 @@
+"""
+In-process cache of authenticated users.
+
+get_current_user used to look the user up by the token's subject on every
+request. The cache keeps each user's column values for USER_CACHE_TTL seconds
+and hands them back with Session.merge(load=False), which attaches the user
+to the request's session without a query. Handlers can still modify and
+commit it as before.
+
+Any commit that inserts, updates or deletes a user (crud.update_user,
+update_user_password, delete_user, role changes, confirmations and password
+resets alike) drops that user from the cache of this worker and, through
+app/invalidation.py, of the other workers.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+from itertools import chain
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from . import models
+from .invalidation import notify, subscribe
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 60))  # seconds
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", 10000))
+
+
+def _column_values(user: models.User) -> dict:
+    return {attr.key: getattr(user, attr.key) for attr in inspect(models.User).column_attrs}
+
+
+class UserCache:
+    """Detached users keyed by token subject, invalidated by user id."""
+
+    def __init__(self, max_entries: int = USER_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # subject -> (detached user, expiry)
+        self._users = {}
+        # user id -> subjects (user id, or email for older tokens)
+        self._subjects = defaultdict(set)
+        # Bumped by every invalidation so a read that raced a write is not stored
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, db: Session, subject: str, load) -> Optional[models.User]:
+        """
+        The user for a token subject, attached to db. On a miss load(db) reads
+        it from the database.
+        """
+        with self._lock:
+            cached, expires_at = self._users.get(subject, (None, 0.0))
+            if cached is not None and expires_at <= time.monotonic():
+                self._remove(subject)
+                cached = None
+            if cached is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            generation = self.generation
+        if cached is not None:
+            return db.merge(cached, load=False)
+
+        user = load(db)
+        if user is not None:
+            detached = models.User(**_column_values(user))
+            make_transient_to_detached(detached)
+            with self._lock:
+                if self.generation == generation:
+                    self._remove(subject)
+                    if len(self._users) >= self.max_entries:
+                        self._remove(next(iter(self._users)))
+                    self._users[subject] = (detached, time.monotonic() + USER_CACHE_TTL)
+                    self._subjects[user.id].add(subject)
+        return user
+
+    def invalidate(self, user_ids=None):
+        """Forget the given users, or everyone if user_ids is None."""
+        with self._lock:
+            self.generation += 1
+            if user_ids is None:
+                self.invalidations += len(self._users)
+                self._users.clear()
+                self._subjects.clear()
+                return
+            for user_id in user_ids:
+                for subject in list(self._subjects.get(user_id, ())):
+                    self._remove(subject)
+                    self.invalidations += 1
+
+    def _remove(self, subject):
+        cached, _ = self._users.pop(subject, (None, 0.0))
+        if cached is None:
+            return
+        subjects = self._subjects.get(cached.id)
+        if subjects is not None:
+            subjects.discard(subject)
+            if not subjects:
+                del self._subjects[cached.id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._users),
+                "max_entries": self.max_entries,
+                "ttl_seconds": USER_CACHE_TTL,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "invalidations": self.invalidations,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.invalidations = 0
+
+
+user_cache = UserCache()
+subscribe("users", user_cache.invalidate)
+
+
+# --------------------- Invalidation on commit ---------------------
+
+@event.listens_for(Session, "after_flush")
+def _collect_users(session, flush_context):
+    flushed = {
+        instance.id for instance in chain(session.new, session.dirty, session.deleted)
+        if isinstance(instance, models.User) and instance.id is not None
+    }
+    user_ids = session.info.setdefault("user_cache_ids", set())
+    if flushed - user_ids:
+        notify(session, "users", flushed - user_ids)
+    user_ids |= flushed
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    user_ids = session.info.pop("user_cache_ids", None)
+    if user_ids:
+        user_cache.invalidate(user_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop("user_cache_ids", None)
@@ -0,0 +1,92 @@
+"""
+Fixtures shared by the tests. They run the app against a temporary SQLite
+database, created by the app's own startup:
+
+    cd backend && python -m pytest
+"""
+import os
+import tempfile
+
+import pytest
+
+# Read by app.database when it is first imported
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+
+PASSWORD = "Password1"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db(client):
+    from sqlmodel import Session
+    from app.database import engine
+
+    with Session(engine) as db:
+        yield db
+
+
+@pytest.fixture(scope="session")
+def password_hash(client):
+    from app import security
+
+    return security.get_password_hash(PASSWORD)
+
+
+@pytest.fixture
+def make_user(db, password_hash):
+    """Add a user whose password is PASSWORD; emails must be unique across the tests."""
+    from app import models
+
+    def make_user(email: str, role: str = "author", **fields) -> models.User:
+        user = models.User(
+            email=email, name=email.split("@")[0], role=role, is_auth=True, hashed_password=password_hash, **fields
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        return user
+
+    return make_user
+
+
+@pytest.fixture
+def login(client):
+    """The Authorization header of a fresh token for the user with the email."""
+
+    def login(email: str, password: str = PASSWORD) -> dict:
+        response = client.post("/token", data={"username": email, "password": password})
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return login
+
+
+@pytest.fixture
+def outbox(client, monkeypatch):
+    """app.outbox, delivering to the fake transport, with an empty email_outbox table."""
+    from sqlalchemy import delete
+    from app import email_utils, models, outbox
+    from app.database import engine
+
+    monkeypatch.setattr(email_utils, "EMAIL_TRANSPORT", "fake")
+    monkeypatch.setattr(email_utils, "_transports", {})
+    monkeypatch.setattr(outbox, "DELIVERY_ENABLED", True)
+    with engine.begin() as connection:
+        connection.execute(delete(models.EmailOutbox))
+    return outbox
+
+
+@pytest.fixture
+def transport(outbox):
+    """The FakeTransport the outbox sends through."""
+    from app import email_utils
+
+    return email_utils.get_transport(outbox.BREVO_API_KEY)
@@ -0,0 +1,47 @@
+"""
+Editors may only change the authors and referees of entries in journals they
+edit (see permissions.edits_journal).
+"""
+import pytest
+
+
+@pytest.fixture
+def editor_setup(db, make_user):
+    from app import models
+
+    editor = make_user("scoped-editor@example.com", role="editor")
+    member = make_user("scoped-member@example.com", role="referee")
+    own, other = models.Journal(title="Own", issue="1"), models.Journal(title="Other", issue="2")
+    db.add_all([own, other])
+    db.flush()
+    db.add(models.JournalEditorLink(journal_id=own.id, user_id=editor.id))
+    entries = {}
+    for journal in (own, other):
+        entry = models.JournalEntry(title=journal.title, abstract_tr="Özet", journal_id=journal.id)
+        db.add(entry)
+        db.flush()
+        # Existing links, so the DELETE requests reach the permission check
+        db.add(models.JournalEntryAuthorLink(journal_entry_id=entry.id, user_id=member.id))
+        db.add(models.JournalEntryRefereeLink(journal_entry_id=entry.id, user_id=member.id))
+        entries[journal.title] = entry.id
+    db.commit()
+    return editor, member, entries
+
+
+def _requests(client, headers, entry_id: int, user_id: int) -> list:
+    """Status codes of removing and re-adding the user as author and referee."""
+    base = f"/editors/entries/{entry_id}"
+    return [
+        client.delete(f"{base}/authors/{user_id}", headers=headers).status_code,
+        client.post(f"{base}/authors", json={"user_id": user_id}, headers=headers).status_code,
+        client.delete(f"{base}/referees/{user_id}", headers=headers).status_code,
+        client.post(f"{base}/referees", json={"user_id": user_id}, headers=headers).status_code,
+    ]
+
+
+def test_editor_cannot_manage_entries_of_other_journals(client, login, editor_setup):
+    editor, member, entries = editor_setup
+    headers = login(editor.email)
+
+    assert _requests(client, headers, entries["Other"], member.id) == [403, 403, 403, 403]
+    assert _requests(client, headers, entries["Own"], member.id) == [204, 200, 204, 200]
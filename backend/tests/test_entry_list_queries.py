@@ -0,0 +1,68 @@
+"""
+Entry listings load authors and referees for the whole page up front
+(crud.ENTRY_RELATIONSHIPS), so the number of queries of a request must not
+grow with the page size.
+"""
+import pytest
+
+ENTRY_COUNT = 25
+
+# (route as recorded by app/query_stats.py, path)
+LIST_ENDPOINTS = [
+    ("GET /entries/", "/entries/"),
+    ("GET /entries/by-journal/{journal_id}", "/entries/by-journal/{journal_id}"),
+    ("GET /public/journals/{journal_id}/entries", "/public/journals/{journal_id}/entries"),
+    ("GET /users/me/entries", "/users/me/entries"),
+]
+
+
+@pytest.fixture(scope="module")
+def journal(client, password_hash):
+    """A published journal of ENTRY_COUNT entries with two authors and two referees each."""
+    from sqlmodel import Session
+    from app import models
+    from app.database import engine
+
+    with Session(engine) as db:
+        users = [
+            models.User(
+                email=f"list-{role}{i}@example.com", name=f"{role} {i}", role=role, is_auth=True,
+                hashed_password=password_hash,
+            )
+            for role in ("author", "referee") for i in range(2)
+        ]
+        db.add_all(users)
+        journal = models.Journal(title="Query Counts", issue="1", is_published=True)
+        db.add(journal)
+        db.flush()
+        for i in range(ENTRY_COUNT):
+            entry = models.JournalEntry(
+                title=f"Entry {i}", abstract_tr="Özet", status="accepted", journal_id=journal.id,
+            )
+            db.add(entry)
+            db.flush()
+            for user in users:
+                link = models.JournalEntryAuthorLink if user.role == "author" else models.JournalEntryRefereeLink
+                db.add(link(journal_entry_id=entry.id, user_id=user.id))
+        db.commit()
+        return journal.id
+
+
+def _query_count(client, headers, journal, route: str, path: str, limit: int) -> int:
+    from app.query_stats import route_query_stats
+
+    route_query_stats.reset()
+    response = client.get(path.format(journal_id=journal), params={"limit": limit}, headers=headers)
+    assert response.status_code == 200, response.text
+    entries = response.json()
+    assert len(entries) == limit
+    assert all(len(entry["authors"]) == 2 and len(entry["referees"]) == 2 for entry in entries)
+    return route_query_stats.snapshot()[route]["max_queries"]
+
+
+@pytest.mark.parametrize("route,path", LIST_ENDPOINTS)
+def test_query_count_does_not_grow_with_page_size(client, login, journal, route, path):
+    headers = login("list-author0@example.com")
+    # The first request also fills in the entries' random tokens
+    _query_count(client, headers, journal, route, path, ENTRY_COUNT)
+    assert _query_count(client, headers, journal, route, path, 2) == _query_count(client, headers, journal, route, path, 20)
@@ -0,0 +1,138 @@
+"""
+Queued emails are sent by outbox.deliver_pending, retried with backoff and
+dead-lettered after OUTBOX_MAX_ATTEMPTS (see app/outbox.py). Emails go to
+email_utils.FakeTransport.
+
+The SKIP LOCKED claim needs PostgreSQL. Its test runs when TEST_POSTGRES_URL
+names a scratch database, e.g. postgresql://postgres@localhost/outbox_test.
+"""
+import os
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine, delete, update
+
+
+def _recipients(transport) -> list:
+    return [email.to[0]["email"] for email in transport.sent]
+
+
+def _queue(db, outbox, count: int = 1) -> list:
+    messages = [
+        outbox.enqueue(
+            db, "status_update", user_email=f"author{n}@example.com", user_name=f"Author {n}",
+            entry_title="Entry", entry_id=1, old_status="under_review", new_status="accepted",
+        )
+        for n in range(count)
+    ]
+    db.commit()
+    return [message.id for message in messages]
+
+
+def _row(db, message_id: int):
+    from app import models
+
+    db.expire_all()
+    return db.get(models.EmailOutbox, message_id)
+
+
+def _make_due(db, outbox, message_id: int):
+    from app import models
+
+    db.execute(update(models.EmailOutbox).where(models.EmailOutbox.id == message_id).values(
+        next_attempt_at=outbox._now() - timedelta(seconds=1),
+    ))
+    db.commit()
+
+
+def test_failed_send_is_retried_with_backoff(db, outbox, transport):
+    transport.failures = 1
+    [message_id] = _queue(db, outbox)
+
+    assert outbox.deliver_pending() == 1
+    row = _row(db, message_id)
+    assert (row.status, row.attempts) == ("pending", 1)
+    assert "Service Unavailable" in row.last_error
+    delay = (row.next_attempt_at - outbox._now()).total_seconds()
+    assert outbox.retry_delay(1) - 5 < delay <= outbox.retry_delay(1)
+    # Not due yet
+    assert outbox.deliver_pending() == 0
+
+    _make_due(db, outbox, message_id)
+    assert outbox.deliver_pending() == 1
+    row = _row(db, message_id)
+    assert (row.status, row.attempts) == ("sent", 2)
+    assert row.sent_at is not None
+    assert _recipients(transport) == ["author0@example.com"]
+    assert transport.stats()["errors"] == 1
+
+
+def test_row_is_dead_after_max_attempts_and_can_be_requeued(db, outbox, transport, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 3)
+    transport.failures = 3
+    [message_id] = _queue(db, outbox)
+
+    for _ in range(3):
+        _make_due(db, outbox, message_id)
+        assert outbox.deliver_pending() == 1
+    row = _row(db, message_id)
+    assert (row.status, row.attempts) == ("dead", 3)
+    _make_due(db, outbox, message_id)
+    assert outbox.deliver_pending() == 0
+    assert outbox.stats(db)["dead"] == 1
+
+    assert outbox.requeue_dead(db) == 1
+    assert outbox.deliver_pending() == 1
+    row = _row(db, message_id)
+    assert (row.status, row.attempts) == ("sent", 1)
+    assert _recipients(transport) == ["author0@example.com"]
+
+
+def test_claimed_rows_are_leased(db, outbox):
+    message_ids = _queue(db, outbox, count=3)
+
+    claimed = outbox.claim_due(limit=2)
+    assert [message[0] for message in claimed] == message_ids[:2]
+    # The claimed rows are pushed OUTBOX_CLAIM_TIMEOUT ahead, so only the third is left
+    assert [message[0] for message in outbox.claim_due()] == message_ids[2:]
+    assert outbox.claim_due() == []
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="needs TEST_POSTGRES_URL")
+def test_claim_skips_rows_locked_by_another_worker(outbox):
+    from sqlmodel import Session, select
+    from app import models
+
+    pg_engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    models.EmailOutbox.__table__.create(pg_engine, checkfirst=True)
+    try:
+        with Session(pg_engine) as db:
+            db.execute(delete(models.EmailOutbox))
+            db.commit()
+            message_ids = _queue(db, outbox, count=4)
+
+        # Another worker is still inside its claim of the first two rows
+        with Session(pg_engine) as other_worker:
+            other_worker.exec(
+                select(models.EmailOutbox).where(models.EmailOutbox.id.in_(message_ids[:2])).with_for_update()
+            ).all()
+            assert [message[0] for message in outbox.claim_due(bind=pg_engine)] == message_ids[2:]
+    finally:
+        models.EmailOutbox.__table__.drop(pg_engine)
+        pg_engine.dispose()
+
+
+def test_recipient_names_are_escaped_in_batches(db, outbox, transport):
+    for email, name in (("ayse@example.com", "<b>Ayşe</b>"), ("tom@example.com", "Tom & Jerry")):
+        outbox.enqueue(
+            db, "status_update", user_email=email, user_name=name,
+            entry_title="Entry", entry_id=1, old_status="under_review", new_status="accepted",
+        )
+    db.commit()
+
+    assert outbox.deliver_pending() == 2
+    [email] = transport.sent
+    assert "{{ params.user_name }}" in email.html_content
+    assert [version.params["user_name"] for version in email.message_versions] == [
+        "&lt;b&gt;Ayşe&lt;/b&gt;", "Tom &amp; Jerry",
+    ]
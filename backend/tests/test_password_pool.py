@@ -0,0 +1,22 @@
+"""
+Password hashing runs in a bounded pool; a full queue answers 503 (see
+security.PasswordHashPool and the handler in main.py).
+"""
+from conftest import PASSWORD
+
+
+def test_full_queue_answers_503(client, make_user, monkeypatch):
+    from app.security import password_hash_pool
+
+    make_user("busy@example.com")
+    rejected = password_hash_pool.rejected
+    monkeypatch.setattr(password_hash_pool, "max_queue", 0)
+
+    response = client.post("/token", data={"username": "busy@example.com", "password": PASSWORD})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert password_hash_pool.rejected == rejected + 1
+
+    monkeypatch.undo()
+    response = client.post("/token", data={"username": "busy@example.com", "password": PASSWORD})
+    assert response.status_code == 200, response.text
@@ -0,0 +1,107 @@
+"""
+Entry updates are collected per recipient and sent as one email per window or
+daily digest (see app/pending_notifications.py).
+"""
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import delete, update
+
+
+@pytest.fixture
+def notifications(db, outbox):
+    from app import models, pending_notifications
+
+    db.execute(delete(models.PendingNotification))
+    db.commit()
+    return pending_notifications
+
+
+def _author_update(db, notifications, recipient, entry_id: int, author_name: str):
+    notifications.record_event(
+        db, recipient, "author_update", entry_id,
+        author_name=author_name, entry_title=f"Entry {entry_id}", base_url="http://localhost:5173",
+    )
+    db.commit()
+
+
+def _make_due(db, notifications):
+    from app import models
+
+    db.execute(update(models.PendingNotification).values(
+        deliver_after=notifications._now() - timedelta(seconds=1),
+    ))
+    db.commit()
+
+
+def _queued(db) -> list:
+    """(kind, payload) of the queued emails, oldest first."""
+    from sqlmodel import select
+    from app import models
+
+    db.expire_all()
+    return [
+        (message.kind, message.payload)
+        for message in db.exec(select(models.EmailOutbox).order_by(models.EmailOutbox.id)).all()
+    ]
+
+
+def test_updates_in_a_window_are_sent_as_one_email(db, make_user, notifications, outbox, transport):
+    referee = make_user("window-referee@example.com", role="referee")
+    for author_name in ("Ayşe", "Mehmet", "Zeynep"):
+        _author_update(db, notifications, referee, 1, author_name)
+
+    assert notifications.flush_due() == 0  # the window is still open
+    _make_due(db, notifications)
+    assert notifications.flush_due() == 3
+    [(kind, payload)] = _queued(db)
+    assert (kind, payload["count"], payload["entry_id"]) == ("entry_activity", 3, 1)
+
+    assert outbox.deliver_pending() == 1
+    [email] = transport.sent
+    assert email.to[0]["email"] == "window-referee@example.com"
+    assert all(name in email.html_content for name in ("Ayşe", "Mehmet", "Zeynep"))
+
+
+def test_digest_collects_a_users_updates_across_entries(db, make_user, notifications):
+    reader = make_user("digest-reader@example.com", notification_digest=True)
+    other = make_user("digest-other@example.com")
+    _author_update(db, notifications, reader, 1, "Ayşe")
+    _author_update(db, notifications, reader, 2, "Mehmet")
+    _author_update(db, notifications, other, 1, "Ayşe")
+
+    assert notifications.stats(db)["digest"] == 2
+    _make_due(db, notifications)
+    assert notifications.flush_due() == 3
+    queued = {payload["user_email"]: (kind, payload.get("count")) for kind, payload in _queued(db)}
+    assert queued == {
+        "digest-reader@example.com": ("digest", 2),
+        # A lone update goes out as the usual email
+        "digest-other@example.com": ("author_update", None),
+    }
+
+
+def test_flush_takes_whole_groups(db, make_user, notifications):
+    first = make_user("groups-first@example.com")
+    second = make_user("groups-second@example.com")
+    for author_name in ("Ayşe", "Mehmet", "Zeynep"):
+        _author_update(db, notifications, first, 1, author_name)
+    for author_name in ("Ayşe", "Mehmet"):
+        _author_update(db, notifications, second, 1, author_name)
+    _make_due(db, notifications)
+
+    # A limit inside the second group leaves that group to the next flush
+    taken = [notifications.flush_due(limit=4), notifications.flush_due(limit=4)]
+    assert sorted(taken) == [2, 3]
+    assert notifications.flush_due(limit=4) == 0
+    assert sorted(payload["count"] for _, payload in _queued(db)) == [2, 3]
+
+
+def test_a_group_larger_than_the_limit_is_still_taken(db, make_user, notifications):
+    referee = make_user("large-referee@example.com", role="referee")
+    for author_name in ("Ayşe", "Mehmet", "Zeynep"):
+        _author_update(db, notifications, referee, 1, author_name)
+    _make_due(db, notifications)
+
+    assert notifications.flush_due(limit=1) == 3
+    assert [kind for kind, _ in _queued(db)] == ["entry_activity"]
@@ -0,0 +1,56 @@
+"""
+Cached public responses are dropped when a commit touches what they show
+(see app/response_cache.py).
+"""
+import pytest
+
+
+@pytest.fixture
+def entry(db):
+    from app import models
+
+    journal = models.Journal(title="Cached", issue="1", is_published=True)
+    db.add(journal)
+    db.flush()
+    entry = models.JournalEntry(title="Before", abstract_tr="Özet", status="accepted", journal_id=journal.id)
+    db.add(entry)
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+
+def _titles(client, journal_id: int) -> list:
+    response = client.get(f"/public/journals/{journal_id}/entries")
+    assert response.status_code == 200, response.text
+    return [entry["title"] for entry in response.json()]
+
+
+def test_commit_touching_an_entry_evicts_its_cached_listing(client, db, entry):
+    from app.response_cache import response_cache
+
+    assert _titles(client, entry.journal_id) == ["Before"]
+    hits = response_cache.stats()["hits"]
+    assert _titles(client, entry.journal_id) == ["Before"]
+    assert response_cache.stats()["hits"] == hits + 1
+
+    invalidations = response_cache.stats()["invalidations"]
+    entry.title = "After"
+    db.add(entry)
+    db.commit()
+    assert response_cache.stats()["invalidations"] > invalidations
+    assert _titles(client, entry.journal_id) == ["After"]
+
+
+def test_rolled_back_change_keeps_the_cached_listing(client, db, entry):
+    from app.response_cache import response_cache
+
+    assert _titles(client, entry.journal_id) == ["Before"]
+    invalidations = response_cache.stats()["invalidations"]
+    entry.title = "Discarded"
+    db.add(entry)
+    db.flush()
+    db.rollback()
+    assert response_cache.stats()["invalidations"] == invalidations
+    hits = response_cache.stats()["hits"]
+    assert _titles(client, entry.journal_id) == ["Before"]
+    assert response_cache.stats()["hits"] == hits + 1
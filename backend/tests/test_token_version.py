@@ -0,0 +1,56 @@
+"""
+Bumping a user's token_version revokes the tokens issued before it, and tokens
+that name the user by email are only accepted until LEGACY_TOKENS_UNTIL (see
+app/security.py).
+"""
+from datetime import datetime, timedelta
+
+from conftest import PASSWORD
+
+
+def _me(client, headers) -> int:
+    return client.get("/users/me", headers=headers).status_code
+
+
+def test_logout_all_rejects_older_tokens(client, make_user, login):
+    make_user("logout@example.com")
+    headers = login("logout@example.com")
+    assert _me(client, headers) == 200
+
+    assert client.post("/users/me/logout-all", headers=headers).status_code == 200
+    assert _me(client, headers) == 401
+    assert _me(client, login("logout@example.com")) == 200
+
+
+def test_password_change_rejects_older_tokens(client, make_user, login):
+    make_user("change@example.com")
+    headers = login("change@example.com")
+    other_session = login("change@example.com")
+
+    response = client.post(
+        "/users/me/change-password",
+        json={"current_password": PASSWORD, "new_password": "Password2"},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    assert _me(client, headers) == 401
+    assert _me(client, other_session) == 401
+    assert _me(client, {"Authorization": f"Bearer {response.json()['access_token']}"}) == 200
+
+
+def test_email_subject_tokens_only_until_cutoff(client, make_user, login, monkeypatch):
+    from app import security
+
+    make_user("legacy@example.com")
+    headers = {"Authorization": f"Bearer {security.create_access_token({'sub': 'legacy@example.com'})}"}
+
+    monkeypatch.setattr(security, "LEGACY_TOKENS_UNTIL", None)
+    assert _me(client, headers) == 401
+    monkeypatch.setattr(security, "LEGACY_TOKENS_UNTIL", datetime.utcnow() - timedelta(minutes=1))
+    assert _me(client, headers) == 401
+    monkeypatch.setattr(security, "LEGACY_TOKENS_UNTIL", datetime.utcnow() + timedelta(days=1))
+    assert _me(client, headers) == 200
+
+    # They count as version 0, so revoking the user's tokens rejects them too
+    client.post("/users/me/logout-all", headers=login("legacy@example.com"))
+    assert _me(client, headers) == 401
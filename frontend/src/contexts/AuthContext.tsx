@@ -17,6 +17,7 @@ export interface User {
     is_auth: boolean;
     marked_for_deletion?: boolean;
     tutorial_done?: boolean;
+    notification_digest?: boolean;
 }
 
 // Define the shape of the context data
@@ -37,6 +37,7 @@ type TranslationKeys =
   | 'loginSuccessButUserInfoFailed'
   | 'profile' | 'userProfile' | 'myJournalEntries' | 'noEntriesFound' | 'loadingUserData' | 'failedToLoadUserEntries'
   | 'biography' | 'scienceBranch' | 'location' | 'telephone' | 'profileInformation' | 'yoksisId' | 'orcidId' | 'journalId' | 'date'
+  | 'notificationDigest' | 'notificationDigestHelp'
   | 'myRefereeEntries' | 'noRefereeEntriesFound' | 'myEditedJournals' | 'noEditedJournalsFound' | 'issue'
   | 'entriesInJournal'
   | 'passwordRequirements' | 'passwordMinLength' | 'passwordCase' | 'passwordNumber' | 'passwordMatch' | 'confirmPassword'
@@ -302,6 +303,8 @@ const translations: Record<Language, TranslationDictionary> = {
     'yoksisId': 'YÖKSİS ID',
     'orcidId': 'ORCID ID',
     'journalId': 'Journal ID',
+    'notificationDigest': 'Daily email digest',
+    'notificationDigestHelp': 'Get one email a day with all author and referee updates instead of an email for each update.',
     'date': 'Date',
     'myRefereeEntries': 'Entries I Referee',
     'noRefereeEntriesFound': 'No referee entries found.',
@@ -850,6 +853,8 @@ const translations: Record<Language, TranslationDictionary> = {
     'yoksisId': 'YÖKSİS ID',
     'orcidId': 'ORCID ID',
     'journalId': 'Dergi ID',
+    'notificationDigest': 'Günlük e-posta özeti',
+    'notificationDigestHelp': 'Her güncelleme için ayrı e-posta yerine tüm yazar ve hakem güncellemelerini günde bir e-postada alın.',
     'date': 'TARİH',
     'myRefereeEntries': 'Hakem Olduğum Yazılar',
     'noRefereeEntriesFound': 'Hakem olduğunuz yazı bulunamadı.',
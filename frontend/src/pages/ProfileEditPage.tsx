@@ -46,6 +46,7 @@ interface UserForm {
     location: string;
     yoksis_id: string;
     orcid_id: string;
+    notification_digest: boolean;
 }
 
 const ProfileEditPage: React.FC = () => {
@@ -90,6 +91,7 @@ const ProfileEditPage: React.FC = () => {
         location: '',
         yoksis_id: '',
         orcid_id: '',
+        notification_digest: false,
     });
 
     // Function to get flag for country code
@@ -214,6 +216,7 @@ const ProfileEditPage: React.FC = () => {
             location: locationData.city,
             yoksis_id: user.yoksis_id || '',
             orcid_id: user.orcid_id || '',
+            notification_digest: user.notification_digest || false,
         });
         
         setLoading(false);
@@ -305,6 +308,7 @@ const ProfileEditPage: React.FC = () => {
                 location: formData.country && formData.location ? `${formData.location}, ${formData.country}` : formData.location || formData.country || undefined,
                 yoksis_id: formData.yoksis_id,
                 orcid_id: formData.orcid_id,
+                notification_digest: formData.notification_digest,
             };
             
             // Update user profile using the user-specific endpoint
@@ -561,6 +565,24 @@ const ProfileEditPage: React.FC = () => {
                                     showValidationErrors={hasAttemptedSubmit}
                                 />
                             </div>
+
+                            <div className="form-group" style={{ marginBottom: '1.5rem' }}>
+                                <label htmlFor="notification_digest" style={{ display: 'flex', alignItems: 'center', gap: '0.5rem', cursor: 'pointer' }}>
+                                    <input
+                                        type="checkbox"
+                                        id="notification_digest"
+                                        name="notification_digest"
+                                        checked={formData.notification_digest}
+                                        onChange={(e) => setFormData(prev => ({ ...prev, notification_digest: e.target.checked }))}
+                                        disabled={loading}
+                                        style={{ width: '18px', height: '18px' }}
+                                    />
+                                    {t('notificationDigest') || 'Daily email digest'}
+                                </label>
+                                <small style={{ color: '#64748B' }}>
+                                    {t('notificationDigestHelp') || 'Get one email a day with all author and referee updates instead of an email for each update.'}
+                                </small>
+                            </div>
                         </div>
 
                         {hasAttemptedSubmit && error && (
@@ -25,6 +25,7 @@ export interface UserRead {
     editor_in_chief_id?: number;
     marked_for_deletion?: boolean;
     tutorial_done?: boolean;
+    notification_digest?: boolean;
 }
 
 interface UserCreate {
@@ -253,6 +254,7 @@ interface UserUpdate {
     orcid_id?: string;
     role?: string;
     is_auth?: boolean;
+    notification_digest?: boolean;
 }
 
 // Add search results interface
@@ -920,6 +922,10 @@ const changePassword = async (currentPassword: string, newPassword: string): Pro
         current_password: currentPassword,
         new_password: newPassword
     });
+    // Changing the password revokes the old token; keep this session logged in
+    if (response.data.access_token) {
+        localStorage.setItem('authToken', response.data.access_token);
+    }
     return response.data;
 };
 